@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Tests for the transient thermal model's adaptive step controller
+"""
+
+import numpy as np
+
+from thermal_simulation import ThermalSimulator
+from thermal_transient import simulate_transient
+
+
+def test_full_year_step_counts():
+    """A year of half-hourly forcing needs fewer steps than samples and few rejections"""
+
+    result = simulate_transient(ThermalSimulator(), days=365, start_date='2025-01-01', site='urgam_valley')
+    solver = result['solver']
+    samples = 365 * 48
+
+    # 12918 accepted and 2343 rejected when the controller was tuned
+    assert solver['accepted_steps'] < 0.8 * samples
+    assert solver['rejected_steps'] < 0.2 * solver['accepted_steps']
+
+
+def test_default_tolerances_match_tight_run():
+    """Peak temperatures at the default tolerances stay close to a tightly controlled run"""
+
+    simulator = ThermalSimulator()
+    default = simulate_transient(simulator, days=14, start_date='2025-05-01', site='urgam_valley')
+    tight = simulate_transient(simulator, days=14, start_date='2025-05-01', site='urgam_valley',
+                               rtol=1e-8, atol=1e-7)
+    peaks = np.array([day['peak_panel_temp'] for day in default['daily_results']])
+    tight_peaks = np.array([day['peak_panel_temp'] for day in tight['daily_results']])
+    assert np.max(np.abs(peaks - tight_peaks)) < 0.2
+    assert default['solver']['accepted_steps'] < tight['solver']['accepted_steps']
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+HHDAO Thermal Reading Archive
+Closed monthly partitions converted to memory-mapped columnar files
+
+Each archived month is a hhdao-columnar-v1 directory (see
+thermal_weather.open_columnar): one .npy per column and a manifest. Rows
+are sorted by device then time, text columns are dictionary-encoded, and
+the manifest records each device's row range and time span. A scan maps
+the columns zero-copy and pushes predicates down to slicing: a device
+filter selects its row range, a time window is two binary searches
+inside it, and months outside the window are never opened.
+
+Archives written with compression are a fraction of the size but are
+decompressed into memory on open instead of being mapped.
+"""
+
+import argparse
+import json
+import shutil
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from thermal_ingest import READING_COLUMNS
+from thermal_query import DEFAULT_CHUNK_ROWS, timestamp_bound
+from thermal_weather import COLUMNAR_FORMAT, COLUMNAR_MANIFEST, open_columnar
+
+DICTIONARY_COLUMNS = ('device_id', 'device_type', 'alert_level')
+NUMERIC_COLUMNS = tuple(column for column in READING_COLUMNS
+                        if column != 'timestamp' and column not in DICTIONARY_COLUMNS)
+ARCHIVE_COLUMNS = ('timestamp', *DICTIONARY_COLUMNS, *NUMERIC_COLUMNS)
+
+
+def _as_datetime64(value):
+    return np.datetime64(timestamp_bound(value).replace(' ', 'T'), 's')
+
+
+def archive_database(db_path, out_dir, compress=False, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Write a database's thermal_readings as a columnar archive
+
+    Rows are streamed in table order (a sequential scan) into preallocated
+    memory-mapped .npy files, then sorted by device and time one column at
+    a time, so peak memory is a few columns rather than the partition.
+
+    Args:
+        db_path: SQLite file holding thermal_readings (e.g. a closed partition)
+        out_dir: Archive directory to create
+        compress: Store compressed .npz columns instead of mappable .npy
+        chunk_rows: Rows fetched per chunk
+
+    Returns:
+        dict: The archive manifest
+    """
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute("SELECT count(*) FROM thermal_readings").fetchone()[0]
+        columns = {'timestamp': np.lib.format.open_memmap(
+            out_dir / 'timestamp.npy', mode='w+', dtype='datetime64[s]', shape=(rows,))}
+        for name in DICTIONARY_COLUMNS:
+            columns[name] = np.lib.format.open_memmap(out_dir / f"{name}.npy", mode='w+', dtype=np.int32, shape=(rows,))
+        for name in NUMERIC_COLUMNS:
+            columns[name] = np.lib.format.open_memmap(out_dir / f"{name}.npy", mode='w+', dtype=np.float64, shape=(rows,))
+
+        dictionaries = {name: {} for name in DICTIONARY_COLUMNS}
+        cursor = conn.execute(f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM thermal_readings")
+        offset = 0
+        while True:
+            chunk = cursor.fetchmany(chunk_rows)
+            if not chunk:
+                break
+            end = offset + len(chunk)
+            values = list(zip(*chunk))
+            columns['timestamp'][offset:end] = np.array(values[0], dtype='datetime64[s]')
+            for i, name in enumerate(DICTIONARY_COLUMNS, start=1):
+                codes = dictionaries[name]
+                columns[name][offset:end] = [codes.setdefault(value, len(codes)) for value in values[i]]
+            for i, name in enumerate(NUMERIC_COLUMNS, start=1 + len(DICTIONARY_COLUMNS)):
+                columns[name][offset:end] = np.array(values[i], dtype=np.float64)  # NULL -> NaN
+            offset = end
+    finally:
+        conn.close()
+
+    # Device codes in name order, then rows sorted by device and time
+    names = sorted(dictionaries['device_id'])
+    remap = np.empty(len(names), dtype=np.int32)
+    remap[[dictionaries['device_id'][name] for name in names]] = np.arange(len(names), dtype=np.int32)
+    dictionaries['device_id'] = {name: code for code, name in enumerate(names)}
+    columns['device_id'][:] = remap[columns['device_id']]
+    order = np.lexsort((columns['timestamp'], columns['device_id']))
+    for column in columns.values():
+        column[:] = column[order]
+    del order
+
+    # Device row ranges and time spans for predicate pushdown
+    device_codes = np.asarray(columns['device_id'])
+    starts = np.flatnonzero(np.r_[True, device_codes[1:] != device_codes[:-1]]) if rows else np.array([], dtype=int)
+    ends = np.r_[starts[1:], rows].astype(int)
+    stamps = columns['timestamp']
+    devices = {
+        names[int(device_codes[start])]: {
+            'rows': [int(start), int(end)],
+            'time_range': [str(stamps[start]), str(stamps[end - 1])]
+        }
+        for start, end in zip(starts, ends)
+    }
+
+    for column in columns.values():
+        column.flush()
+    if compress:
+        for name, column in columns.items():
+            np.savez_compressed(out_dir / f"{name}.npz", values=np.asarray(column))
+        for name in ARCHIVE_COLUMNS:
+            (out_dir / f"{name}.npy").unlink()
+
+    manifest = {
+        'format': COLUMNAR_FORMAT,
+        'rows': rows,
+        'columns': list(ARCHIVE_COLUMNS),
+        'compression': 'npz' if compress else None,
+        'source': str(db_path),
+        'sort': ['device_id', 'timestamp'],
+        'dictionaries': {name: [value for value, _ in sorted(codes.items(), key=lambda item: item[1])]
+                         for name, codes in dictionaries.items()},
+        'devices': devices,
+        'time_range': [min((d['time_range'][0] for d in devices.values()), default=None),
+                       max((d['time_range'][1] for d in devices.values()), default=None)]
+    }
+    with open(out_dir / COLUMNAR_MANIFEST, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+class ReadingArchive:
+    """
+    One archived month, memory-mapped
+
+    Args:
+        path: Archive directory written by archive_database
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / COLUMNAR_MANIFEST) as f:
+            self.manifest = json.load(f)
+        self.columns = open_columnar(self.path)
+        self.rows = self.manifest['rows']
+        self.devices = self.manifest['devices']
+
+    def _segments(self, device_id=None, since=None, until=None):
+        """Row ranges matching the predicates, one per device"""
+
+        if device_id is None:
+            devices = list(self.devices)
+        else:
+            devices = [device_id] if isinstance(device_id, str) else list(device_id)
+        since = _as_datetime64(since) if since is not None else None
+        until = _as_datetime64(until) if until is not None else None
+
+        for device in devices:
+            entry = self.devices.get(device)
+            if entry is None:
+                continue
+            start, end = entry['rows']
+            first, last = (np.datetime64(value, 's') for value in entry['time_range'])
+            if (since is not None and last < since) or (until is not None and first >= until):
+                continue  # Device's time span misses the window
+            stamps = self.columns['timestamp'][start:end]
+            lo = int(np.searchsorted(stamps, since, 'left')) if since is not None and first < since else 0
+            hi = int(np.searchsorted(stamps, until, 'left')) if until is not None and last >= until else end - start
+            if hi > lo:
+                yield device, start + lo, start + hi
+
+    def iter_slices(self, columns=None, device_id=None, since=None, until=None):
+        """
+        Stream matching rows as zero-copy column views, one slice per device
+
+        Args:
+            columns: Archive columns to return (all by default); device_id
+                     is given per slice, dictionary columns as codes
+            device_id: One device id or a list of them
+            since, until: Half-open timestamp window
+
+        Yields:
+            tuple: (device_id, dict of read-only arrays)
+        """
+
+        columns = columns or [name for name in ARCHIVE_COLUMNS if name != 'device_id']
+        for device, start, end in self._segments(device_id, since, until):
+            yield device, {name: self.columns[name][start:end] for name in columns}
+
+    def read(self, columns=None, device_id=None, since=None, until=None):
+        """Matching rows as one array per column (copied when several devices match)"""
+
+        columns = columns or [name for name in ARCHIVE_COLUMNS if name != 'device_id']
+        slices = [views for _, views in self.iter_slices(columns, device_id, since, until)]
+        if len(slices) == 1:
+            return slices[0]
+        return {name: np.concatenate([views[name] for views in slices]) if slices
+                else self.columns[name][:0] for name in columns}
+
+    def decode(self, name, codes):
+        """Dictionary column codes back to their text values"""
+
+        return np.asarray(self.manifest['dictionaries'][name], dtype=object)[codes]
+
+
+class ArchiveSet:
+    """
+    Directory of monthly archives (thermal_YYYY_MM/), scanned as one
+
+    Args:
+        root: Archive root directory
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._open = {}
+
+    def path(self, month):
+        return self.root / f"thermal_{month.replace('-', '_')}"
+
+    def months(self):
+        return sorted(path.parent.name[len('thermal_'):].replace('_', '-')
+                      for path in self.root.glob(f"thermal_????_??/{COLUMNAR_MANIFEST}"))
+
+    def archive(self, month):
+        if month not in self._open:
+            self._open[month] = ReadingArchive(self.path(month))
+        return self._open[month]
+
+    def archives(self, since=None, until=None):
+        """Archives of the months overlapping the window, oldest first"""
+
+        low = timestamp_bound(since)[:7] if since is not None else None
+        high = timestamp_bound(until) if until is not None else None
+        for month in self.months():
+            if (low is not None and month < low) or (high is not None and f"{month}-01 00:00:00" >= high):
+                continue
+            yield self.archive(month)
+
+    def iter_slices(self, columns=None, device_id=None, since=None, until=None):
+        """ReadingArchive.iter_slices over the months overlapping the window, oldest first"""
+
+        for archive in self.archives(since, until):
+            yield from archive.iter_slices(columns, device_id, since, until)
+
+
+def _row_count(db_path):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return conn.execute("SELECT count(*) FROM thermal_readings").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def archive_partitions(store, archive_root, compress=False, months=None):
+    """
+    Archive closed partitions of a PartitionedStore that still hold raw readings
+
+    A month already archived is written again when its partition's row
+    count no longer matches the manifest (late readings arrived after it
+    was archived), so compaction never drops rows the archive lacks.
+
+    Args:
+        store: thermal_partitions.PartitionedStore
+        archive_root: ArchiveSet root directory
+        compress: Write compressed archives
+        months: Only these months (default: every month before the current one)
+
+    Returns:
+        list: Manifests written
+    """
+
+    from thermal_partitions import month_key
+
+    archives = ArchiveSet(archive_root)
+    current = month_key(datetime.now(timezone.utc))
+    written = []
+    for month in months or [month for month in store.months() if month < current]:
+        if store.is_compacted(month):
+            continue  # Raw readings already dropped
+        path = archives.path(month)
+        if (path / COLUMNAR_MANIFEST).exists():
+            with open(path / COLUMNAR_MANIFEST) as f:
+                previous = json.load(f)
+            if previous['rows'] == _row_count(store.path(month)):
+                continue
+            shutil.rmtree(path)
+            written.append(archive_database(store.path(month), path, compress or bool(previous['compression'])))
+            continue
+        written.append(archive_database(store.path(month), path, compress))
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Columnar archives of thermal readings')
+    parser.add_argument('mode', choices=['archive', 'partitions', 'scan'], help='Operation')
+    parser.add_argument('source', help='SQLite file (archive), partition directory (partitions) or archive (scan)')
+    parser.add_argument('--output', help='Archive directory (archive) or archive root (partitions)')
+    parser.add_argument('--compress', action='store_true', help='Write compressed columns')
+    parser.add_argument('--device', help='Device id filter (comma-separated for several)')
+    parser.add_argument('--since', help='Window start timestamp')
+    parser.add_argument('--until', help='Window end timestamp (exclusive)')
+    args = parser.parse_args()
+
+    if args.mode in ('archive', 'partitions') and not args.output:
+        parser.error(f"{args.mode} needs --output")
+    if args.mode == 'archive':
+        manifest = archive_database(args.source, args.output, args.compress)
+        print(f"📦 Archived {manifest['rows']} readings ({len(manifest['devices'])} devices) to {args.output}")
+    elif args.mode == 'partitions':
+        from thermal_partitions import PartitionedStore
+        for manifest in archive_partitions(PartitionedStore(args.source), args.output, args.compress):
+            print(f"📦 Archived {manifest['rows']} readings from {manifest['source']}")
+    else:
+        source = Path(args.source)
+        reader = ReadingArchive(source) if (source / COLUMNAR_MANIFEST).exists() else ArchiveSet(source)
+        devices = args.device.split(',') if args.device else None
+        started = time.perf_counter()
+        rows, total = 0, 0.0
+        for _, views in reader.iter_slices(['temperature'], devices, args.since, args.until):
+            rows += len(views['temperature'])
+            total += float(np.nansum(views['temperature']))
+        elapsed = time.perf_counter() - started
+        print(json.dumps({
+            'rows': rows,
+            'mean_temperature': round(total / rows, 3) if rows else None,
+            'milliseconds': round(elapsed * 1000, 2)
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
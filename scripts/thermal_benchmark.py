@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+HHDAO Thermal Simulator Benchmarks
+Throughput, latency and memory regression checks for thermal_simulation.py
+
+The reference baseline in thermal_benchmark_baseline.json was recorded
+on the environment stored in it. Regenerate it on the machine that runs
+the gate with --update-baseline; combined with --only, only the selected
+cases are re-recorded and the rest of the baseline is kept.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from itertools import cycle
+from pathlib import Path
+
+import numpy as np
+
+from thermal_simulation import ThermalSimulator
+
+DEFAULT_BASELINE = Path(__file__).parent / "thermal_benchmark_baseline.json"
+DEFAULT_TOLERANCE = 0.25  # Allowed slowdown of median latency
+DEFAULT_MEMORY_TOLERANCE = 0.25  # Allowed growth of peak traced memory
+PARALLEL_WORKERS = 4  # Fixed so the parallel case is comparable across machines
+
+
+def _conditions(size, seed=0):
+    """Reproducible random operating conditions"""
+
+    rng = np.random.default_rng(seed)
+    return (
+        rng.uniform(-5, 45, size),
+        rng.uniform(0, 100, size),
+        rng.uniform(20, 100, size),
+        rng.uniform(0, 15, size)
+    )
+
+
+def _cases(simulator):
+    """Benchmark cases as (name, items processed per call, callable)"""
+
+    cases = []
+
+    scalar_inputs = cycle(zip(*(x.tolist() for x in _conditions(1000, seed=1))))
+    cases.append(('simulate_cooling/scalar', 1, lambda: simulator.simulate_cooling(*next(scalar_inputs))))
+
+    for size in (1_000, 100_000, 1_000_000):
+        inputs = _conditions(size)
+        cases.append((f'simulate_cooling_batch/{size}', size, lambda inputs=inputs: simulator.simulate_cooling_batch(*inputs)))
+
+    # Only productive half-hour steps are simulated
+    daily_steps = int(np.count_nonzero(simulator._weather_profile(np.arange(0, 24, 0.5))[1] > 5))
+    cases.append(('simulate_daily_cycle', daily_steps, simulator.simulate_daily_cycle))
+
+    for candidates in (1_000, 10_000, 100_000):
+        cases.append((
+            f'optimize_thermal_design/{candidates}',
+            candidates,
+            lambda candidates=candidates: simulator.optimize_thermal_design(candidates=candidates, workers=1)
+        ))
+    # Includes starting the worker pool; peak memory covers the parent process only
+    cases.append((
+        f'optimize_thermal_design/100000/workers={PARALLEL_WORKERS}',
+        100_000,
+        lambda: simulator.optimize_thermal_design(candidates=100_000, workers=PARALLEL_WORKERS)
+    ))
+    return cases
+
+
+def _measure(func, items, min_time, min_repeats):
+    """Time repeated calls, then trace one call for peak memory"""
+
+    func()  # Warm-up
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < min_repeats or time.perf_counter() - started < min_time:
+        t0 = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = np.array(latencies)
+    median = float(np.median(latencies))
+    return {
+        'repeats': len(latencies),
+        'latency_ms': {
+            'p50': round(median * 1e3, 4),
+            'p90': round(float(np.percentile(latencies, 90)) * 1e3, 4),
+            'p99': round(float(np.percentile(latencies, 99)) * 1e3, 4)
+        },
+        'throughput_per_s': round(items / median, 1),
+        'peak_memory_bytes': int(peak)
+    }
+
+
+def run_benchmarks(min_time=0.5, min_repeats=5, only=None):
+    """Run all benchmark cases (optionally filtered by name prefix)"""
+
+    simulator = ThermalSimulator()
+    results = {}
+    for name, items, func in _cases(simulator):
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        results[name] = _measure(func, items, min_time, min_repeats)
+        print(f"⏱️  {name}: p50 {results[name]['latency_ms']['p50']:.3f} ms, "
+              f"{results[name]['throughput_per_s']:.0f}/s, "
+              f"peak {results[name]['peak_memory_bytes'] / 1e6:.1f} MB", file=sys.stderr)
+
+    return {
+        'recorded_at': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor()
+        },
+        'cases': results
+    }
+
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE, memory_tolerance=DEFAULT_MEMORY_TOLERANCE):
+    """List regressions of a report against a baseline"""
+
+    regressions = []
+    for name, current in report['cases'].items():
+        reference = baseline.get('cases', {}).get(name)
+        if reference is None:
+            continue
+        latency, base_latency = current['latency_ms']['p50'], reference['latency_ms']['p50']
+        if latency > base_latency * (1 + tolerance):
+            regressions.append(
+                f"{name}: p50 latency {latency:.3f} ms vs baseline {base_latency:.3f} ms "
+                f"(+{(latency / base_latency - 1) * 100:.0f}%)"
+            )
+        memory, base_memory = current['peak_memory_bytes'], reference['peak_memory_bytes']
+        if memory > base_memory * (1 + memory_tolerance) and memory - base_memory > 1_000_000:
+            regressions.append(
+                f"{name}: peak memory {memory / 1e6:.1f} MB vs baseline {base_memory / 1e6:.1f} MB"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HHDAO Thermal Simulator Benchmarks')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='Record this run as the baseline')
+    parser.add_argument('--allow-missing-baseline', action='store_true',
+                        help='Exit successfully when there is no baseline to compare against')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='Allowed p50 latency slowdown')
+    parser.add_argument('--memory-tolerance', type=float, default=DEFAULT_MEMORY_TOLERANCE, help='Allowed peak memory growth')
+    parser.add_argument('--min-time', type=float, default=0.5, help='Minimum seconds spent per case')
+    parser.add_argument('--min-repeats', type=int, default=5, help='Minimum timed calls per case')
+    parser.add_argument('--only', nargs='*', help='Only run cases whose name starts with these prefixes')
+    parser.add_argument('--output', help='Output file path (JSON)')
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.min_time, args.min_repeats, args.only)
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        if args.only and baseline_path.exists():
+            # Re-record the selected cases and keep the others
+            with open(baseline_path) as f:
+                cases = json.load(f).get('cases', {})
+            report = dict(report, cases=dict(cases, **report['cases']))
+        with open(baseline_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Baseline saved to: {baseline_path}")
+        return
+
+    if not baseline_path.exists():
+        print(f"\n⚠️  No baseline at {baseline_path}; run with --update-baseline to record one")
+        if not args.allow_missing_baseline:
+            sys.exit(2)
+        return
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.tolerance, args.memory_tolerance)
+    if regressions:
+        print("\n❌ Performance regressions:")
+        for regression in regressions:
+            print(f"   {regression}")
+        sys.exit(1)
+    print("\n✅ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
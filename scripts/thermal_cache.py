@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+HHDAO Thermal Result Cache
+Content-addressed, disk-backed cache for deterministic simulation results
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 100_000
+
+
+class ResultCache:
+    """
+    SQLite-backed result store with least-recently-used eviction
+
+    Entries are keyed by a SHA-256 of the method name, its inputs and the
+    simulator fingerprint, so any change to physical constants addresses
+    different entries. Several processes may share one cache file.
+    Hit and miss counters are kept both per instance and cumulatively in
+    the database. A pickled cache reopens its file by path, so worker
+    processes share the parent's cache; their hits and misses show up
+    only in the cumulative counters.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                method TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                hits INTEGER DEFAULT 0
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_last_access ON results (last_access)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_stats (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+
+    def __getstate__(self):
+        return {'path': self.path, 'max_bytes': self.max_bytes, 'max_entries': self.max_entries}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'], state['max_bytes'], state['max_entries'])
+
+    @staticmethod
+    def key(method, inputs, fingerprint):
+        """Content address for one call"""
+
+        payload = json.dumps(
+            {'method': method, 'inputs': inputs, 'fingerprint': fingerprint},
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        """Cached value for key, or None"""
+
+        row = self._conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            self._count('misses')
+            return None
+
+        self.hits += 1
+        self._conn.execute(
+            "UPDATE results SET last_access = ?, hits = hits + 1 WHERE key = ?", (time.time(), key)
+        )
+        self._count('hits')
+        return json.loads(row[0])
+
+    def put(self, key, method, value):
+        """Store a JSON-serializable value and evict down to the size limits"""
+
+        text = json.dumps(value)
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO results (key, method, value, size, created_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, method, text, len(text), now, now)
+        )
+        self._evict()
+
+    def get_or_compute(self, key, method, compute):
+        """Return the cached value for key, computing and storing it on a miss"""
+
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, method, value)
+        return value
+
+    def _evict(self):
+        """Drop least-recently-used entries beyond max_bytes or max_entries"""
+
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM results ORDER BY last_access"
+        ).fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            evicted += 1
+        self._count('evictions', evicted)
+
+    def _count(self, name, amount=1):
+        self._conn.execute(
+            "INSERT INTO cache_stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+
+    def stats(self):
+        """Hit/miss statistics for this instance and for the cache file overall"""
+
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        cumulative = dict(self._conn.execute("SELECT name, value FROM cache_stats").fetchall())
+        lookups = self.hits + self.misses
+        return {
+            'path': str(self.path),
+            'entries': count,
+            'size_bytes': total,
+            'max_bytes': self.max_bytes,
+            'session': {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None
+            },
+            'cumulative': {
+                'hits': cumulative.get('hits', 0),
+                'misses': cumulative.get('misses', 0),
+                'evictions': cumulative.get('evictions', 0)
+            }
+        }
+
+    def clear(self):
+        """Remove every cached entry"""
+
+        self._conn.execute("DELETE FROM results")
+
+    def close(self):
+        self._conn.close()
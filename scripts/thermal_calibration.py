@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+HHDAO Thermal Model Calibration
+Fits the empirical cooling coefficients to recorded thermal_readings
+
+Readings are streamed in chunks and reduced to normal equations, so memory
+does not grow with the number of rows. They can come from a single SQLite
+database, a directory of monthly partitions (thermal_partitions) or
+columnar archives (thermal_archive); a partition directory given an archive
+root reads archived months from the archive and the rest from their
+partitions. Each pass re-reads the source: the first is a
+ridge-regularized least-squares fit,
+later passes re-weight residuals (Huber) and re-linearize the capped terms
+around the current coefficients until they settle. Coefficients stay
+within PARAMETER_BOUNDS, and a fit that does not converge, raises the
+error or ends on a bound is only written with --force.
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+import thermal_query
+from thermal_simulation import MODEL_VERSION, PARAMETER_FILE_FORMAT, ThermalSimulator
+from thermal_weather import COLUMNAR_MANIFEST, SOLAR_LOAD_PER_IRRADIANCE
+
+FITTED_PARAMETERS = (
+    'TERRACOTTA_CONVECTION_FACTOR', 'EVAPORATIVE_COOLING_MAX', 'THERMAL_MASS_FACTOR',
+    'AIR_CONVECTION_BASE', 'AIR_CONVECTION_PER_WIND', 'RADIATIVE_COOLING_DIVISOR'
+)
+PARAMETER_FILE_VERSION = 1
+DEFAULT_CHUNK_ROWS = 100_000
+DEFAULT_HUMIDITY = 65  # % where a reading has none
+DEFAULT_WIND_SPEED = 3  # m/s; thermal_readings has no wind column
+READING_FIELDS = ('temperature', 'ambient_temp', 'humidity', 'solar_irradiance')
+RIDGE = 1e-3  # Pull toward the current coefficients, relative to their size
+HUBER_K = 1.345
+MAX_PASSES = 8
+TOLERANCE = 1e-4
+
+# Physically plausible range of each fitted parameter; a fit that ends on a bound is suspect
+PARAMETER_BOUNDS = {
+    'TERRACOTTA_CONVECTION_FACTOR': (0.05, 1.5),
+    'EVAPORATIVE_COOLING_MAX': (0.1, 8.0),  # °C
+    'THERMAL_MASS_FACTOR': (0.005, 0.5),
+    'AIR_CONVECTION_BASE': (1.0, 25.0),  # W/m²K, still air to strong natural convection
+    'AIR_CONVECTION_PER_WIND': (0.2, 6.0),  # W/m²K per m/s
+    'RADIATIVE_COOLING_DIVISOR': (10.0, 500.0)  # W/m² per °C
+}
+
+
+def _coefficients(simulator):
+    """Linear coefficients of the cooling model (the radiative term uses 1/divisor)"""
+
+    values = [getattr(simulator, name) for name in FITTED_PARAMETERS]
+    values[-1] = 1 / values[-1]
+    return np.array(values, dtype=np.float64)
+
+
+def _coefficient_bounds():
+    """Lower and upper bounds on the linear coefficients (the divisor's bounds invert)"""
+
+    low, high = np.array([PARAMETER_BOUNDS[name] for name in FITTED_PARAMETERS], dtype=np.float64).T
+    low[-1], high[-1] = 1 / high[-1], 1 / low[-1]
+    return low, high
+
+
+def _features(simulator, ambient_temp, solar_load, humidity, wind_speed):
+    """Observed-cooling design matrix, one column per linear coefficient"""
+
+    baseline_temp = simulator._baseline_temperature(ambient_temp, solar_load)
+    rise = baseline_temp - ambient_temp
+    radiative_flux = simulator.STEFAN_BOLTZMANN * simulator.TERRACOTTA_EMISSIVITY * (
+        (baseline_temp + 273.15)**4 - (ambient_temp + 273.15)**4
+    )
+    features = np.column_stack([
+        simulator.TERRACOTTA_POROSITY * 1.5 * wind_speed * rise / 30,
+        np.maximum(0, (100 - humidity) / 100) * 0.8,
+        rise,
+        rise / 100,
+        wind_speed * rise / 100,
+        radiative_flux
+    ])
+    return baseline_temp, rise, features
+
+
+def _linearize(theta, features, rise):
+    """
+    Replace capped terms by their cap for the current coefficients
+
+    Returns:
+        tuple: features with capped columns zeroed, constant cooling from
+               caps, and a mask of rows the model does not clamp to ambient
+    """
+
+    features = features.copy()
+    constant = np.zeros(len(features))
+
+    mass = theta[2] * features[:, 2] > 3.0
+    features[mass, 2] = 0
+    constant[mass] += 3.0
+
+    air = features[:, 3:5] @ theta[3:5] > 8.0
+    features[air, 3:5] = 0
+    constant[air] += 8.0
+
+    radiative = theta[5] * features[:, 5] > 5.0
+    features[radiative, 5] = 0
+    constant[radiative] += 5.0
+
+    unclamped = features @ theta + constant < rise
+    return features, constant, unclamped
+
+
+def _read_chunks(conn, query, params, chunk_rows):
+    cursor = conn.execute(query, params)
+    while True:
+        rows = cursor.fetchmany(chunk_rows)
+        if not rows:
+            return
+        yield np.array(rows, dtype=np.float64)
+
+
+def _query(conn, device_type, since, until, humidity, wind_speed):
+    """Reading query and parameters; uses a wind_speed column when the table has one"""
+
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(thermal_readings)")}
+    if not columns:
+        raise ValueError('database has no thermal_readings table')
+    wind = "COALESCE(wind_speed, ?)" if 'wind_speed' in columns else "?"
+    query = (
+        f"SELECT temperature, ambient_temp, COALESCE(humidity, ?), solar_irradiance, {wind} "
+        "FROM thermal_readings WHERE device_type = ? AND temperature IS NOT NULL "
+        "AND ambient_temp IS NOT NULL AND solar_irradiance IS NOT NULL"
+    )
+    params = [humidity, wind_speed, device_type]
+    if since:
+        query += " AND timestamp >= ?"
+        params.append(since)
+    if until:
+        query += " AND timestamp < ?"
+        params.append(until)
+    return query, params
+
+
+def _complete(chunk, humidity, wind_speed):
+    """Rows of READING_FIELDS with the required values, humidity filled and a wind column appended"""
+
+    chunk = chunk[~np.isnan(chunk[:, [0, 1, 3]]).any(axis=1)]
+    chunk[np.isnan(chunk[:, 2]), 2] = humidity
+    return np.column_stack([chunk, np.full(len(chunk), float(wind_speed))])
+
+
+def _batched(chunks, chunk_rows):
+    """Regroup arrays of rows into chunks of about chunk_rows"""
+
+    pending, size = [], 0
+    for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= chunk_rows:
+            yield np.concatenate(pending)
+            pending, size = [], 0
+    if size:
+        yield np.concatenate(pending)
+
+
+def _sqlite_chunks(db_path, device_type, since, until, humidity, wind_speed, chunk_rows):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        query, params = _query(conn, device_type, since, until, humidity, wind_speed)
+        yield from _read_chunks(conn, query, params, chunk_rows)
+    finally:
+        conn.close()
+
+
+def _archive_chunks(archive, device_type, since, until, humidity, wind_speed):
+    """Rows from one ReadingArchive, one array per device slice"""
+
+    types = archive.manifest['dictionaries']['device_type']
+    if device_type not in types:
+        return
+    code = types.index(device_type)
+    for _, views in archive.iter_slices(('device_type', *READING_FIELDS), since=since, until=until):
+        rows = np.column_stack([views[name] for name in READING_FIELDS])[views['device_type'] == code]
+        if len(rows):
+            yield _complete(rows, humidity, wind_speed)
+
+
+def _partition_chunks(store, archives, device_type, since, until, humidity, wind_speed, chunk_rows):
+    """Archived months from their archive, the rest from their partitions; compacted months without one are skipped"""
+
+    archived = set(archives.months()) if archives else set()
+    for month in store.months_between(since, until):
+        if month in archived:
+            yield from _archive_chunks(archives.archive(month), device_type, since, until, humidity, wind_speed)
+        elif not store.is_compacted(month):
+            with store.attached(month) as conn:
+                rows = thermal_query.iter_readings(conn, READING_FIELDS, device_type=device_type,
+                                                   since=since, until=until)
+                while True:
+                    chunk = list(islice(rows, chunk_rows))
+                    if not chunk:
+                        break
+                    yield _complete(np.array(chunk, dtype=np.float64), humidity, wind_speed)
+
+
+def reading_source(path, device_type='panel', since=None, until=None, humidity=DEFAULT_HUMIDITY,
+                   wind_speed=DEFAULT_WIND_SPEED, chunk_rows=DEFAULT_CHUNK_ROWS, archive_root=None):
+    """
+    Chunked reader of calibration inputs
+
+    Args:
+        path: SQLite database, partition directory, archive root or one
+              archived month
+        archive_root: Archive root consulted first for a partition directory
+
+    Returns:
+        tuple: (kind, reader) where reader() starts a fresh pass and yields
+               float arrays with columns temperature, ambient_temp,
+               humidity, solar_irradiance and wind_speed
+    """
+
+    from thermal_archive import ArchiveSet, ReadingArchive
+    from thermal_partitions import PARTITION_GLOB, PartitionedStore
+
+    path = Path(path)
+    if path.is_file():
+        return 'sqlite', lambda: _sqlite_chunks(path, device_type, since, until, humidity, wind_speed, chunk_rows)
+    if (path / COLUMNAR_MANIFEST).exists():
+        archive = ReadingArchive(path)
+        return 'archive', lambda: _batched(
+            _archive_chunks(archive, device_type, since, until, humidity, wind_speed), chunk_rows)
+    if any(path.glob(PARTITION_GLOB)):
+        store = PartitionedStore(path)
+        archives = ArchiveSet(archive_root) if archive_root else None
+        return 'partitions', lambda: _batched(
+            _partition_chunks(store, archives, device_type, since, until, humidity, wind_speed, chunk_rows),
+            chunk_rows)
+    archives = ArchiveSet(path)
+    if not archives.months():
+        raise ValueError(f"{path} is not a database, partition directory or archive")
+    return 'archives', lambda: _batched(
+        (chunk for archive in archives.archives(since, until)
+         for chunk in _archive_chunks(archive, device_type, since, until, humidity, wind_speed)),
+        chunk_rows)
+
+
+def _pass(simulator, reader, theta, scale=None):
+    """
+    One streaming pass: normal equations and residual statistics at theta
+
+    With a scale, rows are Huber-weighted by their residual at theta.
+    """
+
+    k = len(theta)
+    normal = np.zeros((k, k))
+    rhs = np.zeros(k)
+    stats = {'rows_read': 0, 'rows_used': 0, 'weight': 0.0, 'squared_error': 0.0, 'absolute_error': 0.0}
+    for chunk in reader():
+        stats['rows_read'] += len(chunk)
+        panel_temp, ambient_temp, humidity, irradiance, wind_speed = chunk.T
+        solar_load = irradiance * SOLAR_LOAD_PER_IRRADIANCE
+        baseline_temp, rise, features = _features(simulator, ambient_temp, solar_load, humidity, wind_speed)
+        features, constant, usable = _linearize(theta, features, rise)
+        usable &= solar_load > 5  # Productive conditions only, as in the simulator's cycles
+
+        x, y = features[usable], (baseline_temp - panel_temp - constant)[usable]
+        residual = y - x @ theta
+        weight = np.ones(len(y))
+        if scale:
+            large = np.abs(residual) > HUBER_K * scale
+            weight[large] = HUBER_K * scale / np.abs(residual[large])
+
+        normal += (x * weight[:, None]).T @ x
+        rhs += (x * weight[:, None]).T @ y
+        stats['rows_used'] += len(y)
+        stats['weight'] += float(weight.sum())
+        stats['squared_error'] += float(residual @ residual)
+        stats['absolute_error'] += float(np.abs(residual).sum())
+    return normal, rhs, stats
+
+
+def _errors(stats):
+    used = stats['rows_used']
+    if not used:
+        return {'rmse': None, 'mae': None}
+    return {
+        'rmse': round(float(np.sqrt(stats['squared_error'] / used)), 4),
+        'mae': round(stats['absolute_error'] / used, 4)
+    }
+
+
+def _fit_warnings(converged, before, after, at_bounds):
+    """Reasons a fit should not be written without --force"""
+
+    warnings = []
+    if not converged:
+        warnings.append(f"did not converge within {MAX_PASSES} passes")
+    if before['rmse'] is not None and after['rmse'] is not None and after['rmse'] > before['rmse']:
+        warnings.append(f"RMSE rose from {before['rmse']} to {after['rmse']} °C")
+    for name in at_bounds:
+        warnings.append(f"{name} ended on its bound {PARAMETER_BOUNDS[name]}")
+    return warnings
+
+
+def calibrate(path, simulator=None, device_type='panel', since=None, until=None, robust=True,
+              chunk_rows=DEFAULT_CHUNK_ROWS, humidity=DEFAULT_HUMIDITY, wind_speed=DEFAULT_WIND_SPEED,
+              archive_root=None):
+    """
+    Fit the empirical cooling coefficients to recorded panel temperatures
+
+    Args:
+        path: SQLite database, partition directory or archive (see reading_source)
+        simulator: ThermalSimulator supplying starting values and fixed constants
+        device_type: Readings to use
+        since, until: Optional timestamp bounds
+        robust: Huber re-weighting instead of plain least squares
+        chunk_rows: Rows fetched per chunk
+        humidity, wind_speed: Values assumed where readings have none
+        archive_root: Archives to read in place of compacted or archived partitions
+
+    Returns:
+        dict: Parameter file contents (see write_parameter_file); fit
+              'warnings' lists why the result is unsafe to use, if it is
+    """
+
+    simulator = simulator or ThermalSimulator()
+    low, high = _coefficient_bounds()
+    prior = np.clip(_coefficients(simulator), low, high)
+    kind, reader = reading_source(path, device_type, since, until, humidity, wind_speed, chunk_rows, archive_root)
+
+    theta, scale, passes = prior.copy(), None, 0
+    before, converged = None, False
+    for passes in range(1, MAX_PASSES + 1):
+        weighted = scale is not None
+        normal, rhs, stats = _pass(simulator, reader, theta, scale)
+        before = before or stats
+        if not stats['rows_used']:
+            raise ValueError('no usable readings (need productive-hour panel readings with ambient and irradiance)')
+
+        # Ridge penalty relative to each starting value keeps collinear terms near them
+        penalty = np.diag(RIDGE * stats['weight'] / np.maximum(prior**2, 1e-12))
+        updated = np.linalg.solve(normal + penalty, rhs + penalty @ prior)
+        updated = np.clip(updated, low, high)
+        change = np.max(np.abs(updated - theta) / np.abs(theta))
+        theta = updated
+        if robust:
+            scale = np.sqrt(stats['squared_error'] / stats['rows_used']) or None
+        if change < TOLERANCE and (weighted or not robust):
+            converged = True
+            break
+
+    _, _, after = _pass(simulator, reader, theta)
+
+    fitted = dict(zip(FITTED_PARAMETERS, theta.tolist()))
+    fitted['RADIATIVE_COOLING_DIVISOR'] = 1 / fitted['RADIATIVE_COOLING_DIVISOR']
+    fitted = {name: round(value, 6) for name, value in fitted.items()}
+    at_bounds = [
+        name for name, value, lower, upper in zip(FITTED_PARAMETERS, theta, low, high)
+        if np.isclose(value, lower) or np.isclose(value, upper)
+    ]
+    errors_before, errors_after = _errors(before), _errors(after)
+
+    return {
+        'format': PARAMETER_FILE_FORMAT,
+        'format_version': PARAMETER_FILE_VERSION,
+        'model_version': MODEL_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'parameter_hash': hashlib.sha256(json.dumps(fitted, sort_keys=True).encode()).hexdigest()[:16],
+        'source': {
+            'path': str(path),
+            'reader': kind,
+            'archive_root': str(archive_root) if archive_root else None,
+            'device_type': device_type,
+            'since': since,
+            'until': until,
+            'rows_read': after['rows_read'],
+            'rows_used': after['rows_used'],
+            'assumed_humidity': humidity,
+            'assumed_wind_speed': wind_speed
+        },
+        'fit': {
+            'method': 'huber' if robust else 'least_squares',
+            'passes': passes,
+            'converged': converged,
+            'before': errors_before,
+            'after': errors_after,
+            'at_bounds': at_bounds,
+            'warnings': _fit_warnings(converged, errors_before, errors_after, at_bounds),
+            'initial_parameters': {name: getattr(simulator, name) for name in FITTED_PARAMETERS}
+        },
+        'parameters': fitted
+    }
+
+
+def write_parameter_file(calibration, path, force=False):
+    """
+    Write a calibration result as a parameter file
+
+    Raises:
+        ValueError: The fit has warnings (see calibrate) and force is False
+    """
+
+    warnings = calibration['fit'].get('warnings')
+    if warnings and not force:
+        raise ValueError(f"refusing to write an unsafe fit: {'; '.join(warnings)}")
+    with open(path, 'w') as f:
+        json.dump(calibration, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit thermal model coefficients to recorded readings')
+    parser.add_argument('source', help='SQLite database, partition directory or archive root')
+    parser.add_argument('--archive-root', help='Archives to read for archived months of a partition directory')
+    parser.add_argument('--output', default='thermal_parameters.json', help='Parameter file to write')
+    parser.add_argument('--params', help='Start from an existing parameter file')
+    parser.add_argument('--device-type', default='panel', help='Readings to fit')
+    parser.add_argument('--since', help='Only readings at or after this timestamp')
+    parser.add_argument('--until', help='Only readings before this timestamp')
+    parser.add_argument('--least-squares', action='store_true', help='Plain least squares instead of Huber weights')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help='Rows fetched per chunk')
+    parser.add_argument('--humidity', type=float, default=DEFAULT_HUMIDITY, help='Humidity assumed where missing (%%)')
+    parser.add_argument('--wind', type=float, default=DEFAULT_WIND_SPEED, help='Wind speed assumed where missing (m/s)')
+    parser.add_argument('--force', action='store_true', help='Write the parameter file even if the fit has warnings')
+    args = parser.parse_args()
+
+    simulator = ThermalSimulator()
+    if args.params:
+        simulator.load_parameters(args.params)
+    calibration = calibrate(
+        args.source, simulator,
+        device_type=args.device_type,
+        since=args.since,
+        until=args.until,
+        robust=not args.least_squares,
+        chunk_rows=args.chunk_rows,
+        humidity=args.humidity,
+        wind_speed=args.wind,
+        archive_root=args.archive_root
+    )
+    print(json.dumps({key: calibration[key] for key in ('source', 'fit', 'parameters')}, indent=2))
+    for warning in calibration['fit']['warnings']:
+        print(f"⚠️  {warning}", file=sys.stderr)
+    if calibration['fit']['warnings'] and not args.force:
+        print(f"❌ Not writing {args.output}; rerun with --force to keep this fit", file=sys.stderr)
+        sys.exit(1)
+    write_parameter_file(calibration, args.output, force=args.force)
+    print(f"\n📄 Parameters saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
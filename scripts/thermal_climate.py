@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+HHDAO Site Climate Profiles
+Month- and site-specific daily weather profiles for the thermal simulator
+"""
+
+import json
+from datetime import date
+
+import numpy as np
+
+# Approximate monthly climate normals (Jan..Dec)
+SITE_CLIMATES = {
+    'urgam_valley': {
+        'lat': 30.1652, 'lng': 78.8487, 'altitude_m': 1652,
+        'temp_min': [3, 5, 9, 13, 17, 20, 20, 19, 17, 12, 7, 4],
+        'temp_max': [15, 17, 22, 27, 30, 30, 27, 26, 26, 24, 20, 16],
+        'humidity': [62, 60, 52, 45, 48, 68, 85, 87, 78, 62, 58, 62],
+        'wind_speed': [3.0, 3.5, 4.0, 4.5, 4.5, 4.0, 3.0, 2.5, 2.5, 2.5, 2.5, 2.5],
+        'clearness': [0.75, 0.72, 0.74, 0.76, 0.74, 0.58, 0.42, 0.45, 0.62, 0.80, 0.80, 0.77]
+    },
+    'dehradun': {
+        'lat': 30.3165, 'lng': 78.0322, 'altitude_m': 640,
+        'temp_min': [6, 8, 12, 16, 20, 23, 23, 23, 21, 15, 10, 6],
+        'temp_max': [19, 22, 26, 32, 35, 34, 30, 29, 29, 28, 25, 21],
+        'humidity': [70, 64, 55, 45, 47, 63, 84, 87, 80, 68, 66, 70],
+        'wind_speed': [2.5, 3.0, 3.5, 4.0, 4.0, 3.5, 2.5, 2.0, 2.0, 2.0, 2.0, 2.0],
+        'clearness': [0.70, 0.70, 0.72, 0.74, 0.72, 0.56, 0.40, 0.43, 0.60, 0.78, 0.78, 0.72]
+    },
+    'delhi': {
+        'lat': 28.6139, 'lng': 77.2090, 'altitude_m': 216,
+        'temp_min': [7, 10, 15, 21, 26, 28, 27, 27, 25, 19, 13, 8],
+        'temp_max': [21, 24, 30, 37, 40, 39, 35, 34, 34, 33, 28, 23],
+        'humidity': [70, 60, 48, 35, 38, 53, 75, 80, 72, 58, 60, 68],
+        'wind_speed': [2.5, 3.0, 3.5, 4.0, 4.0, 4.0, 3.5, 3.0, 3.0, 2.5, 2.0, 2.0],
+        'clearness': [0.62, 0.66, 0.68, 0.70, 0.68, 0.60, 0.48, 0.50, 0.62, 0.70, 0.66, 0.62]
+    }
+}
+
+ARRAY_PEAK_LOAD_KW = 80  # Solar load at 1000 W/m² plane-of-array irradiance (matches the legacy daily profile)
+CLEAR_SKY_CLEARNESS = 0.75  # Monthly clearness index of a cloudless month
+MID_MONTH_DAYS = np.array([15, 46, 74, 105, 135, 166, 196, 227, 258, 288, 319, 349], dtype=np.float64)
+
+
+def load_sites(path):
+    """Load site climates from a JSON file shaped like SITE_CLIMATES"""
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def resolve_site(site):
+    """Site climate dict for a built-in site name, or the dict itself"""
+
+    if isinstance(site, dict):
+        return site
+    if site not in SITE_CLIMATES:
+        raise ValueError(f"Unknown site '{site}' (known: {', '.join(sorted(SITE_CLIMATES))})")
+    return SITE_CLIMATES[site]
+
+
+def _seasonal(values, day_of_year):
+    """Interpolate mid-month normals to days of year, wrapping across the new year"""
+
+    values = np.asarray(values, dtype=np.float64)
+    days = np.concatenate([MID_MONTH_DAYS - 365, MID_MONTH_DAYS, MID_MONTH_DAYS + 365])
+    return np.interp(day_of_year, days, np.tile(values, 3))
+
+
+def site_weather(site, day_of_year, hours):
+    """
+    Weather for one site at day-of-year and hour-of-day values
+
+    Temperature follows the same diurnal sine as the legacy valley profile,
+    between the seasonal minimum and maximum. Solar load follows clear-sky
+    plane-of-array irradiance for the site's array (thermal_solar; hours are
+    local clock time at the site's 'utc_offset', IST by default), scaled by
+    monthly clearness below CLEAR_SKY_CLEARNESS. day_of_year and hours
+    broadcast against each other.
+
+    Args:
+        site: Site name or climate dict (see SITE_CLIMATES)
+        day_of_year: Day-of-year values (1-365)
+        hours: Hour-of-day values
+
+    Returns:
+        tuple: temps, solar_loads, humidities, wind_speeds arrays
+    """
+
+    site = resolve_site(site)
+    day_of_year, hours = np.broadcast_arrays(
+        np.asarray(day_of_year, dtype=np.float64), np.asarray(hours, dtype=np.float64)
+    )
+    min_temp = _seasonal(site['temp_min'], day_of_year)
+    max_temp = _seasonal(site['temp_max'], day_of_year)
+    humidity = _seasonal(site['humidity'], day_of_year)
+    wind = _seasonal(site['wind_speed'], day_of_year)
+    clearness = _seasonal(site['clearness'], day_of_year)
+
+    temps = min_temp + (max_temp - min_temp) * np.sin(np.pi * (hours - 6) / 12)
+    temps = np.clip(temps, min_temp, max_temp)
+
+    # Clear-sky plane-of-array irradiance from sun geometry, dimmed on cloudier months
+    from thermal_solar import DEFAULT_UTC_OFFSET, local_hours_poa
+    poa = local_hours_poa(site, day_of_year, hours, site.get('utc_offset', DEFAULT_UTC_OFFSET))
+    solar_loads = ARRAY_PEAK_LOAD_KW * poa / 1000 * np.minimum(1, clearness / CLEAR_SKY_CLEARNESS)
+
+    # Diurnal swings around the seasonal daily means
+    humidities = np.clip(humidity + 15 * (np.sin(np.pi * hours / 24) - 2 / np.pi), 0, 100)
+    wind_speeds = np.clip(wind * (1 + (5 / 3) * np.sin(np.pi * (hours - 12) / 12)), 0, None)
+
+    return temps, solar_loads, humidities, wind_speeds
+
+
+def daily_weather(site, date_str, hours):
+    """Weather for one site on an ISO date at the given hours of day"""
+
+    day_of_year = min(date.fromisoformat(date_str).timetuple().tm_yday, 365)
+    return site_weather(site, day_of_year, hours)
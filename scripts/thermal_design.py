@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+HHDAO Thermal Design Optimizer
+Parametric search over terracotta coverage and forced air circulation
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DEFAULT_CONSTRAINTS = {
+    'max_budget_inr': 500000,  # ₹5 lakh
+    'max_maintenance_hours_month': 20,
+    'min_efficiency_gain': 0.05,  # 5%
+    'water_savings_target': 0.8   # 80%
+}
+
+# Design-space bounds
+MAX_AIR_CIRCULATION_KW = 2.0
+COARSE_GRID_POINTS = 17  # Per axis, used to bound and prune regions
+
+# Objective resolution of the reported front: designs closer than this on
+# every objective are interchangeable, so one per epsilon box is kept
+DEFAULT_EPSILON = {
+    'cost_inr': 10000,
+    'roi': 0.02,  # 2 percentage points of 5-year ROI
+    'maintenance_hours': 0.5,
+    'water_savings': 0.01
+}
+
+# Cost and maintenance models (fitted to the original reference designs)
+COST_MODEL = {
+    'fixed_inr': 0,
+    'terracotta_full_coverage_inr': 500000,
+    'air_circulation_per_kw_inr': 80000
+}
+MAINTENANCE_MODEL = {
+    'fixed_hours': 2,
+    'terracotta_full_coverage_hours': 20,
+    'air_circulation_per_kw_hours': 5
+}
+
+# Revenue assumptions: 100 kW array, 300 productive days, 6 h/day, ₹4.5/kWh
+ARRAY_CAPACITY_KW = 100
+PRODUCTIVE_DAYS = 300
+PRODUCTIVE_HOURS = 6
+TARIFF_INR_KWH = 4.5
+ROI_YEARS = 5
+
+REFERENCE_DESIGNS = [
+    {'name': 'Basic Terracotta Vents', 'terracotta_coverage': 0.3, 'air_circulation_power': 0},
+    {'name': 'Enhanced Passive System', 'terracotta_coverage': 0.6, 'air_circulation_power': 0.2},
+    {'name': 'Hybrid Active-Passive', 'terracotta_coverage': 0.8, 'air_circulation_power': 1.0}
+]
+
+
+def design_cost(coverage, power):
+    """Capital cost (₹) of a design"""
+    return (COST_MODEL['fixed_inr']
+            + COST_MODEL['terracotta_full_coverage_inr'] * coverage
+            + COST_MODEL['air_circulation_per_kw_inr'] * power)
+
+
+def design_maintenance(coverage, power):
+    """Monthly maintenance hours of a design"""
+    return (MAINTENANCE_MODEL['fixed_hours']
+            + MAINTENANCE_MODEL['terracotta_full_coverage_hours'] * coverage
+            + MAINTENANCE_MODEL['air_circulation_per_kw_hours'] * power)
+
+
+def design_water_savings(coverage, power):
+    """Fraction of conventional cooling water replaced by the design"""
+    return coverage + (1 - coverage) * power / (power + 1)
+
+
+def design_roi(gain, coverage, power):
+    """Annual net revenue gain (₹) and ROI fraction over ROI_YEARS"""
+
+    cost = design_cost(coverage, power)
+    gross = gain * ARRAY_CAPACITY_KW * PRODUCTIVE_DAYS * PRODUCTIVE_HOURS * TARIFF_INR_KWH
+    fan_energy_cost = power * PRODUCTIVE_DAYS * PRODUCTIVE_HOURS * TARIFF_INR_KWH
+    annual = gross - fan_energy_cost
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = np.where(cost > 0, (annual * ROI_YEARS - cost) / np.where(cost > 0, cost, 1), np.inf)
+    return annual, roi
+
+
+def pareto_mask(objectives):
+    """
+    Boolean mask of non-dominated rows, all objectives minimized
+
+    Rows are visited in lexicographic order, so a row can only be dominated
+    by rows already on the front. Duplicates keep their first occurrence.
+    """
+
+    objectives = np.asarray(objectives, dtype=np.float64)
+    n, k = objectives.shape
+    order = np.lexsort(objectives.T[::-1])
+    front = np.empty((n, k))
+    size = 0
+    mask = np.zeros(n, dtype=bool)
+    for i in order:
+        row = objectives[i]
+        if size and np.any(np.all(front[:size] <= row, axis=1)):
+            continue
+        front[size] = row
+        size += 1
+        mask[i] = True
+    return mask
+
+
+def _dominated_by(front, candidates, block=4096):
+    """Mask of candidates weakly dominated by any front row (minimized objectives)"""
+
+    dominated = np.zeros(len(candidates), dtype=bool)
+    if not len(front):
+        return dominated
+    for start in range(0, len(candidates), block):
+        chunk = candidates[start:start + block][:, None, :]
+        dominated[start:start + block] = np.any(np.all(front[None, :, :] <= chunk, axis=2), axis=1)
+    return dominated
+
+
+def _objectives(cost, roi, maintenance, water):
+    """Stack design objectives oriented for minimization"""
+    return np.column_stack([cost, -roi, maintenance, -water])
+
+
+def _evaluate_chunk(task):
+    """Worker entry point: simulated gains for one chunk of candidates"""
+
+    simulator, coverage, power, weather, step_hours = task
+    return simulator.simulate_design_batch(coverage, power, *weather, step_hours=step_hours)['expected_gain']
+
+
+def _evaluate(simulator, coverage, power, weather, workers, step_hours=None, chunk_size=2048):
+    """Simulated gains for candidate designs, spread across worker processes"""
+
+    tasks = [
+        (simulator, coverage[i:i + chunk_size], power[i:i + chunk_size], weather, step_hours)
+        for i in range(0, len(coverage), chunk_size)
+    ]
+    if not tasks:
+        return np.empty(0)
+    if workers == 1 or len(tasks) == 1:
+        return np.concatenate([_evaluate_chunk(task) for task in tasks])
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        return np.concatenate(list(pool.map(_evaluate_chunk, tasks)))
+
+
+def _design_record(coverage, power, gain, meets_constraints=True, name=None):
+    """Presentation dict for one evaluated design"""
+
+    cost = float(design_cost(coverage, power))
+    annual, roi = design_roi(gain, coverage, power)
+    annual, roi = float(annual), float(roi)
+    record = {'name': name} if name else {}
+    record.update({
+        'terracotta_coverage': round(float(coverage), 3),
+        'air_circulation_power': round(float(power), 3),
+        'cost_inr': round(cost, 0),
+        'maintenance_hours': round(float(design_maintenance(coverage, power)), 1),
+        'water_savings': round(float(design_water_savings(coverage, power)), 3),
+        'expected_gain': round(float(gain), 4),
+        'meets_constraints': bool(meets_constraints),
+        'annual_revenue_gain': round(annual, 2),
+        'roi_5_year': round(roi * 100, 1),
+        'payback_years': round(cost / annual, 1) if annual > 0 else None
+    })
+    return record
+
+
+def _with_defaults(defaults, overrides, kind):
+    """Overrides merged into defaults; ValueError on names the defaults lack"""
+
+    unknown = set(overrides or {}) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown {kind} keys: {sorted(unknown)} (expected: {', '.join(defaults)})")
+    return dict(defaults, **(overrides or {}))
+
+
+def search_design_space(simulator, constraints=None, candidates=10_000, workers=None, transient=False,
+                        epsilon=None, top=None):
+    """
+    Sweep terracotta coverage and air circulation power for epsilon-Pareto-optimal designs
+
+    Candidates lie on a regular grid over coverage [0, 1] and air circulation
+    power [0, MAX_AIR_CIRCULATION_KW]. Analytic constraints (budget,
+    maintenance, water savings) are applied before any simulation.
+
+    Cost, maintenance and water savings trade off exactly, so nearly every
+    feasible design is Pareto-optimal and plain dominance prunes nothing.
+    Objectives are therefore compared in epsilon boxes. A coarse grid is
+    simulated first; since the simulated gain never decreases with coverage
+    or fan power, each candidate's gain is bounded by the coarse node above
+    it, and candidates whose optimistic box is weakly dominated by the
+    coarse front's boxes are pruned (a coarse design is within epsilon of
+    them on every objective). Survivors are simulated in parallel and the
+    front keeps one design per non-dominated box.
+
+    Args:
+        simulator: ThermalSimulator providing the physics
+        constraints: Overrides of DEFAULT_CONSTRAINTS (ValueError on unknown keys)
+        candidates: Approximate number of grid candidates
+        workers: Worker processes (defaults to CPU count)
+        transient: Score designs with the transient thermal-mass model over
+            the typical day instead of independent steady states
+        epsilon: Overrides of DEFAULT_EPSILON
+        top: Report only this many front designs, best ROI first
+
+    Returns:
+        dict: Epsilon-Pareto front over cost, ROI, maintenance and water
+              savings, the recommended design, evaluated reference designs
+              and search stats
+    """
+
+    constraints = _with_defaults(DEFAULT_CONSTRAINTS, constraints, 'constraint')
+    epsilon = _with_defaults(DEFAULT_EPSILON, epsilon, 'epsilon')
+    box_size = np.array([epsilon['cost_inr'], epsilon['roi'], epsilon['maintenance_hours'], epsilon['water_savings']])
+    workers = workers or os.cpu_count() or 1
+
+    hours = np.arange(0, 24, 0.5)
+    temps, solar_loads, humidities, wind_speeds = simulator._weather_profile(hours)
+    if transient:
+        weather, step_hours = (temps, solar_loads, humidities, wind_speeds), 0.5
+    else:
+        productive = solar_loads > 5
+        weather = (temps[productive], solar_loads[productive], humidities[productive], wind_speeds[productive])
+        step_hours = None
+
+    def feasible(coverage, power):
+        return ((design_cost(coverage, power) <= constraints['max_budget_inr'])
+                & (design_maintenance(coverage, power) <= constraints['max_maintenance_hours_month'])
+                & (design_water_savings(coverage, power) >= constraints['water_savings_target']))
+
+    def objectives(coverage, power, gain):
+        _, roi = design_roi(gain, coverage, power)
+        return _objectives(design_cost(coverage, power), roi,
+                           design_maintenance(coverage, power), design_water_savings(coverage, power))
+
+    def boxes(objectives):
+        return np.floor(objectives / box_size)
+
+    # Coarse grid: exact gains used both as seed front and as region upper bounds
+    coarse_axis_c = np.linspace(0, 1, COARSE_GRID_POINTS)
+    coarse_axis_p = np.linspace(0, MAX_AIR_CIRCULATION_KW, COARSE_GRID_POINTS)
+    coarse_c, coarse_p = (a.ravel() for a in np.meshgrid(coarse_axis_c, coarse_axis_p, indexing='ij'))
+    coarse_gain = simulator.simulate_design_batch(coarse_c, coarse_p, *weather, step_hours=step_hours)['expected_gain']
+    coarse_ok = feasible(coarse_c, coarse_p) & (coarse_gain >= constraints['min_efficiency_gain'])
+    seed_boxes = boxes(objectives(coarse_c[coarse_ok], coarse_p[coarse_ok], coarse_gain[coarse_ok]))
+    seed_front = seed_boxes[pareto_mask(seed_boxes)] if len(seed_boxes) else seed_boxes
+
+    # Full candidate grid
+    per_axis = max(2, int(round(np.sqrt(candidates))))
+    axis_c = np.linspace(0, 1, per_axis)
+    axis_p = np.linspace(0, MAX_AIR_CIRCULATION_KW, per_axis)
+    cand_c, cand_p = (a.ravel() for a in np.meshgrid(axis_c, axis_p, indexing='ij'))
+    total = len(cand_c)
+
+    keep = feasible(cand_c, cand_p)
+    pruned_infeasible = int(total - keep.sum())
+    cand_c, cand_p = cand_c[keep], cand_p[keep]
+
+    # Upper bound on gain from the enclosing coarse node
+    ic = np.searchsorted(coarse_axis_c, cand_c - 1e-12)
+    ip = np.searchsorted(coarse_axis_p, cand_p - 1e-12)
+    gain_bound = coarse_gain.reshape(COARSE_GRID_POINTS, COARSE_GRID_POINTS)[ic, ip]
+    optimistic = boxes(objectives(cand_c, cand_p, gain_bound))
+    dominated = _dominated_by(seed_front, optimistic) | (gain_bound < constraints['min_efficiency_gain'])
+    pruned_dominated = int(dominated.sum())
+    cand_c, cand_p = cand_c[~dominated], cand_p[~dominated]
+
+    gains = _evaluate(simulator, cand_c, cand_p, weather, workers, step_hours)
+    viable = gains >= constraints['min_efficiency_gain']
+    cand_c, cand_p, gains = cand_c[viable], cand_p[viable], gains[viable]
+
+    # Final front over survivors and feasible coarse nodes
+    all_c = np.concatenate([cand_c, coarse_c[coarse_ok]])
+    all_p = np.concatenate([cand_p, coarse_p[coarse_ok]])
+    all_gain = np.concatenate([gains, coarse_gain[coarse_ok]])
+    front = []
+    if len(all_c):
+        exact = objectives(all_c, all_p, all_gain)
+        # Best-ROI design first, so it represents its box
+        order = np.argsort(exact[:, 1], kind='stable')
+        on_front = order[pareto_mask(boxes(exact[order]))]
+        front = [
+            _design_record(c, p, g)
+            for c, p, g in zip(all_c[on_front], all_p[on_front], all_gain[on_front])
+        ]
+        front.sort(key=lambda d: d['roi_5_year'], reverse=True)
+    front_size = len(front)
+
+    reference = simulator.simulate_design_batch(
+        [d['terracotta_coverage'] for d in REFERENCE_DESIGNS],
+        [d['air_circulation_power'] for d in REFERENCE_DESIGNS],
+        *weather, step_hours=step_hours
+    )['expected_gain']
+    reference_designs = []
+    for design, gain in zip(REFERENCE_DESIGNS, reference):
+        c, p = design['terracotta_coverage'], design['air_circulation_power']
+        ok = bool(feasible(c, p)) and gain >= constraints['min_efficiency_gain']
+        reference_designs.append(_design_record(c, p, gain, ok, design['name']))
+
+    return {
+        'pareto_front': front[:top] if top else front,
+        'recommended': front[0] if front else None,
+        'reference_designs': reference_designs,
+        'constraints': constraints,
+        'search': {
+            'model': 'transient' if transient else 'steady_state',
+            'epsilon': epsilon,
+            'candidates': total,
+            'pruned_infeasible': pruned_infeasible,
+            'pruned_dominated': pruned_dominated,
+            'front_size': front_size,
+            'simulated': int(len(gains) + (~viable).sum()) + len(coarse_c)
+        }
+    }
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+HHDAO Fleet Thermal Simulation
+Daily cooling performance across many arrays with shared-memory workers
+"""
+
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from thermal_results import ColumnarResult
+
+# Structure-of-arrays layout: one row per field, one column per array
+FLEET_PARAMETERS = ('capacity_kw', 'ambient_offset', 'humidity_offset', 'wind_factor', 'irradiance_factor')
+FLEET_DEFAULTS = {
+    'capacity_kw': 100.0,
+    'ambient_offset': 0.0,  # °C relative to the valley profile
+    'humidity_offset': 0.0,  # % relative humidity
+    'wind_factor': 1.0,
+    'irradiance_factor': 1.0
+}
+FLEET_OUTPUTS = (
+    'energy_gain_kwh', 'water_saved_liters', 'average_temp_reduction',
+    'average_efficiency_gain', 'revenue_gain_inr', 'productive_steps'
+)
+
+REFERENCE_ARRAY_KW = 100  # Capacity the daily load profile describes
+STEP_HOURS = 0.5
+SLICES_PER_WORKER = 4
+
+
+def synthetic_fleet(n_arrays, seed=0):
+    """Random fleet of arrays with varied sizes and microclimates"""
+
+    rng = np.random.default_rng(seed)
+    params = np.empty((len(FLEET_PARAMETERS), n_arrays))
+    params[FLEET_PARAMETERS.index('capacity_kw')] = rng.uniform(50, 500, n_arrays)
+    params[FLEET_PARAMETERS.index('ambient_offset')] = rng.normal(0, 2, n_arrays)
+    params[FLEET_PARAMETERS.index('humidity_offset')] = rng.normal(0, 5, n_arrays)
+    params[FLEET_PARAMETERS.index('wind_factor')] = rng.uniform(0.6, 1.4, n_arrays)
+    params[FLEET_PARAMETERS.index('irradiance_factor')] = rng.uniform(0.85, 1.05, n_arrays)
+    return params
+
+
+def load_fleet_csv(path):
+    """
+    Load fleet parameters from a CSV file
+
+    Columns are named after FLEET_PARAMETERS; missing columns take
+    FLEET_DEFAULTS. An optional 'array_id' column is returned alongside.
+    """
+
+    columns = {name: [] for name in FLEET_PARAMETERS}
+    array_ids = []
+    with open(path, newline='') as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            array_ids.append(row.get('array_id') or f"ARRAY_{i + 1:05d}")
+            for name in FLEET_PARAMETERS:
+                value = row.get(name)
+                columns[name].append(float(value) if value not in (None, '') else FLEET_DEFAULTS[name])
+
+    params = np.array([columns[name] for name in FLEET_PARAMETERS], dtype=np.float64)
+    return params.reshape(len(FLEET_PARAMETERS), len(array_ids)), array_ids
+
+
+def _simulate_slice(task):
+    """Worker entry point: simulate arrays [start, stop) in place in shared memory"""
+
+    simulator, params_name, outputs_name, n_arrays, start, stop = task
+    params_shm = shared_memory.SharedMemory(name=params_name)
+    outputs_shm = shared_memory.SharedMemory(name=outputs_name)
+    try:
+        params = np.ndarray((len(FLEET_PARAMETERS), n_arrays), dtype=np.float64, buffer=params_shm.buf)
+        outputs = np.ndarray((len(FLEET_OUTPUTS), n_arrays), dtype=np.float64, buffer=outputs_shm.buf)
+        field = {name: params[i, start:stop, None] for i, name in enumerate(FLEET_PARAMETERS)}
+
+        hours = np.arange(0, 24, STEP_HOURS)
+        temps, solar_loads, humidities, wind_speeds = simulator._weather_profile(hours)
+        batch_loads = solar_loads[None, :] * field['irradiance_factor']
+        batch = simulator.simulate_cooling_batch(
+            temps[None, :] + field['ambient_offset'],
+            batch_loads,
+            np.clip(humidities[None, :] + field['humidity_offset'], 0, 100),
+            wind_speeds[None, :] * field['wind_factor']
+        )
+
+        # Only during productive hours; physics per reference array, scaled by capacity
+        productive = batch_loads > 5
+        steps = productive.sum(axis=1)
+        scale = field['capacity_kw'][:, 0] / REFERENCE_ARRAY_KW
+        energy = np.sum(batch['power_gain_kw'], axis=1, where=productive) * STEP_HOURS * scale
+        with np.errstate(invalid='ignore', divide='ignore'):
+            outputs[0, start:stop] = energy
+            outputs[1, start:stop] = np.sum(batch['water_saved'], axis=1, where=productive) * STEP_HOURS * scale
+            outputs[2, start:stop] = np.sum(batch['temp_reduction'], axis=1, where=productive) / steps
+            outputs[3, start:stop] = np.sum(batch['efficiency_gain'], axis=1, where=productive) / steps
+            outputs[4, start:stop] = energy * 4.5
+            outputs[5, start:stop] = steps
+    finally:
+        params_shm.close()
+        outputs_shm.close()
+
+
+def simulate_fleet(simulator, params, workers=None, array_ids=None):
+    """
+    Simulate one day of cooling performance for every array in a fleet
+
+    Parameters live in a shared-memory buffer that workers attach to by
+    name, and each worker writes its slice of results into a shared output
+    buffer, so no per-array data is pickled between processes.
+
+    Args:
+        simulator: ThermalSimulator providing the physics
+        params: Array of shape (len(FLEET_PARAMETERS), n_arrays)
+        workers: Worker processes (defaults to CPU count)
+        array_ids: Optional identifiers, one per array
+
+    Returns:
+        dict: Columnar per-array results and a fleet-level summary
+    """
+
+    params = np.ascontiguousarray(params, dtype=np.float64)
+    n_arrays = params.shape[1]
+    workers = workers or os.cpu_count() or 1
+
+    params_shm = shared_memory.SharedMemory(create=True, size=max(params.nbytes, 1))
+    outputs_shm = shared_memory.SharedMemory(create=True, size=max(len(FLEET_OUTPUTS) * n_arrays * 8, 1))
+    try:
+        np.ndarray(params.shape, dtype=np.float64, buffer=params_shm.buf)[:] = params
+        bounds = np.linspace(0, n_arrays, min(n_arrays, workers * SLICES_PER_WORKER) + 1, dtype=int)
+        tasks = [
+            (simulator, params_shm.name, outputs_shm.name, n_arrays, int(start), int(stop))
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+        if workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                _simulate_slice(task)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(_simulate_slice, tasks))
+
+        outputs = np.ndarray((len(FLEET_OUTPUTS), n_arrays), dtype=np.float64, buffer=outputs_shm.buf).copy()
+    finally:
+        params_shm.close()
+        params_shm.unlink()
+        outputs_shm.close()
+        outputs_shm.unlink()
+
+    per_array = {name: outputs[i] for i, name in enumerate(FLEET_OUTPUTS)}
+    capacity = params[FLEET_PARAMETERS.index('capacity_kw')]
+    productive = per_array['productive_steps'] > 0
+
+    return {
+        'array_ids': array_ids or [f"ARRAY_{i + 1:05d}" for i in range(n_arrays)],
+        'arrays': per_array,
+        'fleet_summary': {
+            'arrays': n_arrays,
+            'total_capacity_kw': round(float(capacity.sum()), 1),
+            'total_energy_gain_kwh': round(float(per_array['energy_gain_kwh'].sum()), 2),
+            'total_water_saved_liters': round(float(per_array['water_saved_liters'].sum()), 1),
+            'average_temp_reduction': round(float(per_array['average_temp_reduction'][productive].mean()), 2) if productive.any() else None,
+            'average_efficiency_gain': round(float(per_array['average_efficiency_gain'][productive].mean()), 2) if productive.any() else None,
+            'estimated_revenue_gain_inr': round(float(per_array['revenue_gain_inr'].sum()), 2)
+        }
+    }
+
+
+def fleet_result(result):
+    """Columnar view of a simulate_fleet result; rounding happens on presentation"""
+
+    precision = {
+        'energy_gain_kwh': 2, 'water_saved_liters': 1, 'average_temp_reduction': 2,
+        'average_efficiency_gain': 2, 'revenue_gain_inr': 2, 'productive_steps': 0
+    }
+    return ColumnarResult(
+        {'array_ids': result['array_ids'], 'arrays': None, 'fleet_summary': result['fleet_summary']},
+        'arrays', {name: result['arrays'][name] for name in FLEET_OUTPUTS}, precision, orient='columns'
+    )
+
+
+def fleet_result_json(result):
+    """JSON-ready view of a simulate_fleet result"""
+
+    return fleet_result(result).to_dict()
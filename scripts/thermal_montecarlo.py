@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+HHDAO Thermal Monte Carlo Engine
+Propagates weather uncertainty through the waterless cooling model
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from thermal_simulation import ThermalSimulator
+
+MONTE_CARLO_METRICS = ('temp_reduction', 'efficiency_gain', 'revenue_gain_daily')
+DEFAULT_PERCENTILES = (10, 50, 90)
+DEFAULT_BLOCK_SIZE = 65536  # Samples drawn from one RNG stream
+
+
+def default_weather_distributions(simulator=None):
+    """Weather input distributions for Urgam Valley conditions"""
+
+    simulator = simulator or ThermalSimulator()
+    return {
+        'ambient_temp': {'dist': 'normal', 'mean': 32, 'std': 6, 'min': -10, 'max': 50},
+        'solar_load': {'dist': 'triangular', 'left': 5, 'mode': 50, 'right': 80},
+        'humidity': {'dist': 'uniform', 'low': simulator.HUMIDITY_RANGE[0], 'high': simulator.HUMIDITY_RANGE[1]},
+        'wind_speed': {'dist': 'uniform', 'low': simulator.WIND_SPEED_RANGE[0], 'high': simulator.WIND_SPEED_RANGE[1]}
+    }
+
+
+def _sample(rng, spec, size):
+    """Draw samples for one input from its distribution spec"""
+
+    dist = spec['dist']
+    if dist == 'normal':
+        values = rng.normal(spec['mean'], spec['std'], size)
+    elif dist == 'uniform':
+        values = rng.uniform(spec['low'], spec['high'], size)
+    elif dist == 'triangular':
+        values = rng.triangular(spec['left'], spec['mode'], spec['right'], size)
+    elif dist == 'lognormal':
+        values = rng.lognormal(spec['mean'], spec['sigma'], size)
+    elif dist == 'constant':
+        values = np.full(size, float(spec['value']))
+    else:
+        raise ValueError(f"Unknown distribution: {dist}")
+
+    if 'min' in spec or 'max' in spec:
+        values = np.clip(values, spec.get('min', -np.inf), spec.get('max', np.inf))
+    return values
+
+
+def _simulate_block(task):
+    """Worker entry point: sample and simulate one block of conditions"""
+
+    simulator, seed_sequence, size, distributions = task
+    rng = np.random.default_rng(seed_sequence)
+    inputs = {
+        name: _sample(rng, distributions[name], size)
+        for name in ('ambient_temp', 'solar_load', 'humidity', 'wind_speed')
+    }
+
+    batch = simulator.simulate_cooling_batch(**inputs)
+    return {metric: batch[metric] for metric in MONTE_CARLO_METRICS}
+
+
+def run_monte_carlo(samples=1_000_000, seed=42, workers=None, distributions=None,
+                    percentiles=DEFAULT_PERCENTILES, block_size=DEFAULT_BLOCK_SIZE, simulator=None):
+    """
+    Estimate percentile bands of cooling predictions under weather uncertainty
+
+    Samples are split into fixed-size blocks, each with its own RNG stream
+    spawned from the root seed, so results do not depend on the worker count.
+
+    Args:
+        samples: Total number of weather samples
+        seed: Root seed for the RNG streams
+        workers: Worker processes (defaults to CPU count, 1 runs in-process)
+        distributions: Per-input overrides of default_weather_distributions()
+        percentiles: Percentiles to report for each metric
+        block_size: Samples per RNG stream
+        simulator: ThermalSimulator holding the model constants (defaults if None)
+
+    Returns:
+        dict: Percentile bands and means per metric
+    """
+
+    simulator = simulator or ThermalSimulator()
+    specs = default_weather_distributions(simulator)
+    specs.update(distributions or {})
+
+    block_sizes = [block_size] * (samples // block_size)
+    if samples % block_size:
+        block_sizes.append(samples % block_size)
+    streams = np.random.SeedSequence(seed).spawn(len(block_sizes))
+    tasks = [(simulator, stream, size, specs) for stream, size in zip(streams, block_sizes)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        blocks = [_simulate_block(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            blocks = list(pool.map(_simulate_block, tasks))
+
+    results = {}
+    for metric in MONTE_CARLO_METRICS:
+        values = np.concatenate([block[metric] for block in blocks])
+        bands = np.percentile(values, percentiles)
+        results[metric] = {
+            f"p{p:g}": round(float(v), 3) for p, v in zip(percentiles, bands)
+        }
+        results[metric]['mean'] = round(float(values.mean()), 3)
+
+    return {
+        'samples': samples,
+        'seed': seed,
+        'distributions': specs,
+        'percentiles': results
+    }
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+HHDAO Thermal Partitioned Storage
+One SQLite file per month of readings, with retention and compaction
+
+Writes are routed to the partition of each reading's month (UTC), each
+with the query indexes and rollups of a single-file database. Reads
+attach only the partitions overlapping the requested window, one at a
+time, to a single connection and chain their streamed results, so the
+thermal_query and thermal_rollups builders run unchanged against each.
+
+Retention compacts closed months in stages: with an archive_root they
+are first copied to columnar archives (thermal_archive), then raw
+readings and 1-minute rollups are dropped (hourly and daily rollups and
+alerts stay) and the file is vacuumed; optionally whole partitions are
+deleted after a horizon. Only closed months are ever touched, so writes, vacuums and
+backups stay bounded to recent files.
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import thermal_query
+import thermal_rollups
+from thermal_ingest import READING_COLUMNS, ReadingWriter, utc_timestamp
+
+PARTITION_GLOB = 'thermal_????_??.db'
+DEFAULT_RETENTION = {
+    'raw_months': 3,  # Closed months that keep raw readings and 1-minute rollups
+    'delete_months': None,  # Months after which a partition is deleted outright (None keeps rollups forever)
+    'archive_root': None  # Columnar archive directory; closed months are archived before compaction
+}
+MAX_OPEN_WRITERS = 3  # Partitions kept open for late or out-of-order readings
+
+
+def month_key(timestamp):
+    """'YYYY-MM' of a stored timestamp string or datetime"""
+
+    return thermal_query.timestamp_bound(timestamp)[:7]
+
+
+def _month_index(month):
+    year, number = month.split('-')
+    return int(year) * 12 + int(number) - 1
+
+
+def _partition_meta(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS thermal_partition (key TEXT PRIMARY KEY, value TEXT)")
+    return dict(conn.execute("SELECT key, value FROM thermal_partition"))
+
+
+class PartitionedWriter:
+    """
+    ReadingWriter-compatible writer that routes rows to monthly partitions
+
+    Readings without a timestamp are stamped now. Up to max_open partition
+    writers stay open; the least recently used is flushed and closed when
+    another month is needed. Late readings and alerts for a compacted month
+    are dropped with a warning and counted in rows_dropped.
+
+    With bulk=True, partitions that do not exist yet are loaded without
+    indexes or rollups, which are built in one pass when each is closed.
+    With defer_rollups=True existing partitions keep their indexes but
+    flushes skip the rollups (~80k instead of ~40k rows/s, see
+    thermal_rollups); they are caught up on close or fold_rollups().
+    """
+
+    def __init__(self, store, batch_rows=None, max_open=MAX_OPEN_WRITERS, bulk=False, defer_rollups=False):
+        self.store = store
+        self.batch_rows = batch_rows
+        self.max_open = max_open
+        self.bulk = bulk
+        self.defer_rollups = defer_rollups
+        self.writers = OrderedDict()
+        self.bulk_months = set()
+        self.compacted_months = set()
+        self.rows_written = 0
+        self.rows_dropped = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _writer(self, month, rows=1):
+        """Writer for a month's partition, or None (counting rows as dropped) if it is compacted"""
+
+        if month in self.writers:
+            self.writers.move_to_end(month)
+            return self.writers[month]
+        if month in self.compacted_months or (self.store.path(month).exists() and self.store.is_compacted(month)):
+            if month not in self.compacted_months:
+                self.compacted_months.add(month)
+                print(f"⚠️ Dropping late readings for compacted thermal partition {month}", file=sys.stderr)
+            self.rows_dropped += rows
+            return None
+        if len(self.writers) >= self.max_open:
+            self._close(*self.writers.popitem(last=False))
+        bulk = self.bulk and not self.store.path(month).exists()
+        writer = self.store.open_partition(month, self.batch_rows, bulk=bulk, defer_rollups=self.defer_rollups)
+        if bulk:
+            self.bulk_months.add(month)
+        self.writers[month] = writer
+        return writer
+
+    def _close(self, month, writer):
+        writer.close()
+        self.rows_written += writer.rows_written
+        bulk = month in self.bulk_months
+        if bulk or self.defer_rollups:
+            self.bulk_months.discard(month)
+            conn = sqlite3.connect(self.store.path(month))
+            try:
+                if bulk:
+                    thermal_query.migrate(conn)
+                thermal_rollups.catch_up(conn)  # Builds the rollups of a bulk-loaded partition
+            finally:
+                conn.close()
+
+    def add(self, reading):
+        self.add_many([reading])
+
+    def add_many(self, readings):
+        """Buffer readings (dicts or READING_COLUMNS tuples), grouped by month"""
+
+        now = utc_timestamp()
+        months = {}
+        for reading in readings:
+            if isinstance(reading, dict):
+                stamp = reading.get('timestamp')
+                if stamp is None:
+                    reading = dict(reading, timestamp=now)
+            else:
+                stamp = reading[0]
+                if stamp is None:
+                    reading = (now, *reading[1:])
+            months.setdefault(month_key(stamp or now), []).append(reading)
+        for month, rows in months.items():
+            writer = self._writer(month, len(rows))
+            if writer:
+                writer.add_many(rows)
+
+    def add_columns(self, columns):
+        """Buffer column-wise readings; each month's slice goes to its partition"""
+
+        stamps = columns.get('timestamp')
+        if stamps is None or isinstance(stamps, str):
+            rows = max((len(values) for values in columns.values()
+                        if not isinstance(values, str) and hasattr(values, '__len__')), default=1)
+            writer = self._writer(month_key(stamps or utc_timestamp()), rows)
+            if writer:
+                writer.add_columns(columns)
+            return
+
+        # Readings usually arrive time-ordered, so months are contiguous runs
+        keys = [stamp[:7] for stamp in stamps]
+        start = 0
+        for end in range(1, len(keys) + 1):
+            if end == len(keys) or keys[end] != keys[start]:
+                writer = self._writer(keys[start], end - start)
+                if writer:
+                    writer.add_columns({
+                        name: values[start:end] if not isinstance(values, str) and hasattr(values, '__len__') else values
+                        for name, values in columns.items()
+                    })
+                start = end
+
+    def add_alert(self, alert):
+        stamp = alert.get('timestamp') if isinstance(alert, dict) else alert[0]
+        writer = self._writer(month_key(stamp or utc_timestamp()), rows=0)
+        if writer:
+            writer.add_alert(alert)
+
+    def flush(self):
+        for writer in self.writers.values():
+            writer.flush()
+
+    def fold_rollups(self):
+        """Flush, then bring the rollups of open deferred partitions up to date"""
+
+        self.flush()
+        return sum(thermal_rollups.catch_up(writer.conn) for month, writer in self.writers.items()
+                   if month not in self.bulk_months)
+
+    def close(self):
+        while self.writers:
+            self._close(*self.writers.popitem(last=False))
+
+
+class PartitionedStore:
+    """
+    Directory of monthly thermal partitions (thermal_YYYY_MM.db)
+
+    Args:
+        root: Directory holding the partition files (created if missing)
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, month):
+        return self.root / f"thermal_{month.replace('-', '_')}.db"
+
+    def months(self):
+        """Months that have a partition, oldest first"""
+
+        return sorted(path.stem[len('thermal_'):].replace('_', '-') for path in self.root.glob(PARTITION_GLOB))
+
+    def months_between(self, since=None, until=None):
+        """Partitions that can hold rows in the half-open window [since, until)"""
+
+        months = self.months()
+        if since is not None:
+            months = [month for month in months if month >= month_key(since)]
+        if until is not None:
+            last = thermal_query.timestamp_bound(until)
+            months = [month for month in months if f"{month}-01 00:00:00" < last]
+        return months
+
+    def open_partition(self, month, batch_rows=None, bulk=False, defer_rollups=False):
+        """ReadingWriter on a month's partition, with indexes and rollups in place unless bulk"""
+
+        kwargs = {'batch_rows': batch_rows} if batch_rows else {}
+        writer = ReadingWriter(self.path(month), **kwargs)
+        if not bulk:
+            thermal_query.migrate(writer.conn)
+        meta = _partition_meta(writer.conn)
+        if 'month' not in meta:
+            writer.conn.execute("INSERT INTO thermal_partition VALUES ('month', ?)", (month,))
+        elif 'raw_dropped_at' in meta:
+            writer.close()
+            raise ValueError(f"partition {month} is compacted and no longer accepts raw readings")
+        return writer if bulk else thermal_rollups.attach(writer, deferred=defer_rollups)
+
+    def writer(self, batch_rows=None, max_open=MAX_OPEN_WRITERS, bulk=False, defer_rollups=False):
+        return PartitionedWriter(self, batch_rows, max_open, bulk, defer_rollups)
+
+    @contextmanager
+    def attached(self, month):
+        """Read-only connection with one partition attached; unqualified table names resolve to it"""
+
+        conn = sqlite3.connect('file::memory:', uri=True)
+        try:
+            conn.execute("ATTACH DATABASE ? AS partition", (f"file:{self.path(month)}?mode=ro",))
+            yield conn
+        finally:
+            conn.close()
+
+    def iter_readings(self, columns=thermal_query.SERIES_COLUMNS, device_id=None, device_type=None,
+                      since=None, until=None):
+        """thermal_query.iter_readings fanned out over the overlapping partitions, in month order"""
+
+        for month in self.months_between(since, until):
+            with self.attached(month) as conn:
+                yield from thermal_query.iter_readings(conn, columns, device_id, device_type, since, until)
+
+    def iter_open_alerts(self, device_id=None, severity=None, since=None):
+        """Unresolved alerts across partitions, newest first"""
+
+        for month in reversed(self.months_between(since)):
+            with self.attached(month) as conn:
+                yield from thermal_query.iter_open_alerts(conn, device_id, severity, since)
+
+    def query_series(self, device_id, since=None, until=None, resolution_seconds=3600):
+        """
+        thermal_rollups.query_series across partitions
+
+        Buckets wider than a month are split at partition boundaries and
+        merged here. Compacted months only hold hourly and daily rollups;
+        a request needing finer data from them raises ValueError.
+
+        Yields:
+            dict: One bucket keyed by thermal_rollups.SERIES_FIELDS
+        """
+
+        source = thermal_rollups.plan(resolution_seconds, since, until)
+        pending = None
+        for month in self.months_between(since, until):
+            with self.attached(month) as conn:
+                if source in ('raw', '1m') and self._compacted(conn):
+                    raise ValueError(f"partition {month} keeps only hourly and daily rollups; "
+                                     f"use an hour-aligned resolution and window")
+                for bucket in thermal_rollups.query_series(conn, device_id, since, until, resolution_seconds, source):
+                    if pending is not None and pending['bucket'] == bucket['bucket']:
+                        bucket = _merge_buckets(pending, bucket)
+                    elif pending is not None:
+                        yield pending
+                    pending = bucket
+        if pending is not None:
+            yield pending
+
+    def is_compacted(self, month):
+        """Whether a partition's raw readings have been dropped"""
+
+        with self.attached(month) as conn:
+            return self._compacted(conn)
+
+    def _compacted(self, conn):
+        return bool(conn.execute(
+            "SELECT 1 FROM partition.sqlite_master WHERE name = 'thermal_partition'"
+        ).fetchone()) and bool(conn.execute(
+            "SELECT 1 FROM partition.thermal_partition WHERE key = 'raw_dropped_at'"
+        ).fetchone())
+
+    def apply_retention(self, policy=None, now=None):
+        """
+        Compact or delete closed partitions past the retention horizons
+
+        Args:
+            policy: Overrides merged into DEFAULT_RETENTION
+            now: Reference time (defaults to the current UTC time)
+
+        Returns:
+            list: One {'month', 'action', ...} entry per partition changed
+        """
+
+        policy = dict(DEFAULT_RETENTION, **(policy or {}))
+        current_month = month_key(now or datetime.now(timezone.utc))
+        current = _month_index(current_month)
+        actions = []
+        if policy['archive_root']:
+            from thermal_archive import archive_partitions
+            for month in self.months():
+                if month < current_month:
+                    for manifest in archive_partitions(self, policy['archive_root'], months=[month]):
+                        actions.append({'month': month, 'action': 'archived', 'rows': manifest['rows']})
+        for month in self.months():
+            age = current - _month_index(month)
+            if age <= 0:
+                continue  # The open month is never touched
+            if policy['delete_months'] is not None and age > policy['delete_months']:
+                for suffix in ('', '-wal', '-shm'):
+                    Path(f"{self.path(month)}{suffix}").unlink(missing_ok=True)
+                actions.append({'month': month, 'action': 'deleted'})
+            elif age > policy['raw_months']:
+                action = self.compact(month)
+                if action:
+                    actions.append(action)
+        return actions
+
+    def compact(self, month):
+        """
+        Fold a partition's raw readings into its rollups and drop them
+
+        Returns:
+            dict: What was done, or None if already compacted
+        """
+
+        path = self.path(month)
+        conn = sqlite3.connect(path)
+        try:
+            meta = _partition_meta(conn)
+            if 'raw_dropped_at' in meta:
+                return None
+            before = path.stat().st_size
+            thermal_rollups.catch_up(conn)  # Readings a deferred writer left unfolded
+            raw_rows = conn.execute("SELECT count(*) FROM thermal_readings").fetchone()[0]
+            with conn:
+                conn.execute("DELETE FROM thermal_readings")
+                conn.execute(f"DROP TABLE IF EXISTS {thermal_rollups.table_name('1m')}")
+                conn.executemany("INSERT OR REPLACE INTO thermal_partition VALUES (?, ?)", [
+                    ('month', month), ('raw_rows', str(raw_rows)), ('raw_dropped_at', utc_timestamp())
+                ])
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+        return {'month': month, 'action': 'compacted', 'raw_rows': raw_rows,
+                'bytes_before': before, 'bytes_after': path.stat().st_size}
+
+    def import_database(self, db_path, chunk_rows=thermal_query.DEFAULT_CHUNK_ROWS):
+        """Split a single-file thermal database into monthly partitions"""
+
+        source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            with self.writer(bulk=True) as writer:
+                for chunk in thermal_query.iter_reading_chunks(source, READING_COLUMNS, chunk_rows=chunk_rows):
+                    writer.add_columns({name: values.tolist() for name, values in chunk.items()})
+                alert_columns = ('timestamp', 'device_id', 'alert_type', 'severity', 'message')
+                for row in source.execute(f"SELECT {', '.join(alert_columns)} FROM thermal_alerts ORDER BY timestamp"):
+                    writer.add_alert(dict(zip(alert_columns, row)))
+            return writer.rows_written
+        finally:
+            source.close()
+
+
+def _merge_buckets(a, b):
+    """Combine two partial aggregates of the same bucket"""
+
+    merged = {'bucket': a['bucket']}
+    for field in ('temperature', 'efficiency'):
+        count_key = 'count' if field == 'temperature' else 'efficiency_count'
+        counts = (a[count_key] or 0, b[count_key] or 0)
+        merged[count_key] = counts[0] + counts[1]
+        values = [value for value in (a[f'{field}_min'], b[f'{field}_min']) if value is not None]
+        merged[f'{field}_min'] = min(values) if values else None
+        values = [value for value in (a[f'{field}_max'], b[f'{field}_max']) if value is not None]
+        merged[f'{field}_max'] = max(values) if values else None
+        total = sum((mean or 0) * count for mean, count in ((a[f'{field}_mean'], counts[0]), (b[f'{field}_mean'], counts[1])))
+        merged[f'{field}_mean'] = total / merged[count_key] if merged[count_key] else None
+    return {field: merged[field] for field in thermal_rollups.SERIES_FIELDS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Monthly partitioned thermal storage')
+    parser.add_argument('root', help='Partition directory')
+    parser.add_argument('mode', choices=['list', 'import', 'retention', 'series'], help='Operation')
+    parser.add_argument('--db', help='Single-file database to import')
+    parser.add_argument('--raw-months', type=int, default=DEFAULT_RETENTION['raw_months'],
+                        help='Closed months that keep raw readings')
+    parser.add_argument('--delete-months', type=int, help='Delete partitions older than this many months')
+    parser.add_argument('--device', help='Device id (series)')
+    parser.add_argument('--since', help='Window start timestamp')
+    parser.add_argument('--until', help='Window end timestamp (exclusive)')
+    parser.add_argument('--resolution', type=int, default=3600, help='Series bucket width in seconds')
+    args = parser.parse_args()
+
+    store = PartitionedStore(args.root)
+    if args.mode == 'list':
+        for month in store.months():
+            path = store.path(month)
+            print(f"{month}  {path.stat().st_size / 1e6:8.1f} MB  {'compacted' if store.is_compacted(month) else 'raw'}")
+    elif args.mode == 'import':
+        if not args.db:
+            parser.error('import needs --db')
+        print(f"✅ Imported {store.import_database(args.db)} readings into {args.root}")
+    elif args.mode == 'retention':
+        actions = store.apply_retention({'raw_months': args.raw_months, 'delete_months': args.delete_months})
+        print(json.dumps(actions, indent=2))
+    else:
+        if not args.device:
+            parser.error('series needs --device')
+        for bucket in store.query_series(args.device, args.since, args.until, args.resolution):
+            sys.stdout.write(json.dumps(bucket) + '\n')
+
+
+if __name__ == "__main__":
+    main()
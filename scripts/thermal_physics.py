@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+HHDAO Thermal Physics Core
+Array-native temperature and efficiency kernels shared by the pilot
+launcher and the thermal simulator
+
+Every kernel accepts scalars or NumPy arrays (broadcast against each other)
+and a profile: the name of an entry in PHYSICS_PROFILES or a dict of
+overrides on top of the default profile.
+"""
+
+import numpy as np
+
+BOLTZMANN_EV = 8.617333e-5  # eV/K
+
+DEFAULT_PROFILE = {
+    # Panel efficiency
+    'reference_efficiency': 0.22,  # At the reference temperature
+    'temperature_coefficient': -0.0035,  # Fractional change per °C
+    'reference_temperature': 25,  # °C
+    'min_efficiency': 0.1,  # Absolute efficiency floor
+
+    # Panel temperature from array thermal load (simulator model)
+    'array_area_m2': 200,
+    'array_heat_loss_coefficient': 4,  # W/m²K
+
+    # Panel temperature from irradiance (NOCT model)
+    'noct': 45,  # °C, nominal operating cell temperature
+    'nameplate_efficiency': 0.20,
+    'wind_cooling_factor': 0.05,  # Relative temperature-rise reduction per m/s
+
+    # Balance of system
+    'inverter_full_load_rise': 12,  # °C above ambient at 1000 W/m²
+    'battery_offset': 3,  # °C above ambient at no load
+    'battery_full_load_rise': 2,  # Additional °C at 1000 W/m²
+
+    # Aging
+    'degradation_rate': 0.005,  # Fraction of initial efficiency lost per year at the reference history
+    'activation_energy_ev': 0.7  # Arrhenius activation energy of thermally driven degradation
+}
+
+PHYSICS_PROFILES = {
+    # ThermalSimulator defaults
+    'simulator': dict(DEFAULT_PROFILE),
+
+    # Pilot launcher monitoring: -0.4 %/°C with a 50 % relative floor
+    'pilot_monitoring': dict(
+        DEFAULT_PROFILE,
+        reference_efficiency=0.20,
+        temperature_coefficient=-0.004,
+        min_efficiency=0.10
+    )
+}
+
+
+def get_profile(profile='simulator'):
+    """Resolve a profile name or override dict to a full parameter dict"""
+
+    if isinstance(profile, dict):
+        return dict(DEFAULT_PROFILE, **profile)
+    if profile not in PHYSICS_PROFILES:
+        raise ValueError(f"Unknown physics profile '{profile}' (known: {', '.join(PHYSICS_PROFILES)})")
+    return PHYSICS_PROFILES[profile]
+
+
+def _load_fraction(solar_irradiance):
+    """Balance-of-system load as a fraction of 1000 W/m²"""
+
+    return np.minimum(1.0, np.asarray(solar_irradiance, dtype=np.float64) / 1000)
+
+
+def panel_efficiency(panel_temp, profile='simulator'):
+    """Absolute panel efficiency at the given cell temperatures"""
+
+    p = get_profile(profile)
+    efficiency = p['reference_efficiency'] * (
+        1 + p['temperature_coefficient'] * (panel_temp - p['reference_temperature'])
+    )
+    return np.maximum(p['min_efficiency'], efficiency)
+
+
+def efficiency_factor(panel_temp, profile='simulator'):
+    """Panel efficiency relative to the reference temperature"""
+
+    p = get_profile(profile)
+    factor = 1 + p['temperature_coefficient'] * (np.asarray(panel_temp, dtype=np.float64) - p['reference_temperature'])
+    return np.maximum(p['min_efficiency'] / p['reference_efficiency'], factor)
+
+
+def array_panel_temperature(ambient_temp, solar_load, profile='simulator'):
+    """Uncooled panel temperature from the array thermal load (kW)"""
+
+    p = get_profile(profile)
+    return ambient_temp + (solar_load * 1000) / (p['array_area_m2'] * p['array_heat_loss_coefficient'])
+
+
+def noct_panel_temperature(ambient_temp, solar_irradiance, wind_speed, profile='simulator'):
+    """Panel temperature from irradiance (W/m²) with the NOCT model"""
+
+    p = get_profile(profile)
+    rise = ((p['noct'] - 20) / 800) * np.asarray(solar_irradiance, dtype=np.float64) * (1 - p['nameplate_efficiency'])
+    return ambient_temp + rise / (1 + p['wind_cooling_factor'] * np.asarray(wind_speed, dtype=np.float64))
+
+
+def inverter_temperature(ambient_temp, solar_irradiance, profile='simulator'):
+    """Inverter temperature, rising with load above ambient"""
+
+    p = get_profile(profile)
+    return ambient_temp + p['inverter_full_load_rise'] * _load_fraction(solar_irradiance)
+
+
+def battery_temperature(ambient_temp, solar_irradiance, profile='simulator'):
+    """Battery temperature: a stable offset above ambient plus a small load term"""
+
+    p = get_profile(profile)
+    return ambient_temp + p['battery_offset'] + p['battery_full_load_rise'] * _load_fraction(solar_irradiance)
+
+
+def thermal_profile(ambient_temp, solar_irradiance, wind_speed, profile='simulator'):
+    """
+    Panel, inverter and battery temperatures plus panel efficiency factor
+
+    Returns:
+        dict: Arrays broadcast from the inputs
+    """
+
+    p = get_profile(profile)
+    ambient_temp = np.asarray(ambient_temp, dtype=np.float64)
+    panel_temp = noct_panel_temperature(ambient_temp, solar_irradiance, wind_speed, p)
+    return {
+        'panel_temp': panel_temp,
+        'inverter_temp': inverter_temperature(ambient_temp, solar_irradiance, p),
+        'battery_temp': battery_temperature(ambient_temp, solar_irradiance, p),
+        'efficiency': efficiency_factor(panel_temp, p)
+    }
+
+
+def arrhenius_factor(panel_temp, reference_temp, profile='simulator'):
+    """Degradation rate at panel_temp relative to reference_temp (both °C)"""
+
+    p = get_profile(profile)
+    return np.exp(
+        p['activation_energy_ev'] / BOLTZMANN_EV
+        * (1 / (np.asarray(reference_temp, dtype=np.float64) + 273.15) - 1 / (np.asarray(panel_temp, dtype=np.float64) + 273.15))
+    )
+
+
+def nominal_retention(age_years, profile='simulator'):
+    """Fraction of initial efficiency left after age_years at the nominal degradation rate"""
+
+    p = get_profile(profile)
+    return np.maximum(0.0, 1 - p['degradation_rate'] * np.asarray(age_years, dtype=np.float64))
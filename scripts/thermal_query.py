@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+HHDAO Thermal Data Queries
+Indexed time-range reads of thermal_readings and open-alert lookups
+
+Every query walks an index range rather than the table, and results are
+streamed from the cursor (rows or NumPy column chunks) instead of being
+materialized with fetchall. migrate() brings an existing database up to
+the current schema version in place, tracked with PRAGMA user_version.
+
+Indexes roughly halve the ingestion rate, so large backfills are best
+written to a fresh database and migrated afterwards: one index build is
+far cheaper than maintaining the indexes row by row.
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from thermal_ingest import ensure_schema, utc_timestamp
+
+SERIES_COLUMNS = ('timestamp', 'device_id', 'temperature', 'efficiency')
+ALERT_COLUMNS = ('id', 'timestamp', 'device_id', 'alert_type', 'severity', 'message')
+DEFAULT_CHUNK_ROWS = 100_000
+
+# (schema version, statements); applied in order to databases below that version
+MIGRATIONS = [
+    (1, (
+        # Per-device series: covering for SERIES_COLUMNS, so dashboards never touch the table
+        "CREATE INDEX IF NOT EXISTS idx_readings_device_time "
+        "ON thermal_readings (device_id, timestamp, temperature, efficiency)",
+        "CREATE INDEX IF NOT EXISTS idx_readings_type_time ON thermal_readings (device_type, timestamp)",
+        # Open alerts are a small, hot subset; a partial index keeps them out of the history
+        "CREATE INDEX IF NOT EXISTS idx_alerts_open "
+        "ON thermal_alerts (device_id, timestamp, severity) WHERE resolved = 0"
+    ))
+]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """
+    Create missing tables and apply pending migrations in place
+
+    Returns:
+        list: Versions applied (empty when already current)
+    """
+
+    ensure_schema(conn)
+    applied = []
+    for version, statements in MIGRATIONS:
+        if schema_version(conn) >= version:
+            continue
+        with conn:
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version}")
+        applied.append(version)
+    if applied:
+        conn.execute("ANALYZE")  # Planner statistics for the new indexes
+    return applied
+
+
+def connect(db_path, readonly=False):
+    """Open a database for queries, migrating it first unless read-only"""
+
+    if readonly:
+        return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode = WAL")
+    migrate(conn)
+    return conn
+
+
+def timestamp_bound(value):
+    """Timestamp bound as stored text; datetimes are converted to UTC"""
+
+    return utc_timestamp(value) if isinstance(value, datetime) else value
+
+
+def _where(device_id=None, device_type=None, since=None, until=None):
+    """WHERE clause and parameters; device_id may be one id or a list"""
+
+    clauses, params = [], []
+    if device_id is not None:
+        ids = [device_id] if isinstance(device_id, str) else list(device_id)
+        clauses.append(f"device_id IN ({', '.join('?' * len(ids))})")
+        params.extend(ids)
+    if device_type is not None:
+        clauses.append("device_type = ?")
+        params.append(device_type)
+    if since is not None:
+        clauses.append("timestamp >= ?")
+        params.append(timestamp_bound(since))
+    if until is not None:
+        clauses.append("timestamp < ?")
+        params.append(timestamp_bound(until))
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def readings_query(columns=SERIES_COLUMNS, device_id=None, device_type=None, since=None, until=None):
+    """SQL and parameters for a time-ordered range read of thermal_readings"""
+
+    where, params = _where(device_id, device_type, since, until)
+    order = "device_id, timestamp" if device_id is not None and not isinstance(device_id, str) else "timestamp"
+    return f"SELECT {', '.join(columns)} FROM thermal_readings{where} ORDER BY {order}", params
+
+
+def iter_readings(conn, columns=SERIES_COLUMNS, device_id=None, device_type=None, since=None, until=None):
+    """
+    Stream readings in time order (per device when several ids are given)
+
+    Args:
+        conn: SQLite connection
+        columns: thermal_readings columns to return
+        device_id: One device id or a list of them
+        device_type: 'panel', 'inverter', 'battery', ...
+        since, until: Half-open timestamp range (text or datetime)
+
+    Yields:
+        tuple: One row per reading, in columns order
+    """
+
+    query, params = readings_query(columns, device_id, device_type, since, until)
+    yield from conn.execute(query, params)
+
+
+def iter_reading_chunks(conn, columns=SERIES_COLUMNS, device_id=None, device_type=None, since=None, until=None,
+                        chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Stream readings as column chunks
+
+    Yields:
+        dict: Column name -> NumPy array (object dtype for text columns),
+              at most chunk_rows long
+    """
+
+    query, params = readings_query(columns, device_id, device_type, since, until)
+    cursor = conn.execute(query, params)
+    while True:
+        rows = cursor.fetchmany(chunk_rows)
+        if not rows:
+            return
+        yield {name: np.array(values) if not isinstance(values[0], str) else np.array(values, dtype=object)
+               for name, values in zip(columns, zip(*rows))}
+
+
+def iter_open_alerts(conn, device_id=None, severity=None, since=None):
+    """
+    Stream unresolved alerts, newest first
+
+    Yields:
+        dict: Alert keyed by ALERT_COLUMNS
+    """
+
+    clauses, params = ["resolved = 0"], []
+    if device_id is not None:
+        clauses.append("device_id = ?")
+        params.append(device_id)
+    if severity is not None:
+        clauses.append("severity = ?")
+        params.append(severity)
+    if since is not None:
+        clauses.append("timestamp >= ?")
+        params.append(timestamp_bound(since))
+    query = (f"SELECT {', '.join(ALERT_COLUMNS)} FROM thermal_alerts "
+             f"WHERE {' AND '.join(clauses)} ORDER BY timestamp DESC")
+    for row in conn.execute(query, params):
+        yield dict(zip(ALERT_COLUMNS, row))
+
+
+def resolve_alerts(conn, alert_ids, resolved_at=None):
+    """Mark alerts resolved; returns the number updated"""
+
+    with conn:
+        cursor = conn.executemany(
+            "UPDATE thermal_alerts SET resolved = 1, resolved_at = ? WHERE id = ? AND resolved = 0",
+            [(timestamp_bound(resolved_at) or utc_timestamp(), alert_id) for alert_id in alert_ids]
+        )
+    return cursor.rowcount
+
+
+def query_plan(conn, query, params=()):
+    """SQLite's plan for a query, one step per line"""
+
+    return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query thermal readings and alerts')
+    parser.add_argument('db_path', help='SQLite database with thermal_readings')
+    parser.add_argument('mode', choices=['readings', 'alerts', 'migrate'], help='What to query')
+    parser.add_argument('--device', help='Device id (comma-separated for several)')
+    parser.add_argument('--device-type', help='Device type filter (readings)')
+    parser.add_argument('--severity', help='Severity filter (alerts)')
+    parser.add_argument('--since', help='Only rows at or after this timestamp')
+    parser.add_argument('--until', help='Only readings before this timestamp')
+    parser.add_argument('--columns', default=','.join(SERIES_COLUMNS), help='Comma-separated reading columns')
+    parser.add_argument('--explain', action='store_true', help='Print the query plan instead of rows')
+    args = parser.parse_args()
+
+    conn = connect(args.db_path)
+    try:
+        if args.mode == 'migrate':
+            applied = migrate(conn)
+            print(f"✅ Schema version {schema_version(conn)} (applied: {applied or 'none'})")
+            return
+
+        if args.mode == 'alerts':
+            rows = iter_open_alerts(conn, args.device, args.severity, args.since)
+        else:
+            columns = tuple(args.columns.split(','))
+            devices = args.device.split(',') if args.device and ',' in args.device else args.device
+            if args.explain:
+                query, params = readings_query(columns, devices, args.device_type, args.since, args.until)
+                print('\n'.join(query_plan(conn, query, params)))
+                return
+            rows = (dict(zip(columns, row))
+                    for row in iter_readings(conn, columns, devices, args.device_type, args.since, args.until))
+
+        started, count = time.perf_counter(), 0
+        for row in rows:
+            sys.stdout.write(json.dumps(row) + '\n')
+            count += 1
+        print(f"{count} rows in {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
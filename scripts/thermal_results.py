@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+HHDAO Columnar Simulation Results
+NumPy-backed result objects with lazy dict/JSON views and compact output
+"""
+
+import json
+from collections.abc import Mapping
+
+import numpy as np
+
+RESULT_FORMATS = ('json', 'jsonl', 'npz')
+
+
+def _present(values, digits):
+    """Rounded Python values for one column; NaN becomes None"""
+
+    values = np.asarray(values)
+    if digits is None or values.dtype.kind not in 'fc':
+        return values.tolist()
+    if digits == 0:
+        return [None if v != v else int(round(v)) for v in values.tolist()]
+    return [None if v != v else round(v, digits) for v in values.tolist()]
+
+
+class ColumnarResult(Mapping):
+    """
+    Simulation result whose per-step (or per-array) records are kept as columns
+
+    The mapping view matches the dict the simulator used to return: scalar
+    fields as given, plus rows_key holding either a list of per-row dicts
+    (orient='records') or a dict of per-column lists (orient='columns').
+    Columns stay unrounded float64 arrays; precision is applied only when
+    that view is first built, or when writing JSON output.
+    """
+
+    def __init__(self, fields, rows_key, columns, precision=None, orient='records'):
+        self.fields = dict(fields)
+        self.fields.setdefault(rows_key, None)
+        self.rows_key = rows_key
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+        self.precision = dict(precision or {})
+        self.orient = orient
+        self._rows = None
+
+    def __len__(self):
+        return len(self.fields)
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __getitem__(self, key):
+        if key == self.rows_key:
+            if self._rows is None:
+                self._rows = self._build_rows()
+            return self._rows
+        return self.fields[key]
+
+    def __repr__(self):
+        size = len(next(iter(self.columns.values()))) if self.columns else 0
+        return f"ColumnarResult({self.rows_key!r}: {size} rows x {len(self.columns)} columns)"
+
+    def _presented_columns(self):
+        return {name: _present(values, self.precision.get(name)) for name, values in self.columns.items()}
+
+    def _build_rows(self):
+        presented = self._presented_columns()
+        if self.orient == 'columns':
+            return presented
+        names = list(presented)
+        return [dict(zip(names, row)) for row in zip(*(presented[name] for name in names))]
+
+    def to_dict(self):
+        """Plain dict equivalent to the legacy result"""
+
+        return {key: self[key] for key in self}
+
+    def iter_jsonl(self):
+        """JSON Lines: one line of scalar fields, then one line per row"""
+
+        yield json.dumps({key: value for key, value in self.fields.items() if key != self.rows_key},
+                         default=json_default)
+        presented = self._presented_columns()
+        names = list(presented)
+        for row in zip(*(presented[name] for name in names)):
+            yield json.dumps(dict(zip(names, row)))
+
+    def save_npz(self, path):
+        """Write unrounded columns plus JSON-encoded fields to a compressed .npz"""
+
+        meta = {
+            'fields': self.fields,  # rows_key keeps its place with a None placeholder
+            'rows_key': self.rows_key,
+            'precision': self.precision,
+            'orient': self.orient,
+            'columns': list(self.columns)
+        }
+        np.savez_compressed(
+            path, __meta__=np.array(json.dumps(meta, default=json_default)),
+            **{f"column_{i}": values for i, values in enumerate(self.columns.values())}
+        )
+
+    @classmethod
+    def load_npz(cls, path):
+        """Read a result written by save_npz"""
+
+        with np.load(path) as data:
+            meta = json.loads(str(data['__meta__']))
+            columns = {name: data[f"column_{i}"] for i, name in enumerate(meta['columns'])}
+        return cls(meta['fields'], meta['rows_key'], columns, meta['precision'], meta['orient'])
+
+    def to_payload(self):
+        """JSON-serializable form that round-trips without losing precision"""
+
+        return {
+            '__columnar__': True,
+            'fields': self.fields,  # rows_key keeps its place with a None placeholder
+            'rows_key': self.rows_key,
+            'columns': {name: values.tolist() for name, values in self.columns.items()},
+            'precision': self.precision,
+            'orient': self.orient
+        }
+
+    @classmethod
+    def from_payload(cls, payload):
+        return cls(payload['fields'], payload['rows_key'], payload['columns'], payload['precision'], payload['orient'])
+
+
+def json_default(value):
+    """json.dumps hook for ColumnarResult values"""
+
+    if isinstance(value, ColumnarResult):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def to_cacheable(value):
+    """Convert a method result for the JSON result cache"""
+
+    return value.to_payload() if isinstance(value, ColumnarResult) else value
+
+
+def from_cacheable(value):
+    """Rebuild a method result stored by to_cacheable"""
+
+    if isinstance(value, dict) and value.get('__columnar__'):
+        return ColumnarResult.from_payload(value)
+    return value
+
+
+def write_result(result, path, fmt='json'):
+    """
+    Write a simulation result as indented JSON, JSON Lines or .npz
+
+    Plain dict results are written as one JSON line for 'jsonl' and are
+    not supported for 'npz'.
+    """
+
+    if fmt == 'npz':
+        if not isinstance(result, ColumnarResult):
+            raise ValueError('npz output needs a columnar result (daily, fleet or zones mode)')
+        result.save_npz(path)
+        return
+
+    with open(path, 'w') as f:
+        if fmt == 'jsonl':
+            lines = result.iter_jsonl() if isinstance(result, ColumnarResult) else [json.dumps(result)]
+            for line in lines:
+                f.write(line + '\n')
+        else:
+            json.dump(result, f, indent=2, default=json_default)
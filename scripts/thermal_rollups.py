@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+HHDAO Thermal Rollups
+Per-device 1-minute, 1-hour and 1-day aggregates of thermal_readings
+
+Rollup rows keep count, min, max and sum of temperature and efficiency, so
+merging new readings into a bucket is exact and means are sum / count.
+attach() keeps the rollups current from a ReadingWriter: each flush
+aggregates just the rows it inserted (an id range scan) and upserts them,
+inside the same transaction as the raw insert. A watermark (the last
+reading id folded in) lets a deferred writer skip that work and fold its
+rows later with catch_up(), one id range scan per resolution.
+
+Live maintenance costs write rate. Measured with 1M minute-spaced readings
+from 1,000 devices: ~135k rows/s bare, ~70-85k rows/s with the
+thermal_query indexes and ~40k rows/s with indexes and live rollups. Pre-aggregating each
+batch in Python was slower still, since minute-spaced readings leave one
+1-minute bucket per reading. Loaders that need the headroom should defer
+the rollups, or load new partitions in thermal_partitions' bulk mode.
+
+query_series() answers "this device, this window, at this resolution"
+from the coarsest table whose buckets tile the request, falling back to
+raw readings only when the resolution or window bounds are finer than a
+minute.
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+
+from thermal_query import timestamp_bound
+
+# Resolution name -> (bucket width in seconds, bucket start from a timestamp column)
+ROLLUPS = {
+    '1m': (60, "substr({column}, 1, 16) || ':00'"),
+    '1h': (3600, "substr({column}, 1, 13) || ':00:00'"),
+    '1d': (86400, "substr({column}, 1, 10) || ' 00:00:00'")
+}
+STATE_TABLE = 'thermal_rollup_state'
+SERIES_FIELDS = (
+    'bucket', 'count', 'temperature_min', 'temperature_max', 'temperature_mean',
+    'efficiency_count', 'efficiency_min', 'efficiency_max', 'efficiency_mean'
+)
+
+
+def table_name(resolution):
+    return f"thermal_rollup_{resolution}"
+
+
+def ensure_rollups(conn):
+    """
+    Create missing rollup tables, backfilling new ones from thermal_readings
+
+    Returns:
+        list: Resolutions created
+    """
+
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if STATE_TABLE not in existing:
+        conn.execute(f"CREATE TABLE {STATE_TABLE} (key TEXT PRIMARY KEY, value INTEGER)")
+    created = []
+    for resolution in ROLLUPS:
+        if table_name(resolution) in existing:
+            continue
+        conn.execute(f"""
+            CREATE TABLE {table_name(resolution)} (
+                device_id TEXT NOT NULL,
+                bucket DATETIME NOT NULL,
+                count INTEGER NOT NULL,
+                temperature_min REAL,
+                temperature_max REAL,
+                temperature_sum REAL,
+                efficiency_count INTEGER NOT NULL,
+                efficiency_min REAL,
+                efficiency_max REAL,
+                efficiency_sum REAL,
+                PRIMARY KEY (device_id, bucket)
+            ) WITHOUT ROWID
+        """)
+        created.append(resolution)
+    if created and 'thermal_readings' in existing:
+        for resolution in created:
+            _merge(conn, resolution)
+    if STATE_TABLE not in existing or created:
+        # Backfilled rollups, or ones kept current before the watermark existed
+        _set_folded_id(conn, _last_id(conn) if 'thermal_readings' in existing else 0)
+    conn.commit()
+    return created
+
+
+def _last_id(conn):
+    return conn.execute("SELECT max(id) FROM thermal_readings").fetchone()[0] or 0
+
+
+def _folded_id(conn):
+    """Last reading id folded into the rollups"""
+
+    row = conn.execute(f"SELECT value FROM {STATE_TABLE} WHERE key = 'folded_id'").fetchone()
+    return row[0] if row else 0
+
+
+def _set_folded_id(conn, last_id):
+    conn.execute(f"INSERT OR REPLACE INTO {STATE_TABLE} VALUES ('folded_id', ?)", (last_id,))
+
+
+def _merge(conn, resolution, id_range=None):
+    """Aggregate thermal_readings (optionally an id range) into a rollup table"""
+
+    bucket = ROLLUPS[resolution][1].format(column='timestamp')
+    where, params = ("WHERE id BETWEEN ? AND ?", id_range) if id_range else ("WHERE true", ())
+    # NULL-safe merge: scalar min()/max() return NULL if either side is NULL
+    merge = "COALESCE({fn}({table}.{column}, excluded.{column}), {table}.{column}, excluded.{column})"
+    table = table_name(resolution)
+    conn.execute(f"""
+        INSERT INTO {table}
+        SELECT device_id, {bucket}, count(*), min(temperature), max(temperature), sum(temperature),
+               count(efficiency), min(efficiency), max(efficiency), sum(efficiency)
+        FROM thermal_readings {where}
+        GROUP BY device_id, {bucket}
+        ON CONFLICT (device_id, bucket) DO UPDATE SET
+            count = count + excluded.count,
+            temperature_min = {merge.format(fn='min', table=table, column='temperature_min')},
+            temperature_max = {merge.format(fn='max', table=table, column='temperature_max')},
+            temperature_sum = COALESCE(temperature_sum, 0) + COALESCE(excluded.temperature_sum, 0),
+            efficiency_count = efficiency_count + excluded.efficiency_count,
+            efficiency_min = {merge.format(fn='min', table=table, column='efficiency_min')},
+            efficiency_max = {merge.format(fn='max', table=table, column='efficiency_max')},
+            efficiency_sum = COALESCE(efficiency_sum, 0) + COALESCE(excluded.efficiency_sum, 0)
+    """, params)
+
+
+def update_rollups(conn, id_range):
+    """ReadingWriter flush listener: fold the rows in id_range, and any deferred before them, into every rollup"""
+
+    if id_range is None:
+        return
+    id_range = (min(id_range[0], _folded_id(conn) + 1), id_range[1])
+    for resolution in ROLLUPS:
+        _merge(conn, resolution, id_range)
+    _set_folded_id(conn, id_range[1])
+
+
+def catch_up(conn):
+    """
+    Fold readings written since the last rollup update into every rollup
+
+    Returns:
+        int: Readings folded in
+    """
+
+    ensure_rollups(conn)
+    folded, last = _folded_id(conn), _last_id(conn)
+    if last <= folded:
+        return 0
+    with conn:
+        for resolution in ROLLUPS:
+            _merge(conn, resolution, (folded + 1, last))
+        _set_folded_id(conn, last)
+    return last - folded
+
+
+def attach(writer, deferred=False):
+    """
+    Keep the rollups of a ReadingWriter's database current as it flushes
+
+    With deferred=True flushes leave the rollups alone; they lag behind
+    the raw readings until catch_up() runs on the database.
+    """
+
+    ensure_rollups(writer.conn)
+    if not deferred:
+        writer.flush_listeners.append(update_rollups)
+    return writer
+
+
+def rebuild(conn, resolutions=None):
+    """Recompute rollups from scratch (after deletes or out-of-band writes)"""
+
+    ensure_rollups(conn)
+    with conn:
+        for resolution in resolutions or ROLLUPS:
+            conn.execute(f"DELETE FROM {table_name(resolution)}")
+            _merge(conn, resolution)
+        if not set(ROLLUPS) - set(resolutions or ROLLUPS):
+            _set_folded_id(conn, _last_id(conn))
+
+
+def _epoch(value):
+    text = timestamp_bound(value)
+    return int(datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp())
+
+
+def plan(resolution_seconds, since=None, until=None):
+    """
+    Pick the source for a series at the requested resolution
+
+    The coarsest rollup is used whose bucket width divides the resolution
+    and whose buckets align with both bounds, so no bucket straddles the
+    window edge or an output bucket.
+
+    Returns:
+        str: Rollup resolution name, or 'raw' for thermal_readings
+    """
+
+    bounds = [_epoch(value) for value in (since, until) if value is not None]
+    for resolution, (width, _) in sorted(ROLLUPS.items(), key=lambda item: -item[1][0]):
+        if resolution_seconds % width == 0 and all(bound % width == 0 for bound in bounds):
+            return resolution
+    return 'raw'
+
+
+def series_query(device_id, since=None, until=None, resolution_seconds=3600, source=None):
+    """SQL and parameters for a device series re-bucketed to resolution_seconds"""
+
+    source = source or plan(resolution_seconds, since, until)
+    if source == 'raw':
+        table, time_column = 'thermal_readings', 'timestamp'
+        aggregates = ("count(temperature), min(temperature), max(temperature), avg(temperature), "
+                      "count(efficiency), min(efficiency), max(efficiency), avg(efficiency)")
+    else:
+        table, time_column = table_name(source), 'bucket'
+        aggregates = ("sum(count), min(temperature_min), max(temperature_max), sum(temperature_sum) / sum(count), "
+                      "sum(efficiency_count), min(efficiency_min), max(efficiency_max), "
+                      "sum(efficiency_sum) / NULLIF(sum(efficiency_count), 0)")
+
+    clauses, params = ["device_id = ?"], [device_id]
+    if since is not None:
+        clauses.append(f"{time_column} >= ?")
+        params.append(timestamp_bound(since))
+    if until is not None:
+        clauses.append(f"{time_column} < ?")
+        params.append(timestamp_bound(until))
+    bucket = (f"datetime(CAST(strftime('%s', {time_column}) AS INTEGER) / {int(resolution_seconds)} "
+              f"* {int(resolution_seconds)}, 'unixepoch')")
+    query = (f"SELECT {bucket} AS series_bucket, {aggregates} FROM {table} "
+             f"WHERE {' AND '.join(clauses)} GROUP BY series_bucket ORDER BY series_bucket")
+    return query, params, source
+
+
+def query_series(conn, device_id, since=None, until=None, resolution_seconds=3600, source=None):
+    """
+    Stream a device's aggregated series
+
+    Args:
+        conn: SQLite connection with rollups (see ensure_rollups)
+        device_id: Device to read
+        since, until: Half-open timestamp window
+        resolution_seconds: Output bucket width
+        source: Force a rollup ('1m', '1h', '1d') or 'raw' instead of planning
+
+    Yields:
+        dict: One bucket keyed by SERIES_FIELDS
+    """
+
+    query, params, _ = series_query(device_id, since, until, resolution_seconds, source)
+    for row in conn.execute(query, params):
+        yield dict(zip(SERIES_FIELDS, row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Aggregated thermal series from rollup tables')
+    parser.add_argument('db_path', help='SQLite database with thermal_readings')
+    parser.add_argument('--device', help='Device id to query')
+    parser.add_argument('--since', help='Window start timestamp')
+    parser.add_argument('--until', help='Window end timestamp (exclusive)')
+    parser.add_argument('--resolution', type=int, default=3600, help='Output bucket width in seconds')
+    parser.add_argument('--source', choices=['raw', *ROLLUPS], help='Force a source instead of planning')
+    parser.add_argument('--rebuild', action='store_true', help='Recompute all rollups from raw readings')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path)
+    try:
+        if args.rebuild:
+            started = time.perf_counter()
+            rebuild(conn)
+            print(f"✅ Rollups rebuilt in {time.perf_counter() - started:.1f} s")
+        else:
+            ensure_rollups(conn)
+        if not args.device:
+            return
+
+        query, params, source = series_query(args.device, args.since, args.until, args.resolution, args.source)
+        started, count = time.perf_counter(), 0
+        for row in conn.execute(query, params):
+            sys.stdout.write(json.dumps(dict(zip(SERIES_FIELDS, row))) + '\n')
+            count += 1
+        print(f"{count} buckets from {source} in {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+HHDAO Scenario Batch Runner
+Runs a JSON Lines file of what-if scenarios in one process pool
+
+Each input line is an object with a "mode" (single, daily, annual or
+optimize), an optional "id", and that mode's simulator arguments, e.g.
+
+    {"id": "hot-still", "mode": "single", "ambient_temp": 44, "wind_speed": 0.5}
+    {"mode": "daily", "date_str": "2025-06-01", "site": "delhi"}
+    {"mode": "optimize", "candidates": 2000, "constraints": {"max_budget_inr": 400000}}
+
+Single-condition scenarios are vectorized together; the rest are grouped
+by mode into worker tasks. Results stream out as JSON Lines in input or
+completion order.
+"""
+
+import inspect
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from thermal_results import json_default
+from thermal_simulation import COOLING_RESULT_PRECISION
+
+SCENARIO_METHODS = {
+    'single': 'simulate_cooling',
+    'daily': 'simulate_daily_cycle',
+    'annual': 'simulate_annual',
+    'degradation': 'simulate_degradation',
+    'optimize': 'optimize_thermal_design'
+}
+SINGLE_CHUNK = 65536  # Single-condition scenarios per vectorized task
+TASK_SIZE = {'daily': 32, 'annual': 1, 'degradation': 1, 'optimize': 1}  # Other scenarios per worker task
+
+
+def _parse(line, simulator):
+    """Validate one scenario line, returning (mode, id, bound arguments)"""
+
+    spec = json.loads(line)
+    if not isinstance(spec, dict):
+        raise ValueError('scenario must be a JSON object')
+    mode = spec.pop('mode', 'single')
+    if mode not in SCENARIO_METHODS:
+        raise ValueError(f"Unknown mode '{mode}' (expected one of: {', '.join(SCENARIO_METHODS)})")
+    scenario_id = spec.pop('id', None)
+    spec.pop('workers', None)  # Scenarios already run in parallel
+
+    signature = inspect.signature(getattr(simulator, SCENARIO_METHODS[mode]))
+    bound = signature.bind(**spec)  # TypeError on unknown or duplicated arguments
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+    arguments.pop('workers', None)
+    if mode == 'single':
+        arguments = {name: float(value) for name, value in arguments.items()}
+    return mode, scenario_id, arguments
+
+
+def _identity(line):
+    """id and mode of a scenario line that failed validation, where it parses that far"""
+
+    try:
+        spec = json.loads(line)
+    except ValueError:
+        return None, None
+    if not isinstance(spec, dict):
+        return None, None
+    return spec.get('id'), spec.get('mode', 'single')
+
+
+def _run_singles(task):
+    """Worker entry point: vectorized single-condition scenarios"""
+
+    simulator, indices, columns = task
+    batch = simulator.simulate_cooling_batch(**columns)
+    values = {key: np.asarray(batch[key]).tolist() for key in COOLING_RESULT_PRECISION}
+    return [
+        (index, {key: round(values[key][i], digits) for key, digits in COOLING_RESULT_PRECISION.items()}, None)
+        for i, index in enumerate(indices)
+    ]
+
+
+def _run_scenarios(task):
+    """Worker entry point: daily, annual or optimize scenarios of one mode"""
+
+    simulator, mode, items = task
+    method = getattr(simulator, SCENARIO_METHODS[mode])
+    if mode == 'optimize':
+        method = lambda **arguments: simulator.optimize_thermal_design(workers=1, **arguments)
+    results = []
+    for index, arguments in items:
+        try:
+            results.append((index, method(**arguments), None))
+        except Exception as e:
+            results.append((index, None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def _tasks(simulator, parsed):
+    """Group parsed scenarios by mode into worker tasks"""
+
+    by_mode = {mode: [] for mode in SCENARIO_METHODS}
+    for index, (mode, _, arguments) in parsed.items():
+        by_mode[mode].append((index, arguments))
+
+    tasks = []
+    singles = by_mode.pop('single')
+    for start in range(0, len(singles), SINGLE_CHUNK):
+        chunk = singles[start:start + SINGLE_CHUNK]
+        columns = {
+            name: np.array([arguments[name] for _, arguments in chunk], dtype=np.float64)
+            for name in chunk[0][1]
+        }
+        tasks.append((_run_singles, (simulator, [index for index, _ in chunk], columns)))
+
+    for mode, items in by_mode.items():
+        for start in range(0, len(items), TASK_SIZE[mode]):
+            tasks.append((_run_scenarios, (simulator, mode, items[start:start + TASK_SIZE[mode]])))
+    return tasks
+
+
+def run_scenarios(simulator, scenario_path, out, order='input', workers=None):
+    """
+    Run every scenario in a JSON Lines file, writing one result line each
+
+    Invalid lines and failing scenarios produce an "error" record instead
+    of aborting the run.
+
+    Args:
+        simulator: ThermalSimulator instance
+        scenario_path: JSON Lines scenario file
+        out: Writable text stream for result lines
+        order: 'input' to keep file order, 'completion' to write as results arrive
+        workers: Worker processes (defaults to CPU count)
+
+    Returns:
+        dict: Counts of scenarios per mode and of errors
+    """
+
+    if order not in ('input', 'completion'):
+        raise ValueError("order must be 'input' or 'completion'")
+
+    parsed, meta, pending = {}, {}, {}
+    with open(scenario_path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            index = len(meta)
+            try:
+                mode, scenario_id, arguments = _parse(line, simulator)
+            except (ValueError, TypeError) as e:
+                meta[index] = (line_number, *_identity(line))
+                pending[index] = (None, f"{type(e).__name__}: {e}")
+                continue
+            meta[index] = (line_number, scenario_id, mode)
+            parsed[index] = (mode, scenario_id, arguments)
+
+    counts = {mode: 0 for mode in SCENARIO_METHODS}
+    counts['errors'] = 0
+    next_index = 0
+
+    def write(index, result, error):
+        line_number, scenario_id, mode = meta[index]
+        record = {'line': line_number, 'id': scenario_id, 'mode': mode}
+        if error is None:
+            record['result'] = result
+            counts[mode] += 1
+        else:
+            record['error'] = error
+            counts['errors'] += 1
+        out.write(json.dumps(record, default=json_default) + '\n')
+
+    def emit(results):
+        nonlocal next_index
+        if order == 'completion':
+            for index, result, error in results:
+                write(index, result, error)
+        else:
+            for index, result, error in results:
+                pending[index] = (result, error)
+            while next_index in pending:
+                write(next_index, *pending.pop(next_index))
+                next_index += 1
+        out.flush()
+
+    # Lines that failed to parse are reported before any scenario runs
+    if order == 'completion':
+        emit([(index, result, error) for index, (result, error) in sorted(pending.items())])
+    else:
+        emit([])
+
+    tasks = _tasks(simulator, parsed)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        for func, task in tasks:
+            emit(func(task))
+    elif tasks:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            futures = {pool.submit(func, task) for func, task in tasks}
+            while futures:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    emit(future.result())
+
+    return {'scenarios': len(meta), 'completed': {m: counts[m] for m in SCENARIO_METHODS}, 'errors': counts['errors']}
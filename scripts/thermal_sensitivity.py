@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+HHDAO Thermal Sensitivity Analysis
+Morris elementary effects and Sobol indices for the cooling model
+"""
+
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from numbers import Real
+
+import numpy as np
+
+SENSITIVITY_OUTPUTS = ('temp_reduction', 'revenue_gain_daily')
+CONSTANT_SPREAD = 0.2  # Default ± fraction around each constant's nominal value
+DEFAULT_SOBOL_SAMPLES = 16384
+DEFAULT_MORRIS_TRAJECTORIES = 200
+MORRIS_LEVELS = 4
+BOOTSTRAP_RESAMPLES = 100
+CHUNK_ROWS = 65536
+
+
+def default_factors(simulator):
+    """
+    Factor ranges: the four weather inputs plus every scalar simulator constant
+
+    Returns:
+        dict: factor name -> (low, high), constants prefixed with 'const:'
+    """
+
+    factors = {
+        'ambient_temp': (15.0, 45.0),
+        'solar_load': (5.0, 80.0),
+        'humidity': tuple(float(x) for x in simulator.HUMIDITY_RANGE),
+        'wind_speed': tuple(float(x) for x in simulator.WIND_SPEED_RANGE)
+    }
+    for name, value in simulator.parameters().items():
+        if isinstance(value, Real) and not isinstance(value, bool):
+            low, high = value * (1 - CONSTANT_SPREAD), value * (1 + CONSTANT_SPREAD)
+            factors[f"const:{name}"] = (min(low, high), max(low, high))
+    return factors
+
+
+def _evaluate_chunk(task):
+    """Worker entry point: model outputs for rows of physical factor values"""
+
+    simulator, names, values = task
+    model = copy.copy(simulator)
+    inputs = {}
+    for i, name in enumerate(names):
+        if name.startswith('const:'):
+            setattr(model, name[len('const:'):], values[:, i])
+        else:
+            inputs[name] = values[:, i]
+
+    batch = model.simulate_cooling_batch(**inputs)
+    return np.column_stack([batch[output] for output in SENSITIVITY_OUTPUTS])
+
+
+def _evaluate(simulator, names, unit_rows, bounds, workers):
+    """Model outputs for unit-hypercube rows, spread across worker processes"""
+
+    low, high = bounds[:, 0], bounds[:, 1]
+    physical = low + unit_rows * (high - low)
+    tasks = [(simulator, names, physical[i:i + CHUNK_ROWS]) for i in range(0, len(physical), CHUNK_ROWS)]
+    if workers == 1 or len(tasks) == 1:
+        return np.concatenate([_evaluate_chunk(task) for task in tasks])
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        return np.concatenate(list(pool.map(_evaluate_chunk, tasks)))
+
+
+def _morris(simulator, names, bounds, trajectories, rng, workers):
+    """Morris elementary effects from randomized one-at-a-time trajectories"""
+
+    k = len(names)
+    delta = MORRIS_LEVELS / (2 * (MORRIS_LEVELS - 1))
+    base_levels = np.arange(MORRIS_LEVELS // 2) / (MORRIS_LEVELS - 1)
+
+    base = rng.choice(base_levels, size=(trajectories, k))
+    signs = rng.choice([-1.0, 1.0], size=(trajectories, k))
+    start = np.where(signs > 0, base, base + delta)
+    order = np.argsort(rng.random((trajectories, k)), axis=1)
+
+    # points[t, s] is the s-th point of trajectory t; step s moves factor order[t, s]
+    points = np.repeat(start[:, None, :], k + 1, axis=1)
+    rows = np.arange(trajectories)
+    for step in range(k):
+        moved = order[:, step]
+        points[:, step + 1:, :][rows, :, moved] += (signs[rows, moved] * delta)[:, None]
+
+    outputs = _evaluate(simulator, names, points.reshape(-1, k), bounds, workers)
+    outputs = outputs.reshape(trajectories, k + 1, -1)
+
+    effects = np.empty((trajectories, k, outputs.shape[2]))
+    for step in range(k):
+        moved = order[:, step]
+        change = outputs[:, step + 1] - outputs[:, step]
+        effects[rows, moved] = change / (signs[rows, moved] * delta)[:, None]
+
+    return {
+        'mu': effects.mean(axis=0),
+        'mu_star': np.abs(effects).mean(axis=0),
+        'sigma': effects.std(axis=0, ddof=1) if trajectories > 1 else np.zeros(effects.shape[1:])
+    }, trajectories * (k + 1)
+
+
+def _sobol(simulator, names, bounds, samples, rng, workers):
+    """First-order (Saltelli 2010) and total (Jansen) Sobol indices with bootstrap intervals"""
+
+    k = len(names)
+    a = rng.random((samples, k))
+    b = rng.random((samples, k))
+    ab = np.repeat(a[None, :, :], k, axis=0)
+    ab[np.arange(k), :, np.arange(k)] = b.T
+
+    outputs = _evaluate(simulator, names, np.concatenate([a, b, ab.reshape(-1, k)]), bounds, workers)
+    f_a, f_b = outputs[:samples], outputs[samples:2 * samples]
+    f_ab = outputs[2 * samples:].reshape(k, samples, -1)
+
+    def indices(index):
+        fa, fb, fab = f_a[index], f_b[index], f_ab[:, index]
+        variance = np.var(np.concatenate([fa, fb]), axis=0)
+        variance = np.where(variance > 0, variance, np.nan)
+        first = np.mean(fb * (fab - fa), axis=1) / variance
+        total = 0.5 * np.mean((fa - fab) ** 2, axis=1) / variance
+        return first, total
+
+    first, total = indices(np.arange(samples))
+    resamples = rng.integers(0, samples, size=(BOOTSTRAP_RESAMPLES, samples))
+    boot = [indices(index) for index in resamples]
+    first_conf = 1.96 * np.std([s1 for s1, _ in boot], axis=0)
+    total_conf = 1.96 * np.std([st for _, st in boot], axis=0)
+
+    return {'S1': first, 'S1_conf': first_conf, 'ST': total, 'ST_conf': total_conf}, samples * (k + 2)
+
+
+def run_sensitivity(simulator, factors=None, sobol_samples=DEFAULT_SOBOL_SAMPLES,
+                    morris_trajectories=DEFAULT_MORRIS_TRAJECTORIES, seed=42, workers=None):
+    """
+    Global sensitivity of temp_reduction and revenue_gain_daily
+
+    Every weather input and every scalar simulator constant is a factor.
+    Constants are varied by assigning arrays to the simulator attributes,
+    which the vectorized kernels broadcast like any other input.
+
+    Args:
+        simulator: ThermalSimulator holding the nominal constants
+        factors: Overrides of default_factors(), name -> (low, high)
+        sobol_samples: Base samples N (N * (k + 2) model evaluations)
+        morris_trajectories: Morris trajectories r (r * (k + 1) evaluations)
+        seed: Random seed
+        workers: Worker processes (defaults to CPU count)
+
+    Returns:
+        dict: Per-output, per-factor Morris and Sobol measures
+    """
+
+    ranges = default_factors(simulator)
+    ranges.update(factors or {})
+    names = list(ranges)
+    bounds = np.array([ranges[name] for name in names], dtype=np.float64)
+    workers = workers or os.cpu_count() or 1
+    rng = np.random.default_rng(seed)
+
+    morris, morris_evaluations = _morris(simulator, names, bounds, morris_trajectories, rng, workers)
+    sobol, sobol_evaluations = _sobol(simulator, names, bounds, sobol_samples, rng, workers)
+
+    def clean(value):
+        return None if np.isnan(value) else round(float(value), 4)
+
+    results = {}
+    for j, output in enumerate(SENSITIVITY_OUTPUTS):
+        per_factor = {
+            name: {
+                'morris': {measure: clean(values[i, j]) for measure, values in morris.items()},
+                'sobol': {measure: clean(values[i, j]) for measure, values in sobol.items()}
+            }
+            for i, name in enumerate(names)
+        }
+        ranking = sorted(names, key=lambda n: -(per_factor[n]['sobol']['ST'] or 0))
+        results[output] = {'factors': per_factor, 'ranking_by_total_effect': ranking}
+
+    return {
+        'factors': {name: list(ranges[name]) for name in names},
+        'model_evaluations': {'morris': morris_evaluations, 'sobol': sobol_evaluations},
+        'seed': seed,
+        'outputs': results
+    }
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+HHDAO Thermal Simulation Service
+Long-running JSON-RPC 2.0 server over a Unix socket or stdin/stdout
+
+Requests and responses are newline-delimited JSON. Concurrent
+simulate_cooling requests (including the members of a JSON-RPC batch)
+are micro-batched into a single simulate_cooling_batch call. Daily,
+annual and design-optimization calls run in a process pool, so a long
+run never stalls the event loop, the batcher or other clients.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from thermal_results import json_default
+from thermal_simulation import COOLING_RESULT_PRECISION
+
+BATCH_WINDOW_SECONDS = 0.002  # Wait for more simulate_cooling requests before evaluating
+MAX_BATCH_SIZE = 65536
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+COOLING_PARAMS = ('ambient_temp', 'solar_load', 'humidity', 'wind_speed')
+COOLING_DEFAULTS = {'ambient_temp': 35, 'solar_load': 50, 'humidity': 65, 'wind_speed': 5}
+POOLED_METHODS = ('simulate_daily_cycle', 'simulate_annual', 'optimize_thermal_design')
+
+
+class RPCError(Exception):
+    """Error returned to the client as a JSON-RPC error object"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def cooling_params(params):
+    """
+    Validate simulate_cooling params and fill defaults
+
+    Raises:
+        RPCError: INVALID_PARAMS for unknown names or non-numeric values
+    """
+
+    if not isinstance(params, dict):
+        raise RPCError(INVALID_PARAMS, 'params must be an object')
+    unknown = set(params) - set(COOLING_PARAMS)
+    if unknown:
+        raise RPCError(INVALID_PARAMS, f"Unknown parameters: {sorted(unknown)}")
+    for name, value in params.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise RPCError(INVALID_PARAMS, f"{name} must be a number")
+    return dict(COOLING_DEFAULTS, **params)
+
+
+def _run_pooled(simulator, method, params):
+    """Worker entry point: one simulator method call"""
+
+    return getattr(simulator, method)(**params)
+
+
+class CoolingBatcher:
+    """Collects concurrent simulate_cooling requests into vectorized batches"""
+
+    def __init__(self, simulator, window=BATCH_WINDOW_SECONDS, max_size=MAX_BATCH_SIZE):
+        self.simulator = simulator
+        self.window = window
+        self.max_size = max_size
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, params):
+        """Queue one request and wait for its rounded result dict"""
+
+        return (await self.submit_many([params]))[0]
+
+    async def submit_many(self, params_list):
+        """Queue several requests as one group and wait for their result dicts"""
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((params_list, future))
+        return await future
+
+    async def run(self):
+        """Drain the queue, evaluating whatever arrives within each batch window"""
+
+        while True:
+            pending = [await self.queue.get()]
+            size = len(pending[0][0])
+            deadline = time.monotonic() + self.window
+            while size < self.max_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                size += len(pending[-1][0])
+            try:
+                self._evaluate(pending)
+            except Exception as e:
+                # A failed batch fails only its own requests; the loop keeps serving
+                self._fail(pending, e)
+
+    @staticmethod
+    def _fail(pending, error):
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RPCError(INTERNAL_ERROR, str(error)))
+
+    def _evaluate(self, pending):
+        """Evaluate queued groups with one vectorized call"""
+
+        try:
+            params = [p for group, _ in pending for p in group]
+            columns = {name: np.array([p[name] for p in params], dtype=np.float64) for name in COOLING_PARAMS}
+            batch = self.simulator.simulate_cooling_batch(**columns)
+        except Exception as e:
+            self._fail(pending, e)
+            return
+
+        self.batches += 1
+        self.requests += len(params)
+        rounded = {key: np.asarray(batch[key]).tolist() for key in COOLING_RESULT_PRECISION}
+        offset = 0
+        for group, future in pending:
+            results = [
+                {key: round(rounded[key][i], digits) for key, digits in COOLING_RESULT_PRECISION.items()}
+                for i in range(offset, offset + len(group))
+            ]
+            offset += len(group)
+            if not future.done():
+                future.set_result(results)
+
+
+class ThermalService:
+    """Dispatches JSON-RPC requests to a ThermalSimulator"""
+
+    def __init__(self, simulator, idle_timeout=None, workers=None):
+        self.simulator = simulator
+        self.batcher = CoolingBatcher(simulator)
+        self.idle_timeout = idle_timeout
+        # Worker processes start on the first pooled call
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.in_flight = 0
+        self.last_activity = time.monotonic()
+        self.started = time.monotonic()
+        self.stopping = asyncio.Event()
+
+    async def handle_line(self, line):
+        """Handle one request line, returning the response line (or None for notifications)"""
+
+        self.last_activity = time.monotonic()
+        self.in_flight += 1
+        try:
+            return await self._handle_line(line)
+        finally:
+            self.in_flight -= 1
+            self.last_activity = time.monotonic()
+
+    async def _handle_line(self, line):
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return json.dumps(self._error(None, PARSE_ERROR, 'Parse error'))
+
+        if isinstance(message, list):
+            if not message:
+                return json.dumps(self._error(None, INVALID_REQUEST, 'Empty batch'))
+            responses = await self._handle_batch(message)
+            responses = [r for r in responses if r is not None]
+            return json.dumps(responses, default=json_default) if responses else None
+
+        response = await self._handle(message)
+        return json.dumps(response, default=json_default) if response is not None else None
+
+    async def _handle_batch(self, messages):
+        """Handle a JSON-RPC batch, vectorizing its simulate_cooling members together"""
+
+        # Valid simulate_cooling members are vectorized; invalid ones get their error from _handle
+        cooling, params = [], []
+        for i, m in enumerate(messages):
+            if isinstance(m, dict) and m.get('method') == 'simulate_cooling' and 'id' in m:
+                try:
+                    params.append(cooling_params(m.get('params') or {}))
+                    cooling.append(i)
+                except RPCError:
+                    pass
+        vectorized = set(cooling)
+        others = [i for i in range(len(messages)) if i not in vectorized]
+
+        responses = [None] * len(messages)
+        other_task = asyncio.gather(*(self._handle(messages[i]) for i in others))
+        if cooling:
+            try:
+                results = await self.batcher.submit_many(params)
+                for i, result in zip(cooling, results):
+                    responses[i] = {'jsonrpc': '2.0', 'id': messages[i]['id'], 'result': result}
+            except RPCError as e:
+                for i in cooling:
+                    responses[i] = self._error(messages[i]['id'], e.code, e.message)
+        for i, response in zip(others, await other_task):
+            responses[i] = response
+        return responses
+
+    async def _handle(self, message):
+        """Handle one request object, returning the response object"""
+
+        if not isinstance(message, dict) or not isinstance(message.get('method'), str):
+            return self._error(None, INVALID_REQUEST, 'Invalid request')
+
+        request_id = message.get('id')
+        params = message.get('params') or {}
+        try:
+            if not isinstance(params, dict):
+                raise RPCError(INVALID_PARAMS, 'params must be an object')
+            result = await self._dispatch(message['method'], params)
+        except RPCError as e:
+            return self._error(request_id, e.code, e.message) if 'id' in message else None
+        except TypeError as e:
+            return self._error(request_id, INVALID_PARAMS, str(e)) if 'id' in message else None
+        except Exception as e:
+            return self._error(request_id, INTERNAL_ERROR, str(e)) if 'id' in message else None
+
+        if 'id' not in message:
+            return None
+        return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+
+    async def _dispatch(self, method, params):
+        """Route a method call to the simulator"""
+
+        if method == 'simulate_cooling':
+            return await self.batcher.submit(cooling_params(params))
+        if method in POOLED_METHODS:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool, _run_pooled, self.simulator, method, params)
+        if method == 'ping':
+            return 'pong'
+        if method == 'stats':
+            stats = {
+                'uptime_seconds': round(time.monotonic() - self.started, 1),
+                'cooling_requests': self.batcher.requests,
+                'cooling_batches': self.batcher.batches
+            }
+            if self.simulator.result_cache is not None:
+                stats['result_cache'] = self.simulator.result_cache.stats()
+            return stats
+        if method == 'shutdown':
+            self.stopping.set()
+            return 'stopping'
+        raise RPCError(METHOD_NOT_FOUND, f"Method not found: {method}")
+
+    @staticmethod
+    def _error(request_id, code, message):
+        return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+    async def _serve_stream(self, reader, write):
+        """Read request lines and write responses, handling requests concurrently"""
+
+        tasks = set()
+
+        async def respond(line):
+            response = await self.handle_line(line)
+            if response is not None:
+                await write(response + '\n')
+
+        while not self.stopping.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            task = asyncio.create_task(respond(line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def _watch_idle(self):
+        """Stop the service after idle_timeout seconds with no request in progress"""
+
+        while not self.stopping.is_set():
+            await asyncio.sleep(1)
+            idle = time.monotonic() - self.last_activity
+            if self.idle_timeout and not self.in_flight and idle > self.idle_timeout:
+                self.stopping.set()
+
+    async def serve_unix(self, socket_path):
+        """Serve clients on a Unix domain socket until shutdown or idle timeout"""
+
+        async def on_client(reader, writer):
+            async def write(text):
+                writer.write(text.encode())
+                await writer.drain()
+            try:
+                await self._serve_stream(reader, write)
+            finally:
+                writer.close()
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = await asyncio.start_unix_server(on_client, path=socket_path, limit=2**24)
+        batcher = asyncio.create_task(self.batcher.run())
+        idle = asyncio.create_task(self._watch_idle())
+        print(f"🛰️  Thermal simulation service listening on {socket_path}", file=sys.stderr)
+        try:
+            await self.stopping.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+            batcher.cancel()
+            idle.cancel()
+            self.pool.shutdown(cancel_futures=True)
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+    async def serve_stdio(self):
+        """Serve a single client over stdin/stdout"""
+
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=2**24)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+        async def write(text):
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+        batcher = asyncio.create_task(self.batcher.run())
+        serve = asyncio.create_task(self._serve_stream(reader, write))
+        stop = asyncio.create_task(self.stopping.wait())
+        try:
+            await asyncio.wait({serve, stop}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (batcher, serve, stop):
+                task.cancel()
+            self.pool.shutdown(cancel_futures=True)
+
+
+def serve(simulator, socket_path=None, idle_timeout=None, workers=None):
+    """Run the service on a Unix socket, or on stdin/stdout when no socket is given"""
+
+    service = ThermalService(simulator, idle_timeout=idle_timeout, workers=workers)
+    if socket_path:
+        asyncio.run(service.serve_unix(socket_path))
+    else:
+        asyncio.run(service.serve_stdio())
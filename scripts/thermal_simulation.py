@@ -5,13 +5,67 @@ Implements waterless cooling models and heat optimization for solar farms
 """
 
 import numpy as np
+import functools
+import inspect
 import json
+import os
 import sys
 import argparse
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
 from pathlib import Path
 
+from thermal_climate import daily_weather, site_weather
+from thermal_physics import PHYSICS_PROFILES, array_panel_temperature, panel_efficiency
+from thermal_results import ColumnarResult, from_cacheable, json_default, to_cacheable, write_result
+
+# Decimal places applied when presenting simulate_cooling results
+COOLING_RESULT_PRECISION = {
+    'baseline_temp': 2,
+    'optimized_temp': 2,
+    'temp_reduction': 2,
+    'baseline_efficiency': 2,
+    'optimized_efficiency': 2,
+    'efficiency_gain': 2,
+    'water_saved': 1,
+    'terracotta_contribution': 2,
+    'air_cooling_contribution': 2,
+    'radiative_contribution': 2,
+    'power_gain_kw': 3,
+    'revenue_gain_daily': 2
+}
+
+CACHE_ROOT = Path(os.getenv("HHDAO_CACHE_DIR", Path.home() / ".cache" / "hhdao"))
+
+HOURS_PER_YEAR = 8760
+ANNUAL_CHUNK_HOURS = 24 * 31  # Steps evaluated per array batch in annual mode
+
+# Bump when model code changes results without changing any constant
+MODEL_VERSION = 3
+
+PARAMETER_FILE_FORMAT = 'hhdao-thermal-parameters'
+
+def cached_simulation(ignore=()):
+    """Serve a deterministic simulator method from the result cache when one is enabled"""
+    
+    def decorator(method):
+        signature = inspect.signature(method)
+        
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.result_cache is None:
+                return method(self, *args, **kwargs)
+            
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            inputs = {k: v for k, v in bound.arguments.items() if k != 'self' and k not in ignore}
+            key = self.result_cache.key(method.__name__, inputs, self.fingerprint())
+            return from_cacheable(self.result_cache.get_or_compute(
+                key, method.__name__, lambda: to_cacheable(method(self, *args, **kwargs))
+            ))
+        
+        return wrapper
+    return decorator
+
 class ThermalSimulator:
     def __init__(self):
         # Physical constants
@@ -24,16 +78,84 @@ class ThermalSimulator:
         self.TERRACOTTA_THERMAL_CONDUCTIVITY = 0.8  # W/m·K
         self.TERRACOTTA_POROSITY = 0.25
         
+        # Empirical cooling coefficients (fitted by thermal_calibration.py)
+        self.TERRACOTTA_CONVECTION_FACTOR = 0.3
+        self.EVAPORATIVE_COOLING_MAX = 2.0  # °C per unit evaporation potential
+        self.THERMAL_MASS_FACTOR = 0.05
+        self.AIR_CONVECTION_BASE = 5  # W/m²K
+        self.AIR_CONVECTION_PER_WIND = 1.2  # W/m²K per m/s
+        self.RADIATIVE_COOLING_DIVISOR = 50  # W/m² per °C of cooling
+        
         # Solar panel efficiency parameters
         self.PANEL_REFERENCE_EFFICIENCY = 0.22  # 22% at 25°C
         self.TEMPERATURE_COEFFICIENT = -0.0035  # %/°C loss
         self.REFERENCE_TEMPERATURE = 25  # °C
         
+        # Forced air circulation
+        self.FAN_AIRFLOW_PER_KW = 4.0  # m/s effective wind added per kW of fans
+        
+        # Lumped thermal masses for transient runs (reference 200 m² array)
+        self.PANEL_HEAT_CAPACITY = 2.2e6  # J/K, glass and aluminium frames
+        self.TERRACOTTA_HEAT_CAPACITY = 3.4e6  # J/K, vent blocks at full coverage
+        self.PANEL_TERRACOTTA_CONDUCTANCE = 84  # W/K
+        self.TERRACOTTA_AMBIENT_CONDUCTANCE = 84  # W/K
+        
         # Urgam Valley specific parameters
         self.ALTITUDE = 250  # meters above sea level
         self.HUMIDITY_RANGE = (45, 85)  # % relative humidity range
         self.WIND_SPEED_RANGE = (2, 15)  # m/s
         
+        # Optional disk-backed result cache (see enable_result_cache)
+        self.result_cache = None
+    
+    def parameters(self):
+        """Physical and site constants that determine simulation results"""
+        
+        return {key: value for key, value in vars(self).items() if key.isupper()}
+    
+    def load_parameters(self, path):
+        """
+        Apply a parameter file written by thermal_calibration.py
+        
+        Returns:
+            dict: The file's metadata (version, source and fit statistics)
+        """
+        
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('format') != PARAMETER_FILE_FORMAT:
+            raise ValueError(f"{path} is not a thermal parameter file")
+        
+        known = self.parameters()
+        unknown = set(data['parameters']) - set(known)
+        if unknown:
+            raise ValueError(f"Unknown parameters in {path}: {sorted(unknown)}")
+        for name, value in data['parameters'].items():
+            setattr(self, name, value)
+        return {key: value for key, value in data.items() if key != 'parameters'}
+    
+    def fingerprint(self):
+        """Everything besides call inputs that determines simulation results"""
+        
+        return {
+            'model_version': MODEL_VERSION,
+            'parameters': self.parameters()
+        }
+    
+    def enable_result_cache(self, path=CACHE_ROOT / 'thermal_results.sqlite', max_bytes=None):
+        """
+        Cache daily, annual and design-optimization results on disk
+        
+        Entries are content-addressed by the call inputs and fingerprint(),
+        so changing a constant such as TERRACOTTA_POROSITY never serves a
+        stale result.
+        """
+        
+        from thermal_cache import DEFAULT_MAX_BYTES, ResultCache
+        
+        self.result_cache = ResultCache(path, max_bytes=max_bytes or DEFAULT_MAX_BYTES)
+        return self.result_cache
+    
     def simulate_cooling(self, ambient_temp=35, solar_load=50, humidity=65, wind_speed=5):
         """
         Simulate waterless cooling system performance
@@ -48,27 +170,51 @@ class ThermalSimulator:
             dict: Cooling simulation results
         """
         
-        # Baseline panel temperature without cooling
-        baseline_temp = ambient_temp + (solar_load * 1000) / (200 * 4)  # Simplified model
-        
-        # Terracotta passive cooling effect
-        terracotta_cooling = self._calculate_terracotta_cooling(
-            ambient_temp, baseline_temp, humidity, wind_speed
+        batch = self.simulate_cooling_batch(
+            np.array([ambient_temp], dtype=np.float64),
+            np.array([solar_load], dtype=np.float64),
+            np.array([humidity], dtype=np.float64),
+            np.array([wind_speed], dtype=np.float64)
         )
         
-        # Air circulation cooling
-        air_cooling = self._calculate_air_cooling(
-            baseline_temp, ambient_temp, wind_speed
+        return {
+            key: round(float(batch[key][0]), digits)
+            for key, digits in COOLING_RESULT_PRECISION.items()
+        }
+    
+    def simulate_cooling_batch(self, ambient_temp, solar_load, humidity, wind_speed):
+        """
+        Vectorized waterless cooling simulation over many conditions
+        
+        Args:
+            ambient_temp: Ambient temperatures (°C), array-like
+            solar_load: Solar thermal loads (kW), array-like
+            humidity: Relative humidities (%), array-like
+            wind_speed: Wind speeds (m/s), array-like
+        
+        Inputs are broadcast against each other.
+        
+        Returns:
+            dict: Columnar float64 arrays keyed like simulate_cooling, unrounded
+        """
+        
+        ambient_temp, solar_load, humidity, wind_speed = np.broadcast_arrays(
+            np.asarray(ambient_temp, dtype=np.float64),
+            np.asarray(solar_load, dtype=np.float64),
+            np.asarray(humidity, dtype=np.float64),
+            np.asarray(wind_speed, dtype=np.float64)
         )
         
-        # Radiative cooling (night sky)
-        radiative_cooling = self._calculate_radiative_cooling(
-            baseline_temp, ambient_temp
+        # Baseline panel temperature without cooling
+        baseline_temp = self._baseline_temperature(ambient_temp, solar_load)
+        
+        terracotta_cooling, air_cooling, radiative_cooling = self._cooling_components(
+            ambient_temp, baseline_temp, humidity, wind_speed
         )
         
         # Combined cooling effect
         total_cooling = terracotta_cooling + air_cooling + radiative_cooling
-        final_temp = max(baseline_temp - total_cooling, ambient_temp)
+        final_temp = np.maximum(baseline_temp - total_cooling, ambient_temp)
         
         # Calculate efficiency gain
         baseline_efficiency = self._calculate_efficiency(baseline_temp)
@@ -76,53 +222,78 @@ class ThermalSimulator:
         efficiency_gain = optimized_efficiency - baseline_efficiency
         
         # Water savings calculation
-        conventional_water_usage = solar_load * 0.3  # L/kW typical
+        conventional_water_usage = solar_load * 0.3  # L/h per kW of load, typical
         water_saved = conventional_water_usage  # 100% saved with waterless system
         
         return {
-            'baseline_temp': round(baseline_temp, 2),
-            'optimized_temp': round(final_temp, 2),
-            'temp_reduction': round(baseline_temp - final_temp, 2),
-            'baseline_efficiency': round(baseline_efficiency * 100, 2),
-            'optimized_efficiency': round(optimized_efficiency * 100, 2),
-            'efficiency_gain': round(efficiency_gain * 100, 2),
-            'water_saved': round(water_saved, 1),
-            'terracotta_contribution': round(terracotta_cooling, 2),
-            'air_cooling_contribution': round(air_cooling, 2),
-            'radiative_contribution': round(radiative_cooling, 2),
-            'power_gain_kw': round(solar_load * efficiency_gain, 3),
-            'revenue_gain_daily': round(solar_load * efficiency_gain * 6 * 4.5, 2)  # ₹4.5/kWh
+            'baseline_temp': baseline_temp,
+            'optimized_temp': final_temp,
+            'temp_reduction': baseline_temp - final_temp,
+            'baseline_efficiency': baseline_efficiency * 100,
+            'optimized_efficiency': optimized_efficiency * 100,
+            'efficiency_gain': efficiency_gain * 100,
+            'water_saved': water_saved,
+            'terracotta_contribution': terracotta_cooling,
+            'air_cooling_contribution': air_cooling,
+            'radiative_contribution': radiative_cooling,
+            'power_gain_kw': solar_load * efficiency_gain,
+            'revenue_gain_daily': solar_load * efficiency_gain * 6 * 4.5  # ₹4.5/kWh
         }
     
+    def _cooling_components(self, ambient_temp, baseline_temp, humidity, wind_speed):
+        """Terracotta, air and radiative cooling from the physics kernels"""
+        
+        # Terracotta passive cooling effect
+        terracotta_cooling = self._calculate_terracotta_cooling(
+            ambient_temp, baseline_temp, humidity, wind_speed
+        )
+        
+        # Air circulation cooling
+        air_cooling = self._calculate_air_cooling(
+            baseline_temp, ambient_temp, wind_speed
+        )
+        
+        # Radiative cooling (night sky)
+        radiative_cooling = self._calculate_radiative_cooling(
+            baseline_temp, ambient_temp
+        )
+        
+        return terracotta_cooling, air_cooling, radiative_cooling
+    
     def _calculate_terracotta_cooling(self, ambient_temp, panel_temp, humidity, wind_speed):
         """Calculate cooling effect from terracotta ventilation system"""
         
         # Evaporation potential based on humidity
-        evap_potential = max(0, (100 - humidity) / 100) * 0.8
+        evap_potential = np.maximum(0, (100 - humidity) / 100) * 0.8
         
         # Porosity effect on air circulation
         porosity_factor = self.TERRACOTTA_POROSITY * 1.5
         
         # Wind-assisted convection through terracotta
-        convection_cooling = porosity_factor * wind_speed * 0.3 * (panel_temp - ambient_temp) / 30
+        convection_cooling = porosity_factor * wind_speed * self.TERRACOTTA_CONVECTION_FACTOR * (panel_temp - ambient_temp) / 30
         
         # Evaporative cooling (limited by humidity)
-        evap_cooling = evap_potential * 2.0  # °C reduction
+        evap_cooling = evap_potential * self.EVAPORATIVE_COOLING_MAX  # °C reduction
         
         # Thermal mass effect (delayed heat release)
-        thermal_mass_cooling = min(3.0, (panel_temp - ambient_temp) * 0.05)
+        thermal_mass_cooling = self._calculate_thermal_mass_cooling(panel_temp, ambient_temp)
         
         return convection_cooling + evap_cooling + thermal_mass_cooling
     
+    def _calculate_thermal_mass_cooling(self, panel_temp, ambient_temp):
+        """Steady-state stand-in for heat absorbed by the terracotta mass"""
+        
+        return np.minimum(3.0, (panel_temp - ambient_temp) * self.THERMAL_MASS_FACTOR)
+    
     def _calculate_air_cooling(self, panel_temp, ambient_temp, wind_speed):
         """Calculate forced air circulation cooling"""
         
         # Enhanced convection with forced air circulation
-        convection_coefficient = 5 + wind_speed * 1.2  # W/m²K
+        convection_coefficient = self.AIR_CONVECTION_BASE + wind_speed * self.AIR_CONVECTION_PER_WIND  # W/m²K
         temp_diff = panel_temp - ambient_temp
         
         # Cooling effect (simplified)
-        air_cooling_effect = min(8.0, convection_coefficient * temp_diff / 100)
+        air_cooling_effect = np.minimum(8.0, convection_coefficient * temp_diff / 100)
         
         return air_cooling_effect
     
@@ -140,25 +311,32 @@ class ThermalSimulator:
         )
         
         # Convert to temperature reduction (simplified)
-        radiative_cooling = min(5.0, radiative_flux / 50)
+        radiative_cooling = np.minimum(5.0, radiative_flux / self.RADIATIVE_COOLING_DIVISOR)
         
         return radiative_cooling
     
-    def _calculate_efficiency(self, temperature):
-        """Calculate solar panel efficiency based on temperature"""
-        
-        temp_diff = temperature - self.REFERENCE_TEMPERATURE
-        efficiency = self.PANEL_REFERENCE_EFFICIENCY * (
-            1 + self.TEMPERATURE_COEFFICIENT * temp_diff
+    def physics_profile(self):
+        """thermal_physics profile carrying this simulator's panel constants"""
+        
+        return dict(
+            PHYSICS_PROFILES['simulator'],
+            reference_efficiency=self.PANEL_REFERENCE_EFFICIENCY,
+            temperature_coefficient=self.TEMPERATURE_COEFFICIENT,
+            reference_temperature=self.REFERENCE_TEMPERATURE
         )
+    
+    def _baseline_temperature(self, ambient_temp, solar_load):
+        """Uncooled panel temperature (simplified array heat-loss model)"""
         
-        return max(0.1, efficiency)  # Minimum 10% efficiency
+        return array_panel_temperature(ambient_temp, solar_load, self.physics_profile())
     
-    def simulate_daily_cycle(self, date_str="2025-10-05"):
-        """Simulate full day thermal performance"""
+    def _calculate_efficiency(self, temperature):
+        """Calculate solar panel efficiency based on temperature"""
         
-        # Urgam Valley typical weather pattern
-        hours = np.arange(0, 24, 0.5)
+        return panel_efficiency(temperature, self.physics_profile())  # Floored at the profile's min_efficiency
+    
+    def _weather_profile(self, hours):
+        """Urgam Valley typical weather pattern for hour-of-day values"""
         
         # Temperature profile (sinusoidal approximation)
         min_temp = 22  # °C (night)
@@ -173,122 +351,357 @@ class ThermalSimulator:
         humidities = 65 + 15 * np.sin(np.pi * hours / 24)  # Higher at night
         wind_speeds = 3 + 5 * np.sin(np.pi * (hours - 12) / 12)  # Peak afternoon
         
-        results = []
-        total_energy_gain = 0
-        total_water_saved = 0
-        
-        for i, hour in enumerate(hours):
-            if solar_loads[i] > 5:  # Only during productive hours
-                sim_result = self.simulate_cooling(
-                    ambient_temp=temps[i],
-                    solar_load=solar_loads[i],
-                    humidity=humidities[i],
-                    wind_speed=wind_speeds[i]
-                )
-                
-                sim_result['hour'] = hour
-                sim_result['solar_load'] = round(solar_loads[i], 1)
-                results.append(sim_result)
+        return temps, solar_loads, humidities, wind_speeds
+    
+    def _hourly_weather(self, steps, site=None):
+        """Weather at hour-of-year steps: the typical day, or a site's seasonal climate"""
+        
+        if site is None:
+            return self._weather_profile(steps % 24)
+        return site_weather(site, steps // 24 + 1, steps % 24)
+    
+    def _accumulate_cycle(self, totals, batch, step_hours):
+        """Add one productive-step batch to running cycle totals"""
+        
+        # Power and water rates are weighted by step duration, as in weather-file runs
+        totals['energy_gain_kwh'] += float(np.sum(batch['power_gain_kw'])) * step_hours
+        totals['water_saved_liters'] += float(np.sum(batch['water_saved'])) * step_hours
+        totals['temp_reduction_sum'] += float(np.sum(batch['temp_reduction']))
+        totals['efficiency_gain_sum'] += float(np.sum(batch['efficiency_gain']))
+        totals['productive_steps'] += int(batch['power_gain_kw'].size)
+        return totals
+    
+    def _summarize_cycle(self, totals):
+        """Present running cycle totals as a rounded summary"""
+        
+        steps = totals['productive_steps']
+        return {
+            'total_energy_gain_kwh': round(totals['energy_gain_kwh'], 2),
+            'total_water_saved_liters': round(totals['water_saved_liters'], 1),
+            'average_temp_reduction': round(totals['temp_reduction_sum'] / steps, 2) if steps else None,
+            'average_efficiency_gain': round(totals['efficiency_gain_sum'] / steps, 2) if steps else None,
+            'estimated_revenue_gain_inr': round(totals['energy_gain_kwh'] * 4.5, 2)
+        }
+    
+    def _summarize_year(self, year, totals):
+        """Rounded summary of one simulated year's running totals"""
+        
+        summary = {'year': year + 1, 'productive_hours': totals['productive_steps']}
+        summary.update(self._summarize_cycle(totals))
+        return summary
+    
+    @staticmethod
+    def _empty_cycle_totals():
+        """Fresh running totals for a simulated cycle"""
+        return {
+            'energy_gain_kwh': 0.0,
+            'water_saved_liters': 0.0,
+            'temp_reduction_sum': 0.0,
+            'efficiency_gain_sum': 0.0,
+            'productive_steps': 0
+        }
+    
+    @cached_simulation()
+    def simulate_daily_cycle(self, date_str="2025-10-05", site=None):
+        """
+        Simulate full day thermal performance
+        
+        Without a site the date is informational and the typical Urgam Valley
+        profile is used; with a site (name or climate dict, see thermal_climate)
+        the profile follows that site's climate on date_str.
+        """
+        
+        hours = np.arange(0, 24, 0.5)
+        if site is None:
+            temps, solar_loads, humidities, wind_speeds = self._weather_profile(hours)
+        else:
+            temps, solar_loads, humidities, wind_speeds = daily_weather(site, date_str, hours)
+        
+        # Only during productive hours
+        productive = solar_loads > 5
+        batch = self.simulate_cooling_batch(
+            temps[productive], solar_loads[productive],
+            humidities[productive], wind_speeds[productive]
+        )
+        
+        columns = {key: batch[key] for key in COOLING_RESULT_PRECISION}
+        columns['hour'] = hours[productive]
+        columns['solar_load'] = solar_loads[productive]
+        
+        # Accumulate daily totals (0.5 hour intervals)
+        totals = self._accumulate_cycle(self._empty_cycle_totals(), batch, 0.5)
+        
+        return ColumnarResult(
+            {'date': date_str, 'hourly_results': None, 'daily_summary': self._summarize_cycle(totals)},
+            'hourly_results', columns, dict(COOLING_RESULT_PRECISION, solar_load=1)
+        )
+    
+    def iter_annual_cycle(self, years=1, chunk_hours=ANNUAL_CHUNK_HOURS, site=None):
+        """
+        Simulate hourly thermal performance over several years
+        
+        Steps are evaluated in chunks of at most chunk_hours so memory stays
+        bounded regardless of the horizon. With a site, each day follows that
+        site's seasonal climate instead of the fixed typical day.
+        
+        Yields:
+            dict: One aggregate summary per simulated year
+        """
+        
+        for year, totals in enumerate(self._iter_annual_totals(years, chunk_hours, site)):
+            yield self._summarize_year(year, totals)
+    
+    def _iter_annual_totals(self, years, chunk_hours, site):
+        """Unrounded running cycle totals for each simulated year"""
+        
+        for _ in range(years):
+            totals = self._empty_cycle_totals()
+            for start in range(0, HOURS_PER_YEAR, chunk_hours):
+                steps = np.arange(start, min(start + chunk_hours, HOURS_PER_YEAR), dtype=np.float64)
+                temps, solar_loads, humidities, wind_speeds = self._hourly_weather(steps, site)
                 
-                # Accumulate daily totals (0.5 hour intervals)
-                total_energy_gain += sim_result['power_gain_kw'] * 0.5
-                total_water_saved += sim_result['water_saved']
+                productive = solar_loads > 5
+                batch = self.simulate_cooling_batch(
+                    temps[productive], solar_loads[productive],
+                    humidities[productive], wind_speeds[productive]
+                )
+                self._accumulate_cycle(totals, batch, 1.0)
+            yield totals
+    
+    @cached_simulation()
+    def simulate_annual(self, years=1, chunk_hours=ANNUAL_CHUNK_HOURS, site=None):
+        """Simulate multi-year hourly performance and collect yearly aggregates"""
+        
+        # Lifetime totals add unrounded yearly totals; only the output is rounded
+        yearly = []
+        total_energy_gain = 0.0
+        total_water_saved = 0.0
+        for year, totals in enumerate(self._iter_annual_totals(years, chunk_hours, site)):
+            yearly.append(self._summarize_year(year, totals))
+            total_energy_gain += totals['energy_gain_kwh']
+            total_water_saved += totals['water_saved_liters']
         
         return {
-            'date': date_str,
-            'hourly_results': results,
-            'daily_summary': {
+            'years': years,
+            'steps': HOURS_PER_YEAR * years,
+            'yearly_results': yearly,
+            'lifetime_summary': {
                 'total_energy_gain_kwh': round(total_energy_gain, 2),
                 'total_water_saved_liters': round(total_water_saved, 1),
-                'average_temp_reduction': round(np.mean([r['temp_reduction'] for r in results]), 2),
-                'average_efficiency_gain': round(np.mean([r['efficiency_gain'] for r in results]), 2),
                 'estimated_revenue_gain_inr': round(total_energy_gain * 4.5, 2)
             }
         }
     
-    def optimize_thermal_design(self, constraints=None):
-        """Optimize thermal management system design"""
+    @cached_simulation()
+    def simulate_degradation(self, years=25, chunk_hours=ANNUAL_CHUNK_HOURS, site=None):
+        """
+        Simulate hourly performance over a long horizon with temperature-driven aging
         
-        if constraints is None:
-            constraints = {
-                'max_budget_inr': 500000,  # ₹5 lakh
-                'max_maintenance_hours_month': 20,
-                'min_efficiency_gain': 0.05,  # 5%
-                'water_savings_target': 0.8   # 80%
-            }
+        See thermal_degradation.simulate_degradation for the model.
+        """
         
-        # Design parameters to optimize
-        designs = [
-            {
-                'name': 'Basic Terracotta Vents',
-                'terracotta_coverage': 0.3,
-                'air_circulation_power': 0,
-                'cost_inr': 150000,
-                'maintenance_hours': 8,
-                'expected_gain': 0.08
-            },
-            {
-                'name': 'Enhanced Passive System',
-                'terracotta_coverage': 0.6,
-                'air_circulation_power': 0.2,  # kW
-                'cost_inr': 320000,
-                'maintenance_hours': 15,
-                'expected_gain': 0.15
-            },
-            {
-                'name': 'Hybrid Active-Passive',
-                'terracotta_coverage': 0.8,
-                'air_circulation_power': 1.0,  # kW
-                'cost_inr': 480000,
-                'maintenance_hours': 25,
-                'expected_gain': 0.22
-            }
-        ]
-        
-        # Evaluate each design
-        evaluated_designs = []
-        for design in designs:
-            # Check constraints
-            meets_constraints = (
-                design['cost_inr'] <= constraints['max_budget_inr'] and
-                design['maintenance_hours'] <= constraints['max_maintenance_hours_month'] and
-                design['expected_gain'] >= constraints['min_efficiency_gain']
-            )
-            
-            # Calculate ROI (5-year period)
-            annual_revenue_gain = design['expected_gain'] * 100 * 300 * 6 * 4.5  # 100kW, 300 days, 6h, ₹4.5/kWh
-            roi_5_year = (annual_revenue_gain * 5 - design['cost_inr']) / design['cost_inr']
-            
-            design['meets_constraints'] = meets_constraints
-            design['annual_revenue_gain'] = round(annual_revenue_gain, 2)
-            design['roi_5_year'] = round(roi_5_year * 100, 1)
-            design['payback_years'] = round(design['cost_inr'] / annual_revenue_gain, 1)
+        from thermal_degradation import simulate_degradation
+        
+        return simulate_degradation(self, years=years, site=site, chunk_hours=chunk_hours)
+    
+    def simulate_design_batch(self, terracotta_coverage, air_circulation_power,
+                              ambient_temp, solar_load, humidity, wind_speed, step_hours=None):
+        """
+        Evaluate cooling designs over a shared series of weather conditions
+        
+        Args:
+            terracotta_coverage: Fraction of the array fitted with terracotta vents, shape (D,)
+            air_circulation_power: Forced air circulation power (kW), shape (D,)
+            ambient_temp, solar_load, humidity, wind_speed: Weather series, shape (S,)
+            step_hours: When given, the series is one repeating cycle sampled every
+                step_hours and panel temperatures come from the transient model;
+                otherwise each condition is an independent steady state
+        
+        Returns:
+            dict: 'expected_gain' (energy-weighted relative efficiency gain) and
+                  'water_saved' (liters over the series), arrays of shape (D,)
+        """
+        
+        coverage = np.asarray(terracotta_coverage, dtype=np.float64)[:, None]
+        fan_power = np.asarray(air_circulation_power, dtype=np.float64)[:, None]
+        ambient_temp, solar_load, humidity, wind_speed = (
+            np.asarray(x, dtype=np.float64)[None, :]
+            for x in (ambient_temp, solar_load, humidity, wind_speed)
+        )
+        
+        baseline_temp = self._baseline_temperature(ambient_temp, solar_load)
+        
+        # Fans push air through the terracotta vents and across the panels
+        effective_wind = wind_speed + fan_power * self.FAN_AIRFLOW_PER_KW
+        terracotta_cooling = coverage * self._calculate_terracotta_cooling(
+            ambient_temp, baseline_temp, humidity, effective_wind
+        )
+        radiative_cooling = coverage * self._calculate_radiative_cooling(baseline_temp, ambient_temp)
+        air_cooling = self._calculate_air_cooling(baseline_temp, ambient_temp, effective_wind)
+        
+        total_cooling = terracotta_cooling + air_cooling + radiative_cooling
+        if step_hours is None:
+            final_temp = np.maximum(baseline_temp - total_cooling, ambient_temp)
+            weight = solar_load
+        else:
+            from thermal_transient import periodic_panel_temperature
             
-            evaluated_designs.append(design)
+            # The terracotta mass is integrated instead of its steady-state stand-in
+            thermal_mass = coverage * self._calculate_thermal_mass_cooling(baseline_temp, ambient_temp)
+            free_temp = np.maximum(baseline_temp - (total_cooling - thermal_mass), ambient_temp)
+            final_temp = periodic_panel_temperature(
+                self, step_hours, np.broadcast_to(ambient_temp, free_temp.shape).T, free_temp.T, coverage[:, 0]
+            ).T
+            weight = np.where(solar_load > 5, solar_load, 0.0)  # Productive steps only
+        
+        baseline_efficiency = self._calculate_efficiency(baseline_temp)
+        optimized_efficiency = self._calculate_efficiency(final_temp)
+        baseline_energy = np.sum(weight * baseline_efficiency, axis=1)
+        gained_energy = np.sum(weight * (optimized_efficiency - baseline_efficiency), axis=1)
         
-        # Rank by ROI among constraint-meeting designs
-        viable_designs = [d for d in evaluated_designs if d['meets_constraints']]
-        viable_designs.sort(key=lambda x: x['roi_5_year'], reverse=True)
+        # Passive and forced-air cooling replace conventional water cooling
+        waterless_fraction = coverage[:, 0] + (1 - coverage[:, 0]) * fan_power[:, 0] / (fan_power[:, 0] + 1)
         
         return {
-            'all_designs': evaluated_designs,
-            'recommended': viable_designs[0] if viable_designs else None,
-            'constraints': constraints
+            'expected_gain': gained_energy / baseline_energy,
+            'water_saved': waterless_fraction * np.sum(weight * 0.3)
         }
+    
+    @cached_simulation(ignore=('workers',))
+    def optimize_thermal_design(self, constraints=None, candidates=10_000, workers=None, transient=False,
+                                epsilon=None, top=None):
+        """
+        Search the continuous design space for Pareto-optimal cooling systems
+        
+        See thermal_design.search_design_space for the search itself.
+        """
+        
+        from thermal_design import search_design_space
+        
+        return search_design_space(self, constraints, candidates=candidates, workers=workers, transient=transient,
+                                   epsilon=epsilon, top=top)
+    
+    @cached_simulation()
+    def simulate_transient(self, days=1, start_date="2025-10-05", site=None, step_hours=0.5):
+        """
+        Integrate panel and terracotta temperatures over consecutive days
+        
+        See thermal_transient.simulate_transient for the model.
+        """
+        
+        from thermal_transient import simulate_transient
+        
+        return simulate_transient(self, days=days, start_date=start_date, site=site, step_hours=step_hours)
+    
+    @cached_simulation()
+    def simulate_zones(self, bim, days=1, start_date="2025-10-05", site=None, step_hours=0.5):
+        """
+        Simulate every thermal zone of a BIM export as one lumped network
+        
+        See thermal_zones.simulate_zones for the model.
+        """
+        
+        from thermal_zones import simulate_zones
+        
+        return simulate_zones(self, bim, days=days, start_date=start_date, site=site, step_hours=step_hours)
+
+def print_cache_stats(simulator, args):
+    """Print result cache statistics to stderr when --cache-stats was given"""
+    
+    if args.cache_stats and simulator.result_cache is not None:
+        print(json.dumps(simulator.result_cache.stats(), indent=2), file=sys.stderr)
 
 def main():
     parser = argparse.ArgumentParser(description='HHDAO Thermal Simulation System')
-    parser.add_argument('--mode', choices=['single', 'daily', 'optimize'], default='single',
+    parser.add_argument('--mode', choices=['single', 'daily', 'annual', 'montecarlo', 'optimize', 'fleet', 'weather', 'sensitivity', 'sweep', 'transient', 'zones', 'degradation', 'serve'], default='single',
                        help='Simulation mode')
     parser.add_argument('--temp', type=float, default=35, help='Ambient temperature (°C)')
     parser.add_argument('--load', type=float, default=50, help='Solar load (kW)')
     parser.add_argument('--humidity', type=float, default=65, help='Relative humidity (%)')
     parser.add_argument('--wind', type=float, default=5, help='Wind speed (m/s)')
-    parser.add_argument('--output', help='Output file path (JSON)')
+    parser.add_argument('--years', type=int, help='Simulated years (annual mode: 1, degradation mode: 25)')
+    parser.add_argument('--samples', type=int, default=1_000_000, help='Weather samples (montecarlo mode)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (montecarlo mode)')
+    parser.add_argument('--workers', type=int, help='Worker processes (defaults to CPU count)')
+    parser.add_argument('--candidates', type=int, default=10_000, help='Design candidates to sweep (optimize mode)')
+    parser.add_argument('--arrays', type=int, default=1000, help='Synthetic fleet size (fleet mode)')
+    parser.add_argument('--fleet', help='CSV of per-array fleet parameters (fleet mode)')
+    parser.add_argument('--weather-file', help='Weather CSV or columnar directory (weather mode)')
+    parser.add_argument('--chunk-rows', type=int, default=262144, help='Rows per weather-file chunk')
+    parser.add_argument('--step-minutes', type=float, help='Step length for weather files without timestamps')
+    parser.add_argument('--params', help='Parameter file from thermal_calibration.py')
+    parser.add_argument('--socket', help='Unix socket path (serve mode, defaults to stdin/stdout)')
+    parser.add_argument('--idle-timeout', type=float, help='Stop serving after this many idle seconds')
+    parser.add_argument('--sobol-samples', type=int, default=16384, help='Sobol base samples (sensitivity mode)')
+    parser.add_argument('--morris-trajectories', type=int, default=200, help='Morris trajectories (sensitivity mode)')
+    parser.add_argument('--sites', default='urgam_valley', help='Comma-separated built-in site names (sweep mode)')
+    parser.add_argument('--sites-file', help='JSON file of site climates (sweep mode)')
+    parser.add_argument('--year', type=int, default=2025, help='Calendar year to sweep (sweep mode)')
+    parser.add_argument('--hourly', action='store_true', help='Include hourly results in sweep records')
+    parser.add_argument('--checkpoint', help='Sweep checkpoint file (defaults to OUTPUT.checkpoint)')
+    parser.add_argument('--days', type=int, default=1, help='Simulated days (transient and zones modes)')
+    parser.add_argument('--start-date', default='2025-10-05', help='First simulated day (transient and zones modes)')
+    parser.add_argument('--site', help='Built-in site name for seasonal weather (transient, zones and degradation modes)')
+    parser.add_argument('--bim', help='BIM thermal export JSON (zones mode)')
+    parser.add_argument('--transient', action='store_true', help='Score designs with the transient model (optimize mode)')
+    parser.add_argument('--top', type=int, help='Report only the best-ROI designs of the front (optimize mode)')
+    parser.add_argument('--scenarios', help='JSON Lines file of scenarios to run in one batch (overrides --mode)')
+    parser.add_argument('--order', choices=['input', 'completion'], default='input', help='Scenario result order')
+    parser.add_argument('--cache', action='store_true', help='Serve repeated daily/annual/optimize runs from the result cache')
+    parser.add_argument('--cache-path', default=str(CACHE_ROOT / 'thermal_results.sqlite'), help='Result cache file')
+    parser.add_argument('--cache-max-mb', type=float, default=256, help='Result cache size limit (MB)')
+    parser.add_argument('--cache-stats', action='store_true', help='Print result cache statistics to stderr')
+    parser.add_argument('--distributions', help='JSON file overriding weather input distributions')
+    parser.add_argument('--output', help='Output file path')
+    parser.add_argument('--format', choices=['json', 'jsonl', 'npz'], default='json',
+                       help='Output file format (npz for daily, fleet and zones results)')
     
     args = parser.parse_args()
+    if args.format == 'npz' and args.mode not in ('daily', 'fleet', 'zones'):
+        parser.error('--format npz is only available for daily, fleet and zones results')
     
     simulator = ThermalSimulator()
+    if args.params:
+        simulator.load_parameters(args.params)
+    if args.cache:
+        simulator.enable_result_cache(args.cache_path, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+    
+    if args.scenarios:
+        from thermal_scenarios import run_scenarios
+        
+        out = open(args.output, 'w') if args.output else sys.stdout
+        try:
+            summary = run_scenarios(simulator, args.scenarios, out, order=args.order, workers=args.workers)
+        finally:
+            if args.output:
+                out.close()
+        print(json.dumps(summary, indent=2), file=sys.stderr)
+        print_cache_stats(simulator, args)
+        return
+    
+    if args.mode == 'serve':
+        from thermal_service import serve
+        
+        serve(simulator, socket_path=args.socket, idle_timeout=args.idle_timeout, workers=args.workers)
+        return
+    
+    if args.mode == 'sweep':
+        from thermal_climate import load_sites
+        from thermal_sweep import run_sweep
+        
+        if not args.output:
+            parser.error('--mode sweep requires --output (JSON Lines)')
+        sites = load_sites(args.sites_file) if args.sites_file else args.sites.split(',')
+        result = run_sweep(
+            simulator, sites, args.output,
+            year=args.year,
+            checkpoint_path=args.checkpoint,
+            workers=args.workers,
+            hourly=args.hourly
+        )
+        print(json.dumps(result, indent=2))
+        print_cache_stats(simulator, args)
+        return
     
     if args.mode == 'single':
         result = simulator.simulate_cooling(
@@ -301,17 +714,93 @@ def main():
         
     elif args.mode == 'daily':
         result = simulator.simulate_daily_cycle()
+        print(json.dumps(result, indent=2, default=json_default))
+        
+    elif args.mode == 'annual':
+        result = simulator.simulate_annual(years=args.years or 1)
+        print(json.dumps(result, indent=2))
+        
+    elif args.mode == 'degradation':
+        result = simulator.simulate_degradation(years=args.years or 25, site=args.site)
+        print(json.dumps(result['lifetime_summary'], indent=2))
+        
+    elif args.mode == 'montecarlo':
+        from thermal_montecarlo import run_monte_carlo
+        
+        distributions = None
+        if args.distributions:
+            with open(args.distributions) as f:
+                distributions = json.load(f)
+        result = run_monte_carlo(
+            samples=args.samples,
+            seed=args.seed,
+            workers=args.workers,
+            distributions=distributions,
+            simulator=simulator
+        )
+        print(json.dumps(result, indent=2))
+        
+    elif args.mode == 'sensitivity':
+        from thermal_sensitivity import run_sensitivity
+        
+        result = run_sensitivity(
+            simulator,
+            sobol_samples=args.sobol_samples,
+            morris_trajectories=args.morris_trajectories,
+            seed=args.seed,
+            workers=args.workers
+        )
         print(json.dumps(result, indent=2))
         
     elif args.mode == 'optimize':
-        result = simulator.optimize_thermal_design()
+        result = simulator.optimize_thermal_design(
+            candidates=args.candidates, workers=args.workers, transient=args.transient, top=args.top
+        )
         print(json.dumps(result, indent=2))
+        
+    elif args.mode == 'transient':
+        result = simulator.simulate_transient(days=args.days, start_date=args.start_date, site=args.site)
+        summary = {key: value for key, value in result.items() if key != 'daily_results'}
+        print(json.dumps(summary, indent=2))
+        
+    elif args.mode == 'zones':
+        if not args.bim:
+            parser.error('--mode zones requires --bim')
+        with open(args.bim) as f:
+            bim = json.load(f)
+        result = simulator.simulate_zones(bim, days=args.days, start_date=args.start_date, site=args.site)
+        print(json.dumps({'zones': result['zones'], 'network': result['network']}, indent=2))
+        
+    elif args.mode == 'fleet':
+        from thermal_fleet import fleet_result, load_fleet_csv, simulate_fleet, synthetic_fleet
+        
+        if args.fleet:
+            params, array_ids = load_fleet_csv(args.fleet)
+        else:
+            params, array_ids = synthetic_fleet(args.arrays, seed=args.seed), None
+        result = fleet_result(
+            simulate_fleet(simulator, params, workers=args.workers, array_ids=array_ids)
+        )
+        print(json.dumps(result['fleet_summary'], indent=2))
+        
+    elif args.mode == 'weather':
+        from thermal_weather import simulate_weather_file
+        
+        if not args.weather_file:
+            parser.error('--mode weather requires --weather-file')
+        result = simulate_weather_file(
+            simulator, args.weather_file,
+            chunk_rows=args.chunk_rows,
+            step_minutes=args.step_minutes
+        )
+        print(json.dumps(result['summary'], indent=2))
     
     # Save to file if specified
     if args.output:
-        with open(args.output, 'w') as f:
-            json.dump(result, f, indent=2)
+        write_result(result, args.output, args.format)
         print(f"\n📄 Results saved to: {args.output}")
+    
+    print_cache_stats(simulator, args)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+HHDAO Solar Geometry
+Sun position and clear-sky plane-of-array irradiance for arbitrary sites
+
+The sun direction at a UTC instant is site-independent in Earth-fixed
+coordinates, so the ephemeris is a (4, T) table per year and time step:
+three sun-vector components plus the orbital eccentricity factor. Any
+site's cos(zenith) or cos(incidence) on a tilted plane is a fixed linear
+combination of those components, which turns sites x time into one matrix
+product per chunk.
+"""
+
+import argparse
+import functools
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from thermal_climate import load_sites, resolve_site
+
+SOLAR_CONSTANT = 1353  # W/m², as used by the Meinel clear-sky model
+DEFAULT_TILT = 30  # degrees from horizontal (BIM solar array)
+DEFAULT_AZIMUTH = 180  # degrees clockwise from north; south-facing
+DEFAULT_ALBEDO = 0.2
+DEFAULT_UTC_OFFSET = 5.5  # hours, IST
+DIFFUSE_FRACTION = 0.1  # Diffuse horizontal irradiance relative to direct horizontal
+EPHEMERIS_VERSION = 1
+EPHEMERIS_REFERENCE_YEAR = 2025  # Year used when only day-of-year is known
+DEFAULT_CHUNK_MINUTES = 1440  # One UTC day, so each chunk has one daylight window
+
+
+def _spencer(day_of_year, utc_hours):
+    """Declination (rad), equation of time (min) and eccentricity factor"""
+
+    gamma = 2 * np.pi * (day_of_year - 1 + (utc_hours - 12) / 24) / 365
+    cos1, sin1 = np.cos(gamma), np.sin(gamma)
+    cos2, sin2 = np.cos(2 * gamma), np.sin(2 * gamma)
+    declination = (
+        0.006918 - 0.399912 * cos1 + 0.070257 * sin1 - 0.006758 * cos2 + 0.000907 * sin2
+        - 0.002697 * np.cos(3 * gamma) + 0.00148 * np.sin(3 * gamma)
+    )
+    equation_of_time = 229.18 * (0.000075 + 0.001868 * cos1 - 0.032077 * sin1 - 0.014615 * cos2 - 0.040849 * sin2)
+    eccentricity = 1.000110 + 0.034221 * cos1 + 0.001280 * sin1 + 0.000719 * cos2 + 0.000077 * sin2
+    return declination, equation_of_time, eccentricity
+
+
+def sun_components(day_of_year, utc_hours):
+    """
+    Earth-fixed sun direction and eccentricity factor
+
+    x points to (0°N, 0°E), y to (0°N, 90°E) and z to the north pole.
+
+    Returns:
+        ndarray: Shape (4,) + broadcast input shape: x, y, z, eccentricity
+    """
+
+    day_of_year, utc_hours = np.broadcast_arrays(
+        np.asarray(day_of_year, dtype=np.float64), np.asarray(utc_hours, dtype=np.float64)
+    )
+    declination, equation_of_time, eccentricity = _spencer(day_of_year, utc_hours)
+    greenwich_hour_angle = np.radians(15 * (utc_hours - 12) + equation_of_time / 4)
+    cos_decl = np.cos(declination)
+    return np.stack([
+        cos_decl * np.cos(greenwich_hour_angle),
+        -cos_decl * np.sin(greenwich_hour_angle),
+        np.sin(declination),
+        eccentricity
+    ])
+
+
+def _timestamp_parts(timestamps):
+    """Day of year and fractional UTC hour of datetime64 timestamps (taken as UTC)"""
+
+    timestamps = np.asarray(timestamps, dtype='datetime64[s]')
+    year_start = timestamps.astype('datetime64[Y]')
+    seconds = (timestamps - year_start.astype('datetime64[s]')).astype(np.float64)
+    return np.floor(seconds / 86400) + 1, (seconds % 86400) / 3600
+
+
+def timestamp_components(timestamps):
+    """sun_components for datetime64 UTC timestamps"""
+
+    return sun_components(*_timestamp_parts(timestamps))
+
+
+def _site_array(sites, tilt, azimuth, albedo):
+    """Per-site coordinate, array-plane and local-frame arrays"""
+
+    sites = [resolve_site(site) for site in sites]
+    arrays = {
+        'lat': np.array([site['lat'] for site in sites], dtype=np.float64),
+        'lng': np.array([site['lng'] for site in sites], dtype=np.float64),
+        'altitude_m': np.array([site.get('altitude_m', 0) for site in sites], dtype=np.float64),
+        'tilt': np.array([site.get('tilt', tilt) for site in sites], dtype=np.float64),
+        'azimuth': np.array([site.get('azimuth', azimuth) for site in sites], dtype=np.float64),
+        'albedo': np.array([site.get('albedo', albedo) for site in sites], dtype=np.float64)
+    }
+    arrays['frames'] = site_frames(arrays['lat'], arrays['lng'], arrays['tilt'], arrays['azimuth'])
+    return arrays
+
+
+def site_frames(lat, lng, tilt=DEFAULT_TILT, azimuth=DEFAULT_AZIMUTH):
+    """
+    Local unit vectors in Earth-fixed coordinates
+
+    Returns:
+        dict: 'up', 'east', 'north' and plane 'normal', each of shape (S, 3)
+    """
+
+    lat, lng = np.radians(np.atleast_1d(lat)), np.radians(np.atleast_1d(lng))
+    tilt, azimuth = np.radians(np.atleast_1d(tilt)), np.radians(np.atleast_1d(azimuth))
+    up = np.stack([np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)], axis=-1)
+    east = np.stack([-np.sin(lng), np.cos(lng), np.zeros_like(lng)], axis=-1)
+    north = np.stack([-np.sin(lat) * np.cos(lng), -np.sin(lat) * np.sin(lng), np.cos(lat)], axis=-1)
+    normal = (
+        np.cos(tilt)[:, None] * up
+        + np.sin(tilt)[:, None] * (np.sin(azimuth)[:, None] * east + np.cos(azimuth)[:, None] * north)
+    )
+    return {'up': up, 'east': east, 'north': north, 'normal': normal}
+
+
+def solar_position(timestamps, lat, lng):
+    """
+    Sun zenith and azimuth (degrees, azimuth clockwise from north)
+
+    Args:
+        timestamps: datetime64 UTC timestamps, shape (T,)
+        lat, lng: Site coordinates, scalars or shape (S,)
+
+    Returns:
+        tuple: zenith, azimuth arrays of shape (S, T)
+    """
+
+    components = timestamp_components(np.atleast_1d(timestamps))[:3]
+    frames = site_frames(lat, lng)
+    zenith = np.degrees(np.arccos(np.clip(frames['up'] @ components, -1, 1)))
+    azimuth = np.degrees(np.arctan2(frames['east'] @ components, frames['north'] @ components)) % 360
+    return zenith, azimuth
+
+
+def _meinel_transmittance(cos_zenith):
+    """Sea-level beam transmittance: Meinel with Kasten-Young air mass"""
+
+    zenith_deg = np.degrees(np.arccos(cos_zenith))
+    air_mass = 1 / (cos_zenith + 0.50572 * (96.07995 - zenith_deg) ** -1.6364)
+    return 0.7 ** (air_mass ** 0.678)
+
+
+# Transmittance depends on cos(zenith) alone, so it is tabulated once; linear
+# interpolation on this grid stays within 1e-6 of the closed form
+TRANSMITTANCE_GRID = np.linspace(0, 1, 16385)
+TRANSMITTANCE_TABLE = _meinel_transmittance(TRANSMITTANCE_GRID)
+TRANSMITTANCE_SLOPE = np.append(np.diff(TRANSMITTANCE_TABLE), 0)
+
+
+def _direct_normal(cos_zenith, altitude_m, eccentricity):
+    """
+    Clear-sky DNI (W/m²) with the Laue altitude correction; zero below the horizon
+
+    Works in place on temporaries in the dtype of cos_zenith, since this is
+    the inner loop of fleet-year runs.
+    """
+
+    dtype = cos_zenith.dtype
+    height_km = np.asarray(altitude_m, dtype=dtype) / 1000
+
+    position = np.clip(cos_zenith, 0, 1)
+    position *= TRANSMITTANCE_GRID.size - 1
+    index = position.astype(np.int32)
+    position -= index
+    position *= TRANSMITTANCE_SLOPE.astype(dtype)[index]
+    dni = TRANSMITTANCE_TABLE.astype(dtype)[index]
+    dni += position
+
+    dni *= 1 - 0.14 * height_km
+    dni += 0.14 * height_km
+    dni *= SOLAR_CONSTANT * np.asarray(eccentricity, dtype=dtype)
+    dni *= cos_zenith > 0
+    return dni
+
+
+def clear_sky_irradiance(cos_zenith, altitude_m=0, eccentricity=1.0):
+    """
+    Meinel clear-sky irradiance with the Laue altitude correction
+
+    Returns:
+        tuple: direct normal, diffuse horizontal and global horizontal (W/m²);
+               zero with the sun below the horizon
+    """
+
+    cos_zenith = np.asarray(cos_zenith, dtype=np.float64)
+    dni = _direct_normal(cos_zenith, altitude_m, eccentricity)
+    direct_horizontal = dni * np.maximum(cos_zenith, 0)
+    dhi = DIFFUSE_FRACTION * direct_horizontal
+    return dni, dhi, direct_horizontal + dhi
+
+
+def _diffuse_weight(tilt, albedo):
+    """POA diffuse and ground-reflected irradiance per unit direct horizontal irradiance"""
+
+    cos_tilt = np.cos(np.radians(tilt))
+    return DIFFUSE_FRACTION * (1 + cos_tilt) / 2 + (1 + DIFFUSE_FRACTION) * albedo * (1 - cos_tilt) / 2
+
+
+def _plane_of_array(cos_zenith, cos_incidence, eccentricity, altitude_m, tilt, albedo):
+    """POA irradiance: beam, isotropic sky diffuse and ground reflection (reuses cos_incidence)"""
+
+    dni = _direct_normal(cos_zenith, altitude_m, eccentricity)
+    factor = np.maximum(cos_incidence, 0, out=cos_incidence)
+    factor += np.maximum(cos_zenith, 0) * _diffuse_weight(tilt, albedo)
+    dni *= factor
+    return dni
+
+
+def plane_of_array_irradiance(timestamps, sites, tilt=DEFAULT_TILT, azimuth=DEFAULT_AZIMUTH, albedo=DEFAULT_ALBEDO):
+    """
+    Clear-sky plane-of-array irradiance at arbitrary timestamps
+
+    Args:
+        timestamps: datetime64 UTC timestamps, shape (T,)
+        sites: Site names or climate dicts; a dict may set its own
+               'tilt', 'azimuth' and 'albedo'
+        tilt, azimuth, albedo: Defaults for sites that do not
+
+    Returns:
+        ndarray: W/m², shape (S, T)
+    """
+
+    components = timestamp_components(np.atleast_1d(timestamps))
+    return _sites_poa(_site_array(sites, tilt, azimuth, albedo), components)
+
+
+def _sites_poa(sites, components, dtype=np.float64):
+    """(S, T) POA irradiance from sun components, computed in dtype"""
+
+    frames = sites['frames']
+    sun = np.asarray(components, dtype=dtype)
+    cos_zenith = frames['up'].astype(dtype) @ sun[:3]
+    poa = np.zeros(cos_zenith.shape, dtype=dtype)
+
+    # Steps before the first sunrise or after the last sunset at every site need no work
+    daylight = np.flatnonzero((cos_zenith > 0).any(axis=0))
+    if daylight.size:
+        window = slice(daylight[0], daylight[-1] + 1)
+        per_site = {name: sites[name].astype(dtype)[:, None] for name in ('altitude_m', 'tilt', 'albedo')}
+        poa[:, window] = _plane_of_array(
+            cos_zenith[:, window], frames['normal'].astype(dtype) @ sun[:3, window], sun[3, window],
+            per_site['altitude_m'], per_site['tilt'], per_site['albedo']
+        )
+    return poa
+
+
+def year_timestamps(year, step_minutes=1):
+    """UTC timestamps covering a calendar year at a fixed step"""
+
+    start = np.datetime64(f"{year}-01-01T00:00", 'm')
+    end = np.datetime64(f"{year + 1}-01-01T00:00", 'm')
+    return np.arange(start, end, np.timedelta64(step_minutes, 'm'))
+
+
+@functools.lru_cache(maxsize=8)
+def ephemeris_table(year, step_minutes=1, cache_dir=None):
+    """
+    Sun components for every step of a year, memoized and optionally on disk
+
+    Returns:
+        ndarray: Read-only (4, T) float64 table (see sun_components)
+    """
+
+    path = None
+    if cache_dir is not None:
+        path = Path(cache_dir) / f"ephemeris_{year}_{step_minutes}m_v{EPHEMERIS_VERSION}.npy"
+        if path.exists():
+            table = np.load(path, mmap_mode='r')
+            return table
+
+    table = timestamp_components(year_timestamps(year, step_minutes))
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.stem + '.tmp.npy')
+        np.save(tmp_path, table)
+        tmp_path.replace(path)
+    table.flags.writeable = False
+    return table
+
+
+def iter_annual_plane_of_array(sites, year=2025, step_minutes=1, tilt=DEFAULT_TILT, azimuth=DEFAULT_AZIMUTH,
+                               albedo=DEFAULT_ALBEDO, chunk_minutes=DEFAULT_CHUNK_MINUTES, cache_dir=None,
+                               dtype=np.float32):
+    """
+    Stream a year of clear-sky POA irradiance for many sites
+
+    Yields:
+        tuple: (slice of year steps, (S, steps) irradiance array in W/m²)
+    """
+
+    sites = _site_array(sites, tilt, azimuth, albedo)
+    table = ephemeris_table(year, step_minutes, cache_dir)
+    steps = table.shape[1]
+    chunk_steps = max(1, chunk_minutes // step_minutes)
+    for start in range(0, steps, chunk_steps):
+        window = slice(start, min(start + chunk_steps, steps))
+        yield window, _sites_poa(sites, table[:, window], dtype)
+
+
+def annual_insolation(sites, year=2025, step_minutes=1, **kwargs):
+    """Clear-sky POA insolation per site over a year (kWh/m²)"""
+
+    total = None
+    for _, poa in iter_annual_plane_of_array(sites, year, step_minutes, **kwargs):
+        chunk_total = poa.sum(axis=1, dtype=np.float64)
+        total = chunk_total if total is None else total + chunk_total
+    return total * step_minutes / 60 / 1000
+
+
+@functools.lru_cache(maxsize=64)
+def _site_year_irradiance(lat, lng, altitude_m, tilt, azimuth, albedo, year, step_minutes, cache_dir):
+    site = {'lat': lat, 'lng': lng, 'altitude_m': altitude_m, 'tilt': tilt, 'azimuth': azimuth, 'albedo': albedo}
+    poa = np.concatenate([
+        chunk[0] for _, chunk in iter_annual_plane_of_array([site], year, step_minutes, cache_dir=cache_dir)
+    ])
+    poa.flags.writeable = False
+    return poa
+
+
+def site_year_irradiance(site, year=EPHEMERIS_REFERENCE_YEAR, step_minutes=1, tilt=DEFAULT_TILT,
+                         azimuth=DEFAULT_AZIMUTH, albedo=DEFAULT_ALBEDO, cache_dir=None):
+    """
+    A site's clear-sky POA irradiance for every step of a year
+
+    Memoized per site-year (about 2 MB at one-minute steps), so daily,
+    sweep and transient runs at a site share one table.
+
+    Returns:
+        ndarray: Read-only float32 array in W/m², one value per step from
+                 January 1st 00:00 UTC
+    """
+
+    site = resolve_site(site)
+    return _site_year_irradiance(
+        float(site['lat']), float(site['lng']), float(site.get('altitude_m', 0)),
+        float(site.get('tilt', tilt)), float(site.get('azimuth', azimuth)), float(site.get('albedo', albedo)),
+        year, step_minutes, None if cache_dir is None else str(cache_dir)
+    )
+
+
+def local_hours_poa(site, day_of_year, hours, utc_offset=DEFAULT_UTC_OFFSET, year=EPHEMERIS_REFERENCE_YEAR,
+                    tilt=DEFAULT_TILT, azimuth=DEFAULT_AZIMUTH, albedo=DEFAULT_ALBEDO):
+    """
+    Clear-sky POA irradiance for one site at local clock hours
+
+    Looks up the site-year table at the nearest minute. day_of_year and
+    hours broadcast against each other; times wrap around the year.
+
+    Returns:
+        ndarray: W/m² (float64) in the broadcast shape
+    """
+
+    table = site_year_irradiance(site, year, 1, tilt, azimuth, albedo)
+    minutes = ((np.asarray(day_of_year, dtype=np.float64) - 1) * 24 + np.asarray(hours, dtype=np.float64) - utc_offset) * 60
+    index = np.rint(minutes).astype(np.int64) % len(table)
+    return table[index].astype(np.float64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Clear-sky plane-of-array irradiance for a year')
+    parser.add_argument('--sites', nargs='*', help='Built-in site names (default: all)')
+    parser.add_argument('--sites-file', help='JSON file of site climates (see thermal_climate.SITE_CLIMATES)')
+    parser.add_argument('--synthetic', type=int, help='Replicate the sites to this many for a throughput run')
+    parser.add_argument('--year', type=int, default=2025, help='Calendar year')
+    parser.add_argument('--step-minutes', type=int, default=60, help='Time step (minutes)')
+    parser.add_argument('--tilt', type=float, default=DEFAULT_TILT, help='Array tilt (degrees)')
+    parser.add_argument('--azimuth', type=float, default=DEFAULT_AZIMUTH, help='Array azimuth (degrees from north)')
+    parser.add_argument('--cache-dir', help='Keep ephemeris tables in this directory')
+    args = parser.parse_args()
+
+    from thermal_climate import SITE_CLIMATES
+    climates = load_sites(args.sites_file) if args.sites_file else SITE_CLIMATES
+    names = args.sites or list(climates)
+    sites = [climates[name] for name in names]
+    if args.synthetic:
+        names = [names[i % len(names)] for i in range(args.synthetic)]
+        sites = [sites[i % len(sites)] for i in range(args.synthetic)]
+
+    started = time.perf_counter()
+    insolation = annual_insolation(
+        sites, args.year, args.step_minutes, tilt=args.tilt, azimuth=args.azimuth, cache_dir=args.cache_dir
+    )
+    elapsed = time.perf_counter() - started
+
+    steps = len(year_timestamps(args.year, args.step_minutes))
+    print(json.dumps({
+        'year': args.year,
+        'step_minutes': args.step_minutes,
+        'site_steps': len(sites) * steps,
+        'seconds': round(elapsed, 3),
+        'annual_insolation_kwh_m2': {name: round(float(value), 1) for name, value in zip(names, insolation)}
+        if not args.synthetic else round(float(insolation.mean()), 1)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
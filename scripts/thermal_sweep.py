@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+HHDAO Seasonal Scenario Sweep
+Daily thermal simulations for every day of a year across several sites
+
+Results stream to a JSON Lines file as tasks complete. A checkpoint file
+records finished (site, date) pairs, so an interrupted sweep resumes where
+it stopped when run again with the same output path.
+"""
+
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date, timedelta
+
+from thermal_climate import resolve_site
+
+DAYS_PER_TASK = 7  # Days simulated per worker task
+
+
+def year_dates(year):
+    """ISO dates of every day in a year"""
+
+    first = date(year, 1, 1)
+    days = (date(year + 1, 1, 1) - first).days
+    return [(first + timedelta(days=i)).isoformat() for i in range(days)]
+
+
+def _simulate_days(task):
+    """Worker entry point: daily cycles for one site over a run of dates"""
+
+    simulator, site_name, site, dates, hourly = task
+    records = []
+    for date_str in dates:
+        result = simulator.simulate_daily_cycle(date_str, site=site)
+        record = {'site': site_name, 'date': date_str, 'daily_summary': result['daily_summary']}
+        if hourly:
+            record['hourly_results'] = result['hourly_results']
+        records.append(record)
+    return records
+
+
+def _checkpoint_header(simulator, sites, year, hourly):
+    """Parameters a checkpoint is only valid for"""
+
+    return {'year': year, 'sites': sites, 'hourly': hourly, 'fingerprint': simulator.fingerprint()}
+
+
+def _load_checkpoint(checkpoint_path, header):
+    """Completed (site, date) pairs from a checkpoint written for the same sweep"""
+
+    if not os.path.exists(checkpoint_path):
+        return set()
+
+    with open(checkpoint_path) as f:
+        lines = f.read().splitlines()
+    if not lines or json.loads(lines[0]) != json.loads(json.dumps(header)):
+        raise ValueError(f"Checkpoint {checkpoint_path} belongs to a different sweep; remove it to start over")
+    return {tuple(line.split('\t')) for line in lines[1:] if line.count('\t') == 1}
+
+
+def _restore_output(output_path, completed, totals):
+    """
+    Drop output lines not covered by the checkpoint
+
+    A crash between writing results and checkpointing them (or mid-line)
+    leaves records the checkpoint does not know about; those days are
+    simulated again, so their stale lines are removed here.
+    """
+
+    if not os.path.exists(output_path):
+        completed.clear()
+        return
+
+    kept = set()
+    temp_path = f"{output_path}.tmp"
+    with open(output_path) as src, open(temp_path, 'w') as dst:
+        for line in src:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            key = (record.get('site'), record.get('date'))
+            if key in completed and key not in kept:
+                kept.add(key)
+                dst.write(line if line.endswith('\n') else line + '\n')
+                _add_record(totals, record)
+    os.replace(temp_path, output_path)
+    completed &= kept
+
+
+def _add_record(totals, record):
+    site = totals.setdefault(record['site'], {'days': 0, 'total_energy_gain_kwh': 0.0, 'total_water_saved_liters': 0.0})
+    site['days'] += 1
+    site['total_energy_gain_kwh'] += record['daily_summary']['total_energy_gain_kwh']
+    site['total_water_saved_liters'] += record['daily_summary']['total_water_saved_liters']
+
+
+def run_sweep(simulator, sites, output_path, year=2025, checkpoint_path=None,
+              workers=None, hourly=False, days_per_task=DAYS_PER_TASK):
+    """
+    Simulate every day of a year for each site, streaming JSON Lines
+
+    Args:
+        simulator: ThermalSimulator instance
+        sites: Site names or a dict of site name -> climate dict
+        output_path: JSON Lines file, one record per site and day
+        year: Calendar year to sweep
+        checkpoint_path: Checkpoint file (defaults to output_path + '.checkpoint')
+        workers: Worker processes (defaults to CPU count)
+        hourly: Include hourly results in each record
+        days_per_task: Days simulated per worker task
+
+    Returns:
+        dict: Sweep summary with per-site totals
+    """
+
+    if not isinstance(sites, dict):
+        sites = {name: resolve_site(name) for name in sites}
+    checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+    header = _checkpoint_header(simulator, sites, year, hourly)
+
+    completed = _load_checkpoint(checkpoint_path, header)
+    totals = {}
+    _restore_output(output_path, completed, totals)
+    resumed = len(completed)
+
+    dates = year_dates(year)
+    tasks = []
+    for name, site in sites.items():
+        pending = [d for d in dates if (name, d) not in completed]
+        for i in range(0, len(pending), days_per_task):
+            tasks.append((simulator, name, site, pending[i:i + days_per_task], hourly))
+
+    new_checkpoint = not os.path.exists(checkpoint_path) or not completed
+    with open(output_path, 'a') as out, open(checkpoint_path, 'w' if new_checkpoint else 'a') as checkpoint:
+        if new_checkpoint:
+            checkpoint.write(json.dumps(header) + '\n')
+            checkpoint.flush()
+
+        def emit(records):
+            for record in records:
+                out.write(json.dumps(record) + '\n')
+                _add_record(totals, record)
+            out.flush()
+            os.fsync(out.fileno())
+            checkpoint.write(''.join(f"{r['site']}\t{r['date']}\n" for r in records))
+            checkpoint.flush()
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                emit(_simulate_days(task))
+        elif tasks:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                futures = {pool.submit(_simulate_days, task) for task in tasks}
+                try:
+                    while futures:
+                        done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            emit(future.result())
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+    return {
+        'year': year,
+        'sites': list(sites),
+        'days_per_site': len(dates),
+        'records': sum(site['days'] for site in totals.values()),
+        'resumed_records': resumed,
+        'output': str(output_path),
+        'checkpoint': str(checkpoint_path),
+        'site_totals': {
+            name: {
+                'days': site['days'],
+                'total_energy_gain_kwh': round(site['total_energy_gain_kwh'], 2),
+                'total_water_saved_liters': round(site['total_water_saved_liters'], 1),
+                'estimated_revenue_gain_inr': round(site['total_energy_gain_kwh'] * 4.5, 2)
+            }
+            for name, site in totals.items()
+        }
+    }
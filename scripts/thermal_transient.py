@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+HHDAO Transient Thermal Model
+Coupled panel and terracotta temperatures integrated over time
+
+Each array has two lumped thermal masses:
+
+    C_p dT_p/dt = G_0 (T_free - T_p) - c G_pt (T_p - T_t)
+    C_t dT_t/dt = G_pt (T_p - T_t) - G_ta (T_t - T_a)
+
+T_free is the steady-state panel temperature with every cooling mechanism
+except the terracotta thermal mass, which the transient model represents
+explicitly instead of through the steady-state stand-in. G_0 is the heat
+loss implied by the baseline temperature model and c the terracotta
+coverage, which scales the vent mass and its couplings together.
+
+Integration uses the Bogacki-Shampine 3(2) pair with one adaptive step
+shared by all arrays, and cubic Hermite interpolation back to the sample
+times of the forcing series. Steps end on sample times, so no step
+straddles a kink in the piecewise-linear forcing, and never get shorter
+than one sample interval, below which the forcing carries no detail.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from thermal_climate import site_weather
+from thermal_physics import PHYSICS_PROFILES
+
+# W/K, conductance implied by the baseline temperature model
+ARRAY_HEAT_LOSS = (
+    PHYSICS_PROFILES['simulator']['array_area_m2'] * PHYSICS_PROFILES['simulator']['array_heat_loss_coefficient']
+)
+DEFAULT_RTOL = 1e-3
+DEFAULT_ATOL = 0.01  # °C
+DEFAULT_MAX_STEP_HOURS = 3.0
+STEP_SAFETY = 0.8  # Fraction of the error-optimal step actually taken
+MAX_STEP_GROWTH = 2.0
+MIN_STEP_SHRINK = 0.2
+
+
+def free_panel_temperature(simulator, ambient_temp, baseline_temp, humidity, wind_speed, coverage=1.0):
+    """Steady-state panel temperature without the terracotta thermal-mass term"""
+
+    terracotta, air, radiative = simulator._cooling_components(ambient_temp, baseline_temp, humidity, wind_speed)
+    terracotta = terracotta - simulator._calculate_thermal_mass_cooling(baseline_temp, ambient_temp)
+    cooling = coverage * (terracotta + radiative) + air
+    return np.maximum(baseline_temp - cooling, ambient_temp)
+
+
+def equilibrium_state(simulator, ambient_temp, free_temp, coverage=1.0):
+    """Panel and terracotta temperatures in equilibrium with constant forcing"""
+
+    g0, gpt, gta = ARRAY_HEAT_LOSS, simulator.PANEL_TERRACOTTA_CONDUCTANCE, simulator.TERRACOTTA_AMBIENT_CONDUCTANCE
+    effective = coverage * gpt * gta / (gpt + gta)
+    panel = ambient_temp + g0 * (free_temp - ambient_temp) / (g0 + effective)
+    terracotta = (gpt * panel + gta * ambient_temp) / (gpt + gta)
+    return np.stack([panel, terracotta])
+
+
+def integrate(simulator, times_h, ambient_temp, free_temp, coverage=1.0, initial_state=None,
+              rtol=DEFAULT_RTOL, atol=DEFAULT_ATOL, max_step_hours=DEFAULT_MAX_STEP_HOURS):
+    """
+    Integrate panel and terracotta temperatures for many arrays at once
+
+    Args:
+        simulator: ThermalSimulator holding the thermal-mass constants
+        times_h: Sample times (hours), increasing, shape (S,)
+        ambient_temp: Ambient temperature at each sample, shape (S, N)
+        free_temp: Free panel temperature at each sample, shape (S, N)
+        coverage: Terracotta coverage per array, scalar or shape (N,)
+        initial_state: (2, N) panel/terracotta temperatures at times_h[0],
+            defaults to equilibrium with the first sample
+        rtol, atol: Error tolerances per step
+        max_step_hours: Upper bound on the step length, above one sample
+            interval
+
+    Returns:
+        dict: 'panel_temp' and 'terracotta_temp' (S, N) at the sample times,
+              'state' (2, N) at the last sample and solver statistics
+    """
+
+    times_h = np.asarray(times_h, dtype=np.float64)
+    ambient_temp = np.asarray(ambient_temp, dtype=np.float64)
+    free_temp = np.asarray(free_temp, dtype=np.float64)
+    coverage = np.broadcast_to(np.asarray(coverage, dtype=np.float64), ambient_temp.shape[1:])
+
+    # Rates per hour
+    panel_loss = ARRAY_HEAT_LOSS / simulator.PANEL_HEAT_CAPACITY * 3600
+    panel_coupling = coverage * simulator.PANEL_TERRACOTTA_CONDUCTANCE / simulator.PANEL_HEAT_CAPACITY * 3600
+    vent_coupling = simulator.PANEL_TERRACOTTA_CONDUCTANCE / simulator.TERRACOTTA_HEAT_CAPACITY * 3600
+    vent_loss = simulator.TERRACOTTA_AMBIENT_CONDUCTANCE / simulator.TERRACOTTA_HEAT_CAPACITY * 3600
+
+    def forcing(t):
+        i = min(max(np.searchsorted(times_h, t, side='right') - 1, 0), len(times_h) - 2)
+        w = (t - times_h[i]) / (times_h[i + 1] - times_h[i])
+        return (ambient_temp[i] + w * (ambient_temp[i + 1] - ambient_temp[i]),
+                free_temp[i] + w * (free_temp[i + 1] - free_temp[i]))
+
+    def rhs(t, y):
+        ambient, free = forcing(t)
+        exchange = y[0] - y[1]
+        return np.stack([
+            panel_loss * (free - y[0]) - panel_coupling * exchange,
+            vent_coupling * exchange - vent_loss * (y[1] - ambient)
+        ])
+
+    y = (equilibrium_state(simulator, ambient_temp[0], free_temp[0], coverage)
+         if initial_state is None else np.array(initial_state, dtype=np.float64))
+    panel = np.empty_like(ambient_temp)
+    terracotta = np.empty_like(ambient_temp)
+    panel[0], terracotta[0] = y
+    if len(times_h) == 1:
+        return {'panel_temp': panel, 'terracotta_temp': terracotta, 'state': y,
+                'accepted_steps': 0, 'rejected_steps': 0, 'rhs_evaluations': 0}
+
+    h = min(max_step_hours, times_h[1] - times_h[0])
+    f = rhs(times_h[0], y)
+    evaluations, accepted, rejected = 1, 0, 0
+    i, last = 0, len(times_h) - 1
+    while i < last:
+        # End on the last sample within h, and on the next one at least
+        t = times_h[i]
+        j = int(np.searchsorted(times_h, t + h * (1 + 1e-9), side='right')) - 1
+        j = max(i + 1, min(last, j))
+        h = times_h[j] - t
+        k2 = rhs(t + 0.5 * h, y + 0.5 * h * f)
+        k3 = rhs(t + 0.75 * h, y + 0.75 * h * k2)
+        y_new = y + h * (2 * f + 3 * k2 + 4 * k3) / 9
+        f_new = rhs(times_h[j], y_new)
+        evaluations += 3
+
+        error = h * (-5 * f / 72 + k2 / 12 + k3 / 9 - f_new / 8)
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        norm = float(np.max(np.abs(error) / scale)) if error.size else 0.0
+        # A single sample interval is the step floor and is always accepted
+        if norm > 1 and j > i + 1:
+            rejected += 1
+            h *= max(MIN_STEP_SHRINK, STEP_SAFETY * norm ** (-1 / 3))
+            continue
+
+        # Dense output at the samples inside this step
+        if j > i + 1:
+            s = ((times_h[i + 1:j] - t) / h)[:, None, None]
+            hermite = ((2 * s**3 - 3 * s**2 + 1) * y + (s**3 - 2 * s**2 + s) * h * f
+                       + (-2 * s**3 + 3 * s**2) * y_new + (s**3 - s**2) * h * f_new)
+            panel[i + 1:j] = hermite[:, 0]
+            terracotta[i + 1:j] = hermite[:, 1]
+        panel[j], terracotta[j] = y_new
+
+        i, y, f = j, y_new, f_new
+        accepted += 1
+        growth = min(MAX_STEP_GROWTH, STEP_SAFETY * norm ** (-1 / 3)) if norm > 0 else MAX_STEP_GROWTH
+        h = min(max_step_hours, h * growth)
+
+    return {
+        'panel_temp': panel,
+        'terracotta_temp': terracotta,
+        'state': np.stack([panel[-1], terracotta[-1]]),
+        'accepted_steps': accepted,
+        'rejected_steps': rejected,
+        'rhs_evaluations': evaluations
+    }
+
+
+def _spin_up(simulator, step_hours, ambient_temp, free_temp, coverage, rtol, atol):
+    """State at the start of a repeating cycle, after integrating it once from equilibrium"""
+
+    times = np.arange(len(ambient_temp) + 1) * step_hours
+    return integrate(
+        simulator, times, np.vstack([ambient_temp, ambient_temp[:1]]), np.vstack([free_temp, free_temp[:1]]),
+        coverage, rtol=rtol, atol=atol
+    )['state']
+
+
+def periodic_panel_temperature(simulator, step_hours, ambient_temp, free_temp, coverage=1.0,
+                               rtol=DEFAULT_RTOL, atol=DEFAULT_ATOL):
+    """
+    Panel temperatures over a repeating cycle (e.g. a typical day)
+
+    Args:
+        simulator: ThermalSimulator instance
+        step_hours: Spacing of the samples
+        ambient_temp, free_temp: Cycle samples, shape (S, N)
+        coverage: Terracotta coverage per array, scalar or shape (N,)
+
+    Returns:
+        ndarray: Panel temperatures, shape (S, N)
+    """
+
+    state = _spin_up(simulator, step_hours, ambient_temp, free_temp, coverage, rtol, atol)
+    times = np.arange(len(ambient_temp) + 1) * step_hours
+    return integrate(
+        simulator, times, np.vstack([ambient_temp, ambient_temp[:1]]), np.vstack([free_temp, free_temp[:1]]),
+        coverage, initial_state=state, rtol=rtol, atol=atol
+    )['panel_temp'][:-1]
+
+
+def _day_weather(simulator, start, days, per_day, step_hours, site):
+    """Weather samples for consecutive days starting at a date"""
+
+    steps = np.arange(days * per_day)
+    hours = (steps % per_day) * step_hours
+    if site is None:
+        return simulator._weather_profile(hours)
+    day_of_year = np.array([
+        min((start + timedelta(days=int(d))).timetuple().tm_yday, 365) for d in range(days)
+    ])[steps // per_day]
+    return site_weather(site, day_of_year, hours)
+
+
+def simulate_transient(simulator, days=1, start_date="2025-10-05", site=None, step_hours=0.5,
+                       chunk_days=31, rtol=DEFAULT_RTOL, atol=DEFAULT_ATOL):
+    """
+    Transient thermal performance over consecutive days
+
+    The panel and terracotta state carries across days and chunks. The
+    first day is integrated once beforehand so the run starts from a
+    periodic state rather than from equilibrium at midnight.
+
+    Args:
+        simulator: ThermalSimulator instance
+        days: Number of simulated days
+        start_date: ISO date of the first day
+        site: Optional site name or climate dict (typical day when omitted)
+        step_hours: Spacing of the weather samples
+        chunk_days: Days integrated per solver call, bounding memory
+        rtol, atol: Solver tolerances
+
+    Returns:
+        dict: Per-day and overall summaries, the steady-state summary for
+              comparison and solver statistics
+    """
+
+    per_day = int(round(24 / step_hours))
+    start = date.fromisoformat(start_date)
+
+    def chunk_forcing(first_day, count):
+        temps, solar_loads, humidities, wind_speeds = _day_weather(
+            simulator, start + timedelta(days=first_day), count, per_day, step_hours, site
+        )
+        baseline = simulator._baseline_temperature(temps, solar_loads)
+        free = free_panel_temperature(simulator, temps, baseline, humidities, wind_speeds)
+        return temps, solar_loads, humidities, wind_speeds, baseline, free
+
+    # Spin-up over the first day, then carry the state forward
+    temps, _, _, _, _, free = chunk_forcing(0, 1)
+    state = _spin_up(simulator, step_hours, temps[:, None], free[:, None], 1.0, rtol, atol)
+
+    totals = simulator._empty_cycle_totals()
+    steady_totals = simulator._empty_cycle_totals()
+    daily_results = []
+    solver = {'accepted_steps': 0, 'rejected_steps': 0, 'rhs_evaluations': 0}
+    peak_transient, peak_steady = -np.inf, -np.inf
+    for first_day in range(0, days, chunk_days):
+        count = min(chunk_days, days - first_day)
+        temps, solar_loads, humidities, wind_speeds, baseline, free = chunk_forcing(first_day, count + 1)
+        samples = count * per_day + 1  # One extra sample joins this chunk to the next
+        solution = integrate(
+            simulator, np.arange(samples) * step_hours,
+            temps[:samples, None], free[:samples, None], initial_state=state, rtol=rtol, atol=atol
+        )
+        state = solution['state']
+        for key in solver:
+            solver[key] += solution[key]
+
+        panel = solution['panel_temp'][:-1, 0]
+        steady = simulator.simulate_cooling_batch(
+            temps[:-per_day], solar_loads[:-per_day], humidities[:-per_day], wind_speeds[:-per_day]
+        )
+        baseline = baseline[:-per_day]
+        solar = solar_loads[:-per_day]
+        baseline_efficiency = simulator._calculate_efficiency(baseline)
+        transient_efficiency = simulator._calculate_efficiency(panel)
+        transient = {
+            'temp_reduction': baseline - panel,
+            'efficiency_gain': (transient_efficiency - baseline_efficiency) * 100,
+            'water_saved': solar * 0.3,
+            'power_gain_kw': solar * (transient_efficiency - baseline_efficiency)
+        }
+
+        productive = solar > 5
+        peak_transient = max(peak_transient, float(panel.max()))
+        peak_steady = max(peak_steady, float(steady['optimized_temp'].max()))
+        for d in range(count):
+            day = slice(d * per_day, (d + 1) * per_day)
+            mask = productive[day]
+            day_batch = {key: values[day][mask] for key, values in transient.items()}
+            day_totals = simulator._accumulate_cycle(simulator._empty_cycle_totals(), day_batch, step_hours)
+            for key in totals:
+                totals[key] += day_totals[key]
+            daily_results.append({
+                'date': (start + timedelta(days=first_day + d)).isoformat(),
+                'daily_summary': simulator._summarize_cycle(day_totals),
+                'peak_panel_temp': round(float(panel[day].max()), 2),
+                'peak_terracotta_temp': round(float(solution['terracotta_temp'][day, 0].max()), 2)
+            })
+        simulator._accumulate_cycle(
+            steady_totals, {key: values[productive] for key, values in steady.items()}, step_hours
+        )
+
+    return {
+        'start_date': start_date,
+        'days': days,
+        'step_hours': step_hours,
+        'daily_results': daily_results,
+        'summary': simulator._summarize_cycle(totals),
+        'steady_state_summary': simulator._summarize_cycle(steady_totals),
+        'peak_panel_temp': {'transient': round(peak_transient, 2), 'steady_state': round(peak_steady, 2)},
+        'solver': solver
+    }
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+HHDAO Weather File Ingestion
+Streams logged site weather from CSV or memory-mapped columnar files into the simulator
+"""
+
+import argparse
+import json
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+WEATHER_COLUMNS = ('ambient_temp', 'solar_load', 'humidity', 'wind_speed')
+WEATHER_DEFAULTS = {'humidity': 65.0, 'wind_speed': 5.0}  # simulate_cooling defaults
+SOLAR_LOAD_PER_IRRADIANCE = 80 / 1000  # kW of array load per W/m² (80 kW at 1000 W/m²)
+DEFAULT_CHUNK_ROWS = 262144
+COLUMNAR_MANIFEST = 'manifest.json'
+COLUMNAR_FORMAT = 'hhdao-columnar-v1'
+
+
+def _csv_columns(header):
+    """Map the CSV header onto weather columns and the optional timestamp"""
+
+    names = [name.strip() for name in header.split(',')]
+    index = {name: i for i, name in enumerate(names)}
+    if 'ambient_temp' not in index:
+        raise ValueError("Weather file needs an 'ambient_temp' column")
+    if 'solar_load' not in index and 'solar_irradiance' not in index:
+        raise ValueError("Weather file needs a 'solar_load' or 'solar_irradiance' column")
+    return index
+
+
+def _find_missing(path, numbered, columns):
+    """Raise a line-numbered ValueError for the first row with a missing or unparsable value"""
+
+    for number, line in numbered:
+        fields = line.split(',')
+        for name, position in columns.items():
+            text = fields[position].strip() if position < len(fields) else ''
+            if not text:
+                raise ValueError(f"{path}:{number}: missing {name}")
+            try:
+                missing = np.isnat(np.datetime64(text, 's')) if name == 'timestamp' else np.isnan(float(text))
+            except ValueError:
+                raise ValueError(f"{path}:{number}: invalid {name} {text!r}") from None
+            if missing:
+                raise ValueError(f"{path}:{number}: missing {name}")
+
+
+def iter_csv_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Yield fixed-size column chunks from a weather CSV file
+
+    Only chunk_rows lines are held in memory at a time. Blank lines are
+    skipped; a row with a missing or unparsable value raises ValueError
+    naming its line number.
+
+    Yields:
+        dict: float64 arrays for WEATHER_COLUMNS, plus 'timestamp'
+              (datetime64[s]) when the file has a timestamp column
+    """
+
+    with open(path) as f:
+        index = _csv_columns(f.readline())
+        solar_column = 'solar_load' if 'solar_load' in index else 'solar_irradiance'
+        numeric = [name for name in ('ambient_temp', solar_column, 'humidity', 'wind_speed') if name in index]
+        usecols = [index[name] for name in numeric]
+        columns = {name: index[name] for name in numeric + ['timestamp'] if name in index}
+        numbered_lines = ((number, line) for number, line in enumerate(f, start=2) if line.strip())
+
+        while True:
+            numbered = list(islice(numbered_lines, chunk_rows))
+            if not numbered:
+                break
+            lines = [line for _, line in numbered]
+            try:
+                values = np.loadtxt(lines, delimiter=',', usecols=usecols, ndmin=2, dtype=np.float64)
+                timestamps = None
+                if 'timestamp' in index:
+                    position = index['timestamp']
+                    timestamps = np.array([line.split(',')[position].strip() for line in lines], dtype='datetime64[s]')
+            except (ValueError, IndexError):
+                _find_missing(path, numbered, columns)
+                raise
+            if np.isnan(values).any() or (timestamps is not None and np.isnat(timestamps).any()):
+                _find_missing(path, numbered, columns)
+
+            chunk = {name: values[:, i] for i, name in enumerate(numeric)}
+            if solar_column == 'solar_irradiance':
+                chunk['solar_load'] = chunk.pop('solar_irradiance') * SOLAR_LOAD_PER_IRRADIANCE
+            if timestamps is not None:
+                chunk['timestamp'] = timestamps
+            yield chunk
+
+
+def open_columnar(path):
+    """
+    Memory-map a columnar weather directory
+
+    The directory holds one .npy file per column and a manifest.json
+    listing the columns and row count. Directories written with
+    compression='npz' hold one compressed .npz per column instead; those
+    columns are decompressed into memory rather than mapped.
+
+    Returns:
+        dict: Read-only memory-mapped arrays keyed by column name
+    """
+
+    path = Path(path)
+    with open(path / COLUMNAR_MANIFEST) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != COLUMNAR_FORMAT:
+        raise ValueError(f"Unsupported columnar format: {manifest.get('format')}")
+    if manifest.get('compression') == 'npz':
+        columns = {}
+        for name in manifest['columns']:
+            with np.load(path / f"{name}.npz") as archive:
+                columns[name] = archive['values']
+                columns[name].flags.writeable = False
+        return columns
+    return {name: np.load(path / f"{name}.npy", mmap_mode='r') for name in manifest['columns']}
+
+
+def iter_columnar_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield fixed-size chunks from a memory-mapped columnar weather directory"""
+
+    columns = open_columnar(path)
+    if 'solar_load' not in columns and 'solar_irradiance' in columns:
+        columns['solar_load'] = columns.pop('solar_irradiance')
+        scale_irradiance = True
+    else:
+        scale_irradiance = False
+
+    rows = len(next(iter(columns.values())))
+    for start in range(0, rows, chunk_rows):
+        chunk = {name: np.asarray(column[start:start + chunk_rows]) for name, column in columns.items()}
+        if scale_irradiance:
+            chunk['solar_load'] = chunk['solar_load'] * SOLAR_LOAD_PER_IRRADIANCE
+        yield chunk
+
+
+def iter_weather_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield weather chunks from a CSV file or columnar directory"""
+
+    if Path(path).is_dir():
+        return iter_columnar_chunks(path, chunk_rows)
+    return iter_csv_chunks(path, chunk_rows)
+
+
+def convert_csv_to_columnar(csv_path, out_dir, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Convert a weather CSV into the memory-mappable columnar format
+
+    The CSV is scanned once to count rows, then streamed chunk by chunk
+    into preallocated .npy files.
+    """
+
+    with open(csv_path) as f:
+        next(f, None)
+        rows = sum(1 for line in f if line.strip())
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    columns = {}
+    offset = 0
+    for chunk in iter_csv_chunks(csv_path, chunk_rows):
+        for name, values in chunk.items():
+            if name not in columns:
+                columns[name] = np.lib.format.open_memmap(
+                    out_dir / f"{name}.npy", mode='w+', dtype=values.dtype, shape=(rows,)
+                )
+            columns[name][offset:offset + len(values)] = values
+        offset += len(next(iter(chunk.values())))
+
+    for column in columns.values():
+        column.flush()
+    with open(out_dir / COLUMNAR_MANIFEST, 'w') as f:
+        json.dump({'format': COLUMNAR_FORMAT, 'rows': rows, 'columns': list(columns)}, f, indent=2)
+    return out_dir
+
+
+def simulate_weather_file(simulator, path, chunk_rows=DEFAULT_CHUNK_ROWS, step_minutes=None):
+    """
+    Run the cooling model over a logged weather file without loading it whole
+
+    Each step covers the interval since the previous timestamp, capped at
+    the file's nominal interval so logger gaps do not inflate totals.
+    Files without timestamps use step_minutes (default 60). Energy and
+    water totals are weighted by step duration.
+
+    Returns:
+        dict: Whole-file summary and, when timestamps exist, per-day summaries
+    """
+
+    totals = simulator._empty_cycle_totals()
+    daily = {}
+    rows = 0
+    previous = None
+    nominal = None if step_minutes is None else np.timedelta64(int(step_minutes * 60), 's')
+
+    for chunk in iter_weather_chunks(path, chunk_rows):
+        size = len(chunk['ambient_temp'])
+        rows += size
+        inputs = {
+            name: chunk[name] if name in chunk else np.full(size, WEATHER_DEFAULTS[name])
+            for name in WEATHER_COLUMNS
+        }
+
+        timestamps = chunk.get('timestamp')
+        if timestamps is not None:
+            timestamps = timestamps.astype('datetime64[s]')
+            stamps = timestamps if previous is None else np.concatenate([[previous], timestamps])
+            deltas = np.diff(stamps)
+            if nominal is None:
+                nominal = np.median(deltas) if len(deltas) else np.timedelta64(3600, 's')
+            if previous is None:
+                deltas = np.concatenate([[nominal], deltas])
+            previous = timestamps[-1]
+            step_hours = np.minimum(deltas, nominal).astype(np.float64) / 3600
+        else:
+            step_hours = np.full(size, (step_minutes or 60) / 60)
+
+        # Only during productive hours
+        productive = inputs['solar_load'] > 5
+        batch = simulator.simulate_cooling_batch(*(inputs[name][productive] for name in WEATHER_COLUMNS))
+        hours = step_hours[productive]
+        energy = batch['power_gain_kw'] * hours
+        water = batch['water_saved'] * hours
+
+        totals['energy_gain_kwh'] += float(energy.sum())
+        totals['water_saved_liters'] += float(water.sum())
+        totals['temp_reduction_sum'] += float(batch['temp_reduction'].sum())
+        totals['efficiency_gain_sum'] += float(batch['efficiency_gain'].sum())
+        totals['productive_steps'] += int(productive.sum())
+
+        if timestamps is not None:
+            days = timestamps[productive].astype('datetime64[D]')
+            unique, inverse = np.unique(days, return_inverse=True)
+            sums = {
+                'energy_gain_kwh': np.bincount(inverse, energy, len(unique)),
+                'water_saved_liters': np.bincount(inverse, water, len(unique)),
+                'temp_reduction_sum': np.bincount(inverse, batch['temp_reduction'], len(unique)),
+                'efficiency_gain_sum': np.bincount(inverse, batch['efficiency_gain'], len(unique)),
+                'productive_steps': np.bincount(inverse, minlength=len(unique))
+            }
+            for i, day in enumerate(unique):
+                day_totals = daily.setdefault(str(day), simulator._empty_cycle_totals())
+                for key, values in sums.items():
+                    day_totals[key] += values[i].item()
+
+    result = {
+        'weather_file': str(path),
+        'rows': rows,
+        'summary': simulator._summarize_cycle(totals)
+    }
+    if daily:
+        result['daily_results'] = [
+            dict(date=day, **simulator._summarize_cycle(day_totals))
+            for day, day_totals in sorted(daily.items())
+        ]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert weather CSV files to the columnar format')
+    parser.add_argument('csv_path', help='Weather CSV file')
+    parser.add_argument('out_dir', help='Output columnar directory')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help='Rows per chunk')
+    args = parser.parse_args()
+
+    out_dir = convert_csv_to_columnar(args.csv_path, args.out_dir, args.chunk_rows)
+    print(f"📄 Columnar weather saved to: {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+HHDAO Zone Network Thermal Model
+Lumped thermal network of the zones in a BIM thermal export
+
+Each zone is one thermal mass coupled to ambient, to its neighbours and,
+with active cooling, to a setpoint:
+
+    C dT/dt = -L T + D u(t)
+
+L is the network's conductance matrix (symmetric, diagonally dominant) and
+u(t) the driving series: ambient temperature, array-plane irradiance and a
+constant. The network is decoupled once into thermal modes with a
+symmetric eigendecomposition of C^-1/2 L C^-1/2; each mode is then
+integrated exactly for inputs varying linearly between samples, so every
+zone advances together with a few vector operations per step, at any
+step length and however stiff the network.
+"""
+
+from collections import deque
+from datetime import date, timedelta
+
+import numpy as np
+
+from thermal_climate import site_weather
+from thermal_results import ColumnarResult
+from thermal_weather import SOLAR_LOAD_PER_IRRADIANCE
+
+THERMAL_MASS_KG_PER_M2 = {'low': 12, 'medium': 60, 'high': 150}
+DEFAULT_SPECIFIC_HEAT = 900  # J/kg·K, masonry and equipment
+R_VALUE_TO_RSI = 0.1761  # ft²·°F·h/BTU to m²·K/W
+CFM_TO_M3_S = 0.000471947
+UNINSULATED_U = 5.0  # W/m²K, envelope or shared wall without an insulation value
+DEFAULT_ZONE_HEIGHT = 3.0  # m, where a zone gives no volume
+
+# Heat released inside enclosures, as a fraction of the array's electrical output
+INTERNAL_GAIN_FRACTION = {'equipment_enclosure': 0.03, 'battery_enclosure': 0.01}
+
+ACTIVE_COOLING_SETPOINT = 25  # °C
+ACTIVE_COOLING_W_K_PER_M3 = 20  # Proportional cooling conductance per m³ of zone volume
+
+# Design limits per zone type (matching the launcher's thermal thresholds)
+ZONE_MAX_TEMPS = {'solar_panel_array': 65, 'equipment_enclosure': 40, 'battery_enclosure': 35}
+
+DRIVERS = ('ambient_temp', 'irradiance', 'constant')
+
+
+class ZoneNetwork:
+    """Capacitances, conductance matrix and input coupling of a zone network"""
+
+    def __init__(self, zones, capacitance, conductance, drivers, connections):
+        self.zones = zones
+        self.capacitance = np.asarray(capacitance, dtype=np.float64)
+        self.conductance = np.asarray(conductance, dtype=np.float64)
+        self.drivers = np.asarray(drivers, dtype=np.float64)  # (zones, len(DRIVERS))
+        self.connections = connections
+
+        scale = np.sqrt(self.capacitance)
+        rates, vectors = np.linalg.eigh(self.conductance / np.outer(scale, scale))
+        self.rates = np.maximum(rates, 0.0)  # 1/s per thermal mode
+        self._to_modes = vectors.T / scale  # V^T C^-1/2
+        self._from_modes = vectors / scale[:, None]  # C^-1/2 V
+
+    @classmethod
+    def from_bim(cls, bim, simulator):
+        """
+        Build the network from a BIM thermal export
+
+        Zones come from 'thermal_zones'. Zone-to-zone links come from an
+        optional 'thermal_connections' list whose entries name two 'zones'
+        and give 'conductance_w_k', or a 'shared_area_m2' with an optional
+        'insulation_r_value'.
+        """
+
+        zone_specs = bim.get('thermal_zones') or []
+        if not zone_specs:
+            raise ValueError('BIM export has no thermal_zones')
+        index = {}
+        for i, zone in enumerate(zone_specs):
+            if zone['zone_id'] in index:
+                raise ValueError(f"Duplicate zone_id '{zone['zone_id']}'")
+            index[zone['zone_id']] = i
+
+        n = len(zone_specs)
+        profile = simulator.physics_profile()
+        air_heat = simulator.AIR_DENSITY * simulator.AIR_SPECIFIC_HEAT  # J/m³K
+        capacitance = np.empty(n)
+        ambient = np.zeros(n)
+        cooling = np.zeros(n)
+        absorbed = np.zeros(n)  # W per W/m² of irradiance
+        electrical = 0.0  # Array electrical output per W/m²
+        for i, zone in enumerate(zone_specs):
+            props = zone.get('thermal_properties', {})
+            area = float(zone.get('area_m2', 0))
+            mass = THERMAL_MASS_KG_PER_M2.get(props.get('thermal_mass', 'medium'), THERMAL_MASS_KG_PER_M2['medium'])
+            capacitance[i] = mass * area * float(props.get('heat_capacity', DEFAULT_SPECIFIC_HEAT))
+
+            if zone.get('type') == 'solar_panel_array':
+                # Still-air heat loss implied by NOCT: (NOCT - 20) °C rise at 800 W/m²
+                ambient[i] = area * 800 / (profile['noct'] - 20)
+                absorbed[i] = area * float(props.get('absorptance', 0.9)) * (1 - profile['nameplate_efficiency'])
+                electrical += area * profile['nameplate_efficiency']
+            else:
+                volume = float(zone.get('volume_m3', area * DEFAULT_ZONE_HEIGHT))
+                height = volume / area if area else DEFAULT_ZONE_HEIGHT
+                envelope = 2 * area + 4 * np.sqrt(area) * height
+                r_value = props.get('insulation_r_value')
+                ambient[i] = envelope * (1 / (r_value * R_VALUE_TO_RSI) if r_value else UNINSULATED_U)
+
+                if zone.get('ventilation_cfm'):
+                    airflow = float(zone['ventilation_cfm']) * CFM_TO_M3_S
+                else:
+                    airflow = float(props.get('air_changes_per_hour', 0)) * volume / 3600
+                ambient[i] += air_heat * airflow
+                capacitance[i] += air_heat * volume
+
+                if props.get('temperature_control') == 'active_cooling':
+                    cooling[i] = float(props.get('cooling_conductance_w_k', ACTIVE_COOLING_W_K_PER_M3 * volume))
+            if capacitance[i] <= 0:
+                raise ValueError(f"Zone '{zone['zone_id']}' needs a positive area")
+
+        # Conductance matrix assembled from the edge list
+        edges = []
+        for link in bim.get('thermal_connections', []):
+            a, b = link['zones']
+            if a not in index or b not in index:
+                raise ValueError(f"Connection between unknown zones {a!r} and {b!r}")
+            if 'conductance_w_k' in link:
+                g = float(link['conductance_w_k'])
+            else:
+                r_value = link.get('insulation_r_value')
+                g = float(link['shared_area_m2']) * (1 / (r_value * R_VALUE_TO_RSI) if r_value else UNINSULATED_U)
+            edges.append((index[a], index[b], g))
+
+        conductance = np.diag(ambient + cooling)
+        if edges:
+            i, j, g = (np.array(values) for values in zip(*edges))
+            np.add.at(conductance, (i, i), g)
+            np.add.at(conductance, (j, j), g)
+            np.add.at(conductance, (i, j), -g)
+            np.add.at(conductance, (j, i), -g)
+        _check_grounded(zone_specs, ambient + cooling, edges)
+
+        drivers = np.zeros((n, len(DRIVERS)))
+        drivers[:, 0] = ambient
+        drivers[:, 1] = absorbed
+        for i, zone in enumerate(zone_specs):
+            drivers[i, 1] += INTERNAL_GAIN_FRACTION.get(zone.get('type'), 0) * electrical
+        drivers[:, 2] = cooling * ACTIVE_COOLING_SETPOINT
+
+        return cls(zone_specs, capacitance, conductance, drivers, len(edges))
+
+    def steady_state(self, inputs):
+        """Zone temperatures in equilibrium with constant inputs (len(DRIVERS),)"""
+
+        return np.linalg.solve(self.conductance, self.drivers @ inputs)
+
+    def time_constants_hours(self):
+        """Time constant of each thermal mode, fastest first"""
+
+        return 1 / self.rates[::-1] / 3600
+
+    def simulate(self, inputs, step_seconds, initial):
+        """
+        Zone temperatures for inputs sampled at a fixed step
+
+        Args:
+            inputs: Driver series, shape (len(DRIVERS), steps)
+            step_seconds: Sample spacing
+            initial: Zone temperatures at the first sample
+
+        Returns:
+            ndarray: Temperatures, shape (steps, zones)
+        """
+
+        a = self.rates * step_seconds
+        decay = np.exp(-a)
+        small = a < 1e-6
+        safe = np.where(small, 1.0, a)
+        phi1 = np.where(small, 1 - a / 2, (1 - decay) / safe)
+        phi2 = np.where(small, 0.5 - a / 6, (1 - phi1) / safe)
+
+        forcing = (self._to_modes @ self.drivers) @ inputs  # (modes, steps)
+        increments = (
+            step_seconds * (phi1 - phi2)[:, None] * forcing[:, :-1]
+            + step_seconds * phi2[:, None] * forcing[:, 1:]
+        ).T
+
+        modes = np.empty((inputs.shape[1], len(a)))
+        modes[0] = self._to_modes @ (self.capacitance * np.asarray(initial))
+        for n in range(len(increments)):
+            np.multiply(decay, modes[n], out=modes[n + 1])
+            modes[n + 1] += increments[n]
+        return modes @ self._from_modes.T
+
+
+def _check_grounded(zones, grounded, edges):
+    """Every zone needs a heat path to ambient or a cooling setpoint"""
+
+    neighbours = [[] for _ in zones]
+    for i, j, _ in edges:
+        neighbours[i].append(j)
+        neighbours[j].append(i)
+    reached = set(np.flatnonzero(grounded > 0).tolist())
+    queue = deque(reached)
+    while queue:
+        for j in neighbours[queue.popleft()]:
+            if j not in reached:
+                reached.add(j)
+                queue.append(j)
+    floating = [zone['zone_id'] for i, zone in enumerate(zones) if i not in reached]
+    if floating:
+        raise ValueError(f"Zones without a heat path to ambient: {', '.join(floating)}")
+
+
+def _zone_weather(simulator, start, days, per_day, step_hours, site):
+    """Ambient temperature and array-plane irradiance samples from a date"""
+
+    steps = np.arange(days * per_day + 1)
+    hours = (steps % per_day) * step_hours
+    if site is None:
+        temps, solar_loads, _, _ = simulator._weather_profile(hours)
+    else:
+        day_of_year = np.array([
+            min((start + timedelta(days=int(d))).timetuple().tm_yday, 365) for d in range(days + 1)
+        ])[steps // per_day]
+        temps, solar_loads, _, _ = site_weather(site, day_of_year, hours)
+    return np.stack([temps, solar_loads / SOLAR_LOAD_PER_IRRADIANCE, np.ones(len(steps))])
+
+
+def simulate_zones(simulator, bim, days=1, start_date="2025-10-05", site=None, step_hours=0.5):
+    """
+    Temperatures of every BIM thermal zone over consecutive days
+
+    The first day is simulated once beforehand, from equilibrium with its
+    mean conditions, so the run starts from a periodic state.
+
+    Args:
+        simulator: ThermalSimulator supplying weather and physical constants
+        bim: BIM thermal export (see tools/launch_pilot.py)
+        days: Number of simulated days
+        start_date: ISO date of the first day
+        site: Built-in site name or climate dict; legacy valley profile if None
+        step_hours: Sample spacing (must divide 24)
+
+    Returns:
+        ColumnarResult: Per-zone summaries plus a 'timeseries' column per zone
+    """
+
+    per_day = round(24 / step_hours)
+    if abs(per_day * step_hours - 24) > 1e-9:
+        raise ValueError('step_hours must divide 24')
+    network = ZoneNetwork.from_bim(bim, simulator)
+    inputs = _zone_weather(simulator, date.fromisoformat(start_date), days, per_day, step_hours, site)
+    step_seconds = step_hours * 3600
+
+    first_day = inputs[:, :per_day + 1]
+    spin_up = network.simulate(first_day, step_seconds, network.steady_state(first_day[:, :-1].mean(axis=1)))
+    temps = network.simulate(inputs, step_seconds, spin_up[-1])[:-1]
+
+    zones = []
+    for i, zone in enumerate(network.zones):
+        series = temps[:, i]
+        max_temp = zone.get('max_temp_c', ZONE_MAX_TEMPS.get(zone.get('type')))
+        zones.append({
+            'zone_id': zone['zone_id'],
+            'type': zone.get('type'),
+            'max_temp': round(float(series.max()), 2),
+            'min_temp': round(float(series.min()), 2),
+            'mean_temp': round(float(series.mean()), 2),
+            'max_allowed_temp': max_temp,
+            'hours_above_max': round(float(np.sum(series > max_temp) * step_hours), 2) if max_temp is not None else None,
+            'time_constant_hours': round(float(network.capacitance[i] / network.conductance[i, i] / 3600), 3)
+        })
+
+    time_constants = network.time_constants_hours()
+    columns = {'hour': np.arange(days * per_day) * step_hours}
+    columns.update({zone['zone_id']: temps[:, i] for i, zone in enumerate(network.zones)})
+    return ColumnarResult(
+        {
+            'start_date': start_date,
+            'days': days,
+            'step_hours': step_hours,
+            'site': site if site is None or isinstance(site, str) else site.get('name'),
+            'zones': zones,
+            'network': {
+                'zones': len(network.zones),
+                'connections': network.connections,
+                'fastest_time_constant_hours': round(float(time_constants[0]), 4),
+                'slowest_time_constant_hours': round(float(time_constants[-1]), 2)
+            }
+        },
+        'timeseries', columns, {name: 2 for name in columns}, orient='columns'
+    )
+
+
+def synthetic_bim(n_zones, seed=0):
+    """Random site of n_zones enclosures around one array, linked in a chain with shortcuts"""
+
+    rng = np.random.default_rng(seed)
+    zones = [{
+        'zone_id': 'SOLAR_ARRAY_001', 'type': 'solar_panel_array', 'area_m2': 500,
+        'thermal_properties': {'thermal_mass': 'low', 'heat_capacity': 900, 'absorptance': 0.95}
+    }]
+    kinds = ('equipment_enclosure', 'battery_enclosure')
+    for i in range(1, n_zones):
+        kind = kinds[i % 2]
+        area = float(rng.uniform(10, 40))
+        props = {'thermal_mass': str(rng.choice(['low', 'medium', 'high'])), 'insulation_r_value': float(rng.uniform(8, 25))}
+        if kind == 'battery_enclosure':
+            props['temperature_control'] = 'active_cooling'
+        else:
+            props['air_changes_per_hour'] = float(rng.uniform(2, 10))
+        zones.append({
+            'zone_id': f"ZONE_{i:04d}", 'type': kind, 'area_m2': area,
+            'volume_m3': area * float(rng.uniform(2.5, 4)), 'thermal_properties': props
+        })
+    connections = [
+        {'zones': [zones[i]['zone_id'], zones[i + 1]['zone_id']], 'shared_area_m2': float(rng.uniform(5, 15)),
+         'insulation_r_value': 10}
+        for i in range(1, n_zones - 1)
+    ]
+    for _ in range(n_zones // 4):
+        a, b = rng.choice(np.arange(1, n_zones), 2, replace=False)
+        connections.append({'zones': [zones[a]['zone_id'], zones[b]['zone_id']], 'conductance_w_k': float(rng.uniform(5, 30))})
+    return {'thermal_zones': zones, 'thermal_connections': connections}
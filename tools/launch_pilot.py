@@ -13,9 +13,10 @@ import time
 import requests
 import numpy as np
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 import sqlite3
 import tempfile
+import socket
 from typing import Dict, List, Tuple, Optional
 import math
 
@@ -23,6 +24,9 @@ import math
 PROJECT_ROOT = Path(__file__).parent.resolve()
 DFX_NETWORK = os.getenv("DFX_NETWORK", "local")  # or "ic"
 URGAM_COORDS = {"lat": 30.1652, "lng": 78.8487}  # Uttarakhand
+URGAM_ALTITUDE_M = 1652  # Urgam Valley elevation
+URGAM_ARRAY_ORIENTATION = 180  # South-facing
+URGAM_ARRAY_TILT = 30  # Optimal for latitude
 DELHI_PARTNERS = [
     {"name": "Delhi Solar Coop", "role": "LandSteward", "document_id": "DELHI_SOLAR_001"},
     {"name": "Uttarakhand Gram Panchayat", "role": "CommunityValidator", "document_id": "GRAM_PANCH_URGAM"},
@@ -44,84 +48,86 @@ THERMAL_THRESHOLDS = {
     }
 }
 
+# === THERMAL SIMULATION SERVICE ===
+THERMAL_SCRIPTS_DIR = PROJECT_ROOT.parent / "scripts"
+THERMAL_SIMULATION_SCRIPT = THERMAL_SCRIPTS_DIR / "thermal_simulation.py"
+THERMAL_SERVICE_SOCKET = PROJECT_ROOT / ".pilot" / "thermal_service.sock"
+THERMAL_SERVICE_IDLE_TIMEOUT = 900  # seconds before an unused service exits
+THERMAL_SERVICE_REQUEST_TIMEOUT = 30.0  # seconds to wait on a reply before falling back
+
+# Panel, inverter and battery models are shared with the simulator (scripts/thermal_physics.py)
+sys.path.insert(0, str(THERMAL_SCRIPTS_DIR))
+from thermal_physics import efficiency_factor, get_profile, nominal_retention, thermal_profile
+from thermal_solar import plane_of_array_irradiance
+from thermal_partitions import PartitionedStore, month_key
+
+THERMAL_PHYSICS_PROFILE = "pilot_monitoring"
+
+# Readings are stored one SQLite file per month (scripts/thermal_partitions.py)
+THERMAL_DATA_DIR = PROJECT_ROOT / "thermal_data"
+THERMAL_LEGACY_DB = PROJECT_ROOT / "thermal_data.db"
+THERMAL_ARCHIVE_DIR = PROJECT_ROOT / "thermal_archive"  # Columnar copies of closed months (scripts/thermal_archive.py)
+THERMAL_RETENTION = {  # Older months keep hourly/daily rollups only
+    "raw_months": 3,
+    "delete_months": None,
+    "archive_root": THERMAL_ARCHIVE_DIR
+}
+THERMAL_RETENTION_STAMP = ".retention_month"  # File in THERMAL_DATA_DIR naming the month retention last ran in
+
 # === THERMAL MANAGEMENT FUNCTIONS ===
 
 def init_thermal_db():
-    """Initialize SQLite database for thermal monitoring data."""
-    db_path = PROJECT_ROOT / "thermal_data.db"
-    conn = sqlite3.connect(db_path)
-    
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS thermal_readings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            device_id TEXT NOT NULL,
-            device_type TEXT NOT NULL, -- 'panel', 'inverter', 'battery'
-            temperature REAL NOT NULL,
-            efficiency REAL,
-            ambient_temp REAL,
-            humidity REAL,
-            solar_irradiance REAL,
-            location_lat REAL,
-            location_lng REAL,
-            alert_level TEXT DEFAULT 'normal' -- 'normal', 'warning', 'critical'
-        )
-    """)
-    
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS thermal_alerts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            device_id TEXT NOT NULL,
-            alert_type TEXT NOT NULL, -- 'temperature', 'efficiency', 'failure'
-            severity TEXT NOT NULL, -- 'warning', 'critical', 'emergency'
-            message TEXT NOT NULL,
-            resolved BOOLEAN DEFAULT FALSE,
-            resolved_at DATETIME
-        )
-    """)
-    
-    conn.commit()
-    conn.close()
-    return db_path
+    """Initialize partitioned SQLite storage for thermal monitoring data."""
+    store = PartitionedStore(THERMAL_DATA_DIR)
+    
+    # One-time split of the old single-file database into monthly partitions
+    if THERMAL_LEGACY_DB.exists() and not store.months():
+        imported = store.import_database(THERMAL_LEGACY_DB)
+        conn = sqlite3.connect(THERMAL_LEGACY_DB)
+        conn.execute("PRAGMA journal_mode = DELETE")  # Fold any WAL back in before renaming
+        conn.close()
+        THERMAL_LEGACY_DB.rename(THERMAL_LEGACY_DB.with_suffix(".db.imported"))
+        print(f"📦 Moved {imported} readings from {THERMAL_LEGACY_DB.name} into monthly partitions")
+    
+    return store
+
+def apply_thermal_retention(store, now=None):
+    """Archive and compact closed months, at most once per calendar month (UTC)."""
+    current_month = month_key(now or datetime.now(timezone.utc))
+    stamp = store.root / THERMAL_RETENTION_STAMP
+    if stamp.exists() and stamp.read_text().strip() == current_month:
+        return []  # No month has closed since the last run; late readings are re-archived next time
+    
+    actions = store.apply_retention(THERMAL_RETENTION, now=now)
+    stamp.write_text(current_month)
+    return actions
 
 def calculate_thermal_efficiency(panel_temp: float, base_temp: float = 25.0) -> float:
     """Calculate solar panel efficiency based on temperature."""
-    # Standard temperature coefficient for silicon panels: -0.4% per °C
-    temp_coefficient = -0.004
-    temp_diff = panel_temp - base_temp
-    efficiency_factor = 1 + (temp_coefficient * temp_diff)
-    return max(0.5, efficiency_factor)  # Minimum 50% efficiency
+    # Standard temperature coefficient for silicon panels: -0.4% per °C, minimum 50% efficiency
+    profile = dict(get_profile(THERMAL_PHYSICS_PROFILE), reference_temperature=base_temp)
+    return float(efficiency_factor(panel_temp, profile))
 
 def simulate_thermal_profile(
     ambient_temp: float, 
     solar_irradiance: float, 
     wind_speed: float = 2.0,
-    time_of_day: int = 12
+    time_of_day: int = 12,
+    panel_age_years: float = 0.0
 ) -> Dict[str, float]:
     """Simulate thermal profile for solar installation in Urgam Valley conditions."""
     
-    # Panel temperature calculation (simplified model)
-    # Formula: Tpanel = Tambient + ((NOCT - 20) / 800) * Solar_Irradiance * (1 - efficiency) / (1 + wind_factor)
-    noct = 45  # Nominal Operating Cell Temperature
-    panel_efficiency = 0.20  # 20% panel efficiency
-    wind_factor = 0.05 * wind_speed  # Wind cooling effect
+    # Panel: NOCT model; inverter and battery rise with irradiance-based load
+    profile = thermal_profile(ambient_temp, solar_irradiance, wind_speed, THERMAL_PHYSICS_PROFILE)
     
-    panel_temp_rise = ((noct - 20) / 800) * solar_irradiance * (1 - panel_efficiency) / (1 + wind_factor)
-    panel_temp = ambient_temp + panel_temp_rise
-    
-    # Inverter temperature (typically 10-15°C above ambient under load)
-    inverter_load_factor = min(1.0, solar_irradiance / 1000)  # Load based on irradiance
-    inverter_temp = ambient_temp + (12 * inverter_load_factor)
-    
-    # Battery temperature (more stable, slightly above ambient)
-    battery_temp = ambient_temp + 3 + (2 * inverter_load_factor)
+    # Aged panels keep a fraction of their initial efficiency
+    retention = float(nominal_retention(panel_age_years, THERMAL_PHYSICS_PROFILE))
     
     return {
-        "panel_temp": round(panel_temp, 2),
-        "inverter_temp": round(inverter_temp, 2),
-        "battery_temp": round(battery_temp, 2),
-        "efficiency": round(calculate_thermal_efficiency(panel_temp), 3),
+        "panel_temp": round(float(profile["panel_temp"]), 2),
+        "inverter_temp": round(float(profile["inverter_temp"]), 2),
+        "battery_temp": round(float(profile["battery_temp"]), 2),
+        "efficiency": round(float(profile["efficiency"]) * retention, 3),
         "ambient_temp": ambient_temp,
         "solar_irradiance": solar_irradiance,
         "wind_speed": wind_speed
@@ -168,8 +174,8 @@ def monitor_thermal_systems():
     print("\n🌡️ Initializing thermal management system...")
     
     # Initialize database
-    db_path = init_thermal_db()
-    print(f"✅ Thermal database initialized: {db_path}")
+    store = init_thermal_db()
+    print(f"✅ Thermal database initialized: {store.root}")
     
     # Simulate current conditions for Urgam Valley
     # (In production, this would read from actual IoT sensors)
@@ -181,12 +187,12 @@ def monitor_thermal_systems():
     ambient_variation = random.uniform(-3, 3)
     ambient_temp = base_ambient + ambient_variation
     
-    # Solar irradiance based on time of day
-    if 6 <= current_hour <= 18:
-        max_irradiance = 800 + random.uniform(-100, 100)
-        irradiance = max_irradiance * math.sin((current_hour - 6) * math.pi / 12)
-    else:
-        irradiance = 0
+    # Clear-sky plane-of-array irradiance from the sun position, with haze/cloud
+    urgam_array = dict(URGAM_COORDS, altitude_m=URGAM_ALTITUDE_M,
+                       tilt=URGAM_ARRAY_TILT, azimuth=URGAM_ARRAY_ORIENTATION)
+    now_utc = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), 's')
+    clear_sky = float(plane_of_array_irradiance(now_utc, [urgam_array])[0, 0])
+    irradiance = clear_sky * random.uniform(0.75, 1.0)
     
     wind_speed = random.uniform(1, 5)  # m/s
     
@@ -196,30 +202,32 @@ def monitor_thermal_systems():
     # Check for alerts
     alerts = check_thermal_alerts(thermal_profile)
     
-    # Store data in database
-    conn = sqlite3.connect(db_path)
-    conn.execute("""
-        INSERT INTO thermal_readings 
-        (device_id, device_type, temperature, efficiency, ambient_temp, 
-         solar_irradiance, location_lat, location_lng)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        "URGAM_PANEL_001", "panel", thermal_profile["panel_temp"], 
-        thermal_profile["efficiency"], thermal_profile["ambient_temp"],
-        thermal_profile["solar_irradiance"], URGAM_COORDS["lat"], URGAM_COORDS["lng"]
-    ))
-    
-    # Store alerts
-    for alert in alerts:
-        conn.execute("""
-            INSERT INTO thermal_alerts (device_id, alert_type, severity, message)
-            VALUES (?, ?, ?, ?)
-        """, (
-            "URGAM_PANEL_001", "temperature", alert["severity"], alert["message"]
-        ))
-    
-    conn.commit()
-    conn.close()
+    # Store data in database; flushes skip the rollups (the fast ingest path, see
+    # scripts/thermal_rollups.py) and closing the writer folds them in with catch_up
+    with store.writer(defer_rollups=True) as writer:
+        writer.add({
+            "device_id": "URGAM_PANEL_001",
+            "device_type": "panel",
+            "temperature": thermal_profile["panel_temp"],
+            "efficiency": thermal_profile["efficiency"],
+            "ambient_temp": thermal_profile["ambient_temp"],
+            "solar_irradiance": thermal_profile["solar_irradiance"],
+            "location_lat": URGAM_COORDS["lat"],
+            "location_lng": URGAM_COORDS["lng"]
+        })
+        
+        # Store alerts
+        for alert in alerts:
+            writer.add_alert({
+                "device_id": "URGAM_PANEL_001",
+                "alert_type": "temperature",
+                "severity": alert["severity"],
+                "message": alert["message"]
+            })
+    
+    # Compact closed months past the raw-retention horizon
+    for action in apply_thermal_retention(store):
+        print(f"🗜️ Thermal partition {action['month']} {action['action']}")
     
     # Display current status
     print(f"📊 Current Thermal Status (Urgam Valley):")
@@ -249,15 +257,15 @@ def generate_thermal_bim_export():
             "name": "Urgam Valley Solar Installation",
             "location": URGAM_COORDS,
             "climate_zone": "Himalayas_Subtropical", 
-            "altitude_m": 1652  # Urgam Valley elevation
+            "altitude_m": URGAM_ALTITUDE_M
         },
         "thermal_zones": [
             {
                 "zone_id": "SOLAR_ARRAY_001",
                 "type": "solar_panel_array",
                 "area_m2": 500,  # 500 m² solar array
-                "orientation": 180,  # South-facing
-                "tilt_angle": 30,   # Optimal for latitude
+                "orientation": URGAM_ARRAY_ORIENTATION,
+                "tilt_angle": URGAM_ARRAY_TILT,
                 "thermal_properties": {
                     "thermal_mass": "low",
                     "heat_capacity": 900,  # J/kg·K for silicon
@@ -289,6 +297,13 @@ def generate_thermal_bim_export():
                 }
             }
         ],
+        "thermal_connections": [
+            {
+                "zones": ["INVERTER_ROOM", "BATTERY_STORAGE"],
+                "shared_area_m2": 12,  # Common wall
+                "insulation_r_value": 10
+            }
+        ],
         "thermal_analysis": {
             "design_temperatures": {
                 "winter_design_low": -5,  # °C
@@ -587,23 +602,134 @@ def monitor_compute_profitability():
     
     return profitability_per_th
 
+class ThermalSimulationClient:
+    """JSON-RPC client for the persistent thermal simulation service."""
+    
+    def __init__(self, socket_path: Path = THERMAL_SERVICE_SOCKET, start_timeout: float = 15.0,
+                 request_timeout: float = THERMAL_SERVICE_REQUEST_TIMEOUT):
+        self.socket_path = Path(socket_path)
+        self.start_timeout = start_timeout
+        self.request_timeout = request_timeout
+        self._sock = None
+        self._reader = None
+        self._next_id = 0
+    
+    def _connect(self):
+        """Connect to the service, starting it in the background if needed."""
+        if self._sock is not None:
+            return
+        try:
+            self._open()
+            return
+        except OSError:
+            pass
+        
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        subprocess.Popen(
+            [sys.executable, str(THERMAL_SIMULATION_SCRIPT), "--mode", "serve",
+             "--socket", str(self.socket_path), "--idle-timeout", str(THERMAL_SERVICE_IDLE_TIMEOUT)],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        deadline = time.monotonic() + self.start_timeout
+        while True:
+            try:
+                self._open()
+                return
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+    
+    def _open(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.request_timeout)  # A wedged service must not hang the caller
+        try:
+            sock.connect(str(self.socket_path))
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        self._reader = sock.makefile("r", encoding="utf-8")
+    
+    def _request(self, payload):
+        self._connect()
+        try:
+            self._sock.sendall((json.dumps(payload) + "\n").encode())
+            line = self._reader.readline()
+        except socket.timeout:
+            # The reply may still arrive later, so this connection can't be reused
+            self.close()
+            raise TimeoutError(f"Thermal simulation service did not reply within {self.request_timeout:.0f}s")
+        except OSError:
+            self.close()
+            raise
+        if not line:
+            self.close()
+            raise ConnectionError("Thermal simulation service closed the connection")
+        return json.loads(line)
+    
+    def _make_request(self, method: str, params: Dict) -> Dict:
+        self._next_id += 1
+        return {"jsonrpc": "2.0", "id": self._next_id, "method": method, "params": params}
+    
+    @staticmethod
+    def _result(response: Dict):
+        if "error" in response:
+            raise RuntimeError(f"Thermal service error: {response['error']['message']}")
+        return response["result"]
+    
+    def call(self, method: str, **params):
+        """Call one service method and return its result."""
+        return self._result(self._request(self._make_request(method, params)))
+    
+    def call_many(self, method: str, params_list: List[Dict]) -> List:
+        """Call one method for many parameter sets in a single JSON-RPC batch."""
+        requests_batch = [self._make_request(method, params) for params in params_list]
+        responses = {r["id"]: r for r in self._request(requests_batch)}
+        return [self._result(responses[r["id"]]) for r in requests_batch]
+    
+    def close(self):
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+        self._sock = None
+        self._reader = None
+
+_thermal_client: Optional[ThermalSimulationClient] = None
+
+def get_thermal_client() -> ThermalSimulationClient:
+    """Shared thermal simulation client, reused across calls."""
+    global _thermal_client
+    if _thermal_client is None:
+        _thermal_client = ThermalSimulationClient()
+    return _thermal_client
+
+def run_thermal_daily_simulation() -> Optional[Dict]:
+    """Daily-cycle results from the simulation service, falling back to a one-off run."""
+    try:
+        return get_thermal_client().call("simulate_daily_cycle")
+    except (OSError, TimeoutError, RuntimeError, ValueError) as e:
+        print(f"⚠️ Thermal simulation service unavailable ({e}), running one-off simulation")
+    
+    run_cmd(
+        f"{sys.executable} {THERMAL_SIMULATION_SCRIPT} --mode daily --output .pilot/thermal_results.json",
+        check=False
+    )
+    thermal_file = PROJECT_ROOT / ".pilot" / "thermal_results.json"
+    if not thermal_file.exists():
+        return None
+    with open(thermal_file, 'r') as f:
+        return json.load(f)
+
 def simulate_thermal_optimization():
     """Run thermal simulation and optimize cooling system."""
     print("\n🌡️ Running thermal optimization simulation...")
     
     try:
-        # Run thermal simulation script
-        result = run_cmd(
-            "python3 scripts/thermal_simulation.py --mode daily --output .pilot/thermal_results.json",
-            check=False
-        )
-        
-        # Load results
-        thermal_file = PROJECT_ROOT / ".pilot" / "thermal_results.json"
-        if thermal_file.exists():
-            with open(thermal_file, 'r') as f:
-                thermal_data = json.load(f)
-            
+        # Run thermal simulation (persistent service, reused across calls)
+        thermal_data = run_thermal_daily_simulation()
+        if thermal_data is not None:
             daily_summary = thermal_data.get('daily_summary', {})
             
             print(f"📊 Thermal Optimization Results:")